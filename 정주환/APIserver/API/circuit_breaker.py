@@ -0,0 +1,103 @@
+import asyncio
+import time
+from collections import deque
+
+import httpx
+
+# 라우팅 서버(GraphHopper 등)용 서킷 브레이커
+# - CLOSED   : 정상. 최근 호출 결과(window_size개)의 실패율을 추적
+# - OPEN     : 실패율이 failure_rate_threshold 이상 -> 호출 없이 즉시 Fallback
+# - HALF_OPEN: recovery_timeout이 지나면 health check 1회로 복구 여부 확인
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        health_check_url: str = None,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 10,
+        window_size: int = 50,
+        recovery_timeout: float = 15.0,
+        probe_timeout: float = 2.0
+    ):
+        self.name = name
+        self.health_check_url = health_check_url
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.recovery_timeout = recovery_timeout
+        self.probe_timeout = probe_timeout
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.results = deque(maxlen=window_size) # (True = 성공, False = 실패)
+        self._probe_lock = asyncio.Lock()
+
+    @property
+    def failure_rate(self) -> float:
+        if not self.results:
+            return 0.0
+        return 1 - sum(self.results) / len(self.results)
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        print(f"[서킷 브레이커] '{self.name}' OPEN (실패율 {self.failure_rate:.0%}) -> {self.recovery_timeout}초간 즉시 Fallback")
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.results.clear()
+        print(f"[서킷 브레이커] '{self.name}' CLOSED (복구 확인)")
+
+    def record(self, n_success: int, n_failure: int):
+        """ 라우팅 호출 결과를 반영합니다. (요청 1건의 성공/실패 개수 단위) """
+        self.results.extend([True] * n_success + [False] * n_failure)
+        if (
+            self.state == self.CLOSED
+            and len(self.results) >= self.min_calls
+            and self.failure_rate >= self.failure_rate_threshold
+        ):
+            self._open()
+
+    async def allow_request(self, async_http_client: httpx.AsyncClient) -> bool:
+        """
+        호출해도 되는지 반환합니다.
+        OPEN 상태에서 recovery_timeout이 지났으면 HALF_OPEN으로 전환하고 health check를 1회 보냅니다.
+        (다른 요청이 확인 중이면 기다리지 않고 False)
+        """
+        if self.state == self.CLOSED:
+            return True
+        if time.monotonic() - self.opened_at < self.recovery_timeout or self._probe_lock.locked():
+            return False
+
+        async with self._probe_lock:
+            self.state = self.HALF_OPEN
+            if await self.probe(async_http_client):
+                self._close()
+                return True
+            self._open()
+            return False
+
+    async def probe(self, async_http_client: httpx.AsyncClient) -> bool:
+        """ health check URL에 GET 1회 (URL이 없으면 실제 요청으로 복구 확인) """
+        if not self.health_check_url:
+            return True
+        try:
+            response = await async_http_client.get(self.health_check_url, timeout=self.probe_timeout)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
+            print(f"[서킷 브레이커] '{self.name}' health check 실패: {e}")
+            return False
+
+    def snapshot(self) -> dict:
+        """ 상태 조회용 (디버그/모니터링) """
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failure_rate": round(self.failure_rate, 3),
+            "recent_calls": len(self.results),
+        }
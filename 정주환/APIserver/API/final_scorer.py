@@ -2,8 +2,19 @@ import pandas as pd
 import json
 import math
 import asyncio # 비동기 처리를 위해 asyncio 추가
+import time
 from typing import List, Dict, Any
 import httpx # requests 대신 httpx.AsyncClient를 main.py에서 전달받아 사용
+import numpy as np
+from datetime import datetime
+
+from .travel_matrix import TravelMatrix
+from .route_cache import RouteCache, quantize_departure, round_coords
+from .circuit_breaker import CircuitBreaker
+from .routing_backends import (
+    RoutingBackend, GraphHopperBackend, paths_to_arrays, split_paths_by_group, request_graphhopper_paths,
+    ROUTE_OK, ROUTE_FAILED, ROUTE_PENDING
+)
 
 class GraphHopperDownError(Exception):
     """GraphHopper 서버가 다운되었거나 모든 요청이 실패했을 때 발생하는 전용 오류"""
@@ -21,84 +32,110 @@ DEFAULT_WEIGHTS = {
 
 
 # [from move.py] 
-# move.py의 이동 마찰 점수 계산 함수를 그대로 가져옵니다.
+# move.py의 이동 마찰 점수 기준을 그대로 가져와, 배열 단위로 계산합니다.
+
+# (A) 시간 점수: 20분 이하는 1점, 50분 이상은 0점
+TRAVEL_MIN_TIME, TRAVEL_MAX_TIME = 20, 50
+# (B) 도보 점수: 500m 이하는 1점, 1.2km 이상은 0점
+TRAVEL_MIN_WALK, TRAVEL_MAX_WALK = 500, 1200
+# (C) 환승 점수: 0회 = 1점, 1회 = 0.4점, 2회 이상 = 0점
+# 최종 점수 (가중 평균)
+TRAVEL_SUB_WEIGHTS = {'walk': 0.4, 'transfers': 0.4, 'time': 0.2}
+
+def score_paths_batch(
+    time_ms,
+    transfers,
+    walk_meters,
+    group_index=None,
+    n_groups: int = None
+) -> np.ndarray:
+    """
+    여러 경로(path)의 '이동 마찰 점수'(0~1)를 한 번에 계산합니다. (1점이 가장 좋음)
+    - time_ms, transfers, walk_meters: 경로별 지표 배열 (GraphHopper의 time/transfers/distance)
+    - group_index: 각 경로가 속한 식당의 위치(0..n_groups-1)
+      -> 주어지면 식당별 최고 점수 배열(길이 n_groups, 경로 없는 식당은 0.0)을 반환
+      -> 없으면 경로별 점수 배열을 그대로 반환
+    """
+    total_time_minutes = np.asarray(time_ms, dtype=np.float64) / 1000 / 60
+    num_transfers = np.asarray(transfers, dtype=np.float64)
+    total_walk_meters = np.asarray(walk_meters, dtype=np.float64)
+
+    time_score = 1 - np.clip((total_time_minutes - TRAVEL_MIN_TIME) / (TRAVEL_MAX_TIME - TRAVEL_MIN_TIME), 0, 1)
+    walk_score = 1 - np.clip((total_walk_meters - TRAVEL_MIN_WALK) / (TRAVEL_MAX_WALK - TRAVEL_MIN_WALK), 0, 1)
+    transfer_score = np.select([num_transfers == 0, num_transfers == 1], [1.0, 0.4], default=0.0)
+
+    path_scores = (
+        (time_score * TRAVEL_SUB_WEIGHTS['time']) +
+        (walk_score * TRAVEL_SUB_WEIGHTS['walk']) +
+        (transfer_score * TRAVEL_SUB_WEIGHTS['transfers'])
+    )
+
+    if group_index is None:
+        return path_scores
+
+    best_scores = np.zeros(n_groups, dtype=np.float64)
+    np.maximum.at(best_scores, np.asarray(group_index, dtype=np.int64), path_scores)
+    return best_scores
+
 def calculate_travel_friction_score(path_data: dict) -> float:
     """
     GraphHopper의 단일 경로(path) 데이터를 기반으로
-    '이동 마찰 점수'(0~1)를 계산합니다. (1점이 가장 좋음)
+    '이동 마찰 점수'(0~1)를 계산합니다. (score_paths_batch의 1건 버전)
     """
-    
-    # 1. 핵심 지표 추출
-    total_time_minutes = path_data.get('time', 0) / 1000 / 60
-    num_transfers = path_data.get('transfers', 0)
-    total_walk_meters = path_data.get('distance', 0)
-    
-    # 2. 각 지표를 0~1 사이 점수로 정규화
-    
-    # (A) 시간 점수: 20분 이하는 1점, 50분 이상은 0점
-    max_time = 50
-    min_time = 20
-    time_score = 1 - min(1, max(0, (total_time_minutes - min_time) / (max_time - min_time)))
-    
-    # (B) 도보 점수: 500m 이하는 1점, 1.2km 이상은 0점
-    max_walk = 1200
-    min_walk = 500
-    walk_score = 1 - min(1, max(0, (total_walk_meters - min_walk) / (max_walk - min_walk)))
-    
-    # (C) 환승 점수: 0회 = 1점, 1회 = 0.4점, 2회 이상 = 0점
-    if num_transfers == 0:
-        transfer_score = 1.0
-    elif num_transfers == 1:
-        transfer_score = 0.4
-    else:
-        transfer_score = 0.0
-        
-    # 3. 최종 점수 (가중 평균)
-    weights = {'walk': 0.4, 'transfers': 0.4, 'time': 0.2}
-    final_score = (
-        (time_score * weights['time']) +
-        (walk_score * weights['walk']) +
-        (transfer_score * weights['transfers'])
-    )
-    
-    return final_score
+    return float(score_paths_batch(
+        [path_data.get('time', 0)],
+        [path_data.get('transfers', 0)],
+        [path_data.get('distance', 0)]
+    )[0])
 
 # --- 점수 계산 헬퍼 함수 ---
 
+def create_graphhopper_client(
+    max_connections: int = 20,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0
+) -> httpx.AsyncClient:
+    """
+    GraphHopper 전용 AsyncClient 생성 (keep-alive 커넥션 풀 크기 지정)
+    (기본 AsyncClient는 요청이 몰리면 커넥션을 계속 새로 맺습니다)
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    return httpx.AsyncClient(limits=limits)
+
+async def fetch_route_paths_async(
+    restaurant: pd.Series, 
+    user_start_location: str, 
+    async_http_client: httpx.AsyncClient,
+    graphhopper_url: str,
+    timeout: float = 10.0,
+    departure_time: datetime = None
+) -> List[dict]:
+    """ GraphHopper API를 비동기로 호출하여 대안 경로(path) 리스트를 반환 (try-except 없음) """
+    to_coords = f"{restaurant['Y좌표']},{restaurant['X좌표']}"
+    return await request_graphhopper_paths(
+        async_http_client, graphhopper_url, user_start_location, to_coords, timeout, departure_time
+    )
+
 async def get_best_travel_score_async(
     restaurant: pd.Series, 
     user_start_location: str, 
     async_http_client: httpx.AsyncClient,
-    graphhopper_url: str
+    graphhopper_url: str,
+    timeout: float = 10.0,
+    departure_time: datetime = None
 ) -> float:
-    """ (수정) GraphHopper API를 비동기로 호출 (try-except 제거) """
-    
-    from_coords = user_start_location
-    to_coords = f"{restaurant['Y좌표']},{restaurant['X좌표']}"
-    
-    params = [
-        ('point', from_coords),
-        ('point', to_coords),
-        ('profile', 'pt'),
-        ('pt.earliest_departure_time', "2024-01-01T09:00:00Z"), # (고정된 표준시)
-        ('algorithm', 'alternative_route'),
-        ('alternative_route.max_paths', '3')
-    ]
-    
-    # try-except 블록 삭제
-    # (httpx.RequestError 등이 발생하면 asyncio.gather가 잡도록 둡니다)
-    response = await async_http_client.get(graphhopper_url, params=params, timeout=10.0)
-    response.raise_for_status() # (4xx, 5xx 오류 시 예외 발생)
-    data = response.json()
-    route_plans = data.get('paths', [])
-    
+    """ (수정) GraphHopper API를 비동기로 호출하여 식당 1곳의 최고 이동 마찰 점수를 반환 """
+    route_plans = await fetch_route_paths_async(
+        restaurant, user_start_location, async_http_client, graphhopper_url, timeout, departure_time
+    )
     if not route_plans:
         return 0.0 # (경로 없음)
 
-    all_path_scores = [calculate_travel_friction_score(path) for path in route_plans]
-    best_score = max(all_path_scores) if all_path_scores else 0.0
-    
-    return best_score
+    return float(score_paths_batch(*paths_to_arrays([route_plans]), n_groups=1)[0])
 
 def get_price_match_score(restaurant_price: str, user_price_prefs: List[str]) -> int:
     """
@@ -114,64 +151,226 @@ def get_price_match_score(restaurant_price: str, user_price_prefs: List[str]) ->
     else:
         return 0
 
+def _price_match_scores(candidate_df: pd.DataFrame, user_price_prefs: List[str]) -> np.ndarray:
+    """ get_price_match_score의 후보군 전체 버전 (0.0 / 1.0 배열) """
+    if not user_price_prefs or 'price' not in candidate_df.columns:
+        return np.zeros(len(candidate_df), dtype=np.float64)
+    # (참고) 'price' 컬럼은 '$' 또는 '$$' 형태여야 함 (NaN은 isin에서 False -> 0점)
+    return candidate_df['price'].isin(user_price_prefs).to_numpy(dtype=np.float64)
+
 # --- 메인 스코어링 함수 ---
 
+def _static_scores(candidate_df: pd.DataFrame, user_price_prefs: List[str], weights: Dict[str, float]) -> np.ndarray:
+    """ 이동 점수를 뺀 가중 합 (친화도 + 품질 + 가격, NaN은 0점) -> 조기 종료 상한 계산용 """
+    return np.nan_to_num(
+        candidate_df['avg_friendliness'].to_numpy(dtype=np.float64) * weights['friendliness'] +
+        candidate_df['avg_quality'].to_numpy(dtype=np.float64) * weights['quality'] +
+        _price_match_scores(candidate_df, user_price_prefs) * weights['price'],
+        nan=0.0
+    )
+
 async def calculate_final_scores_async(
     candidate_df: pd.DataFrame,
     user_start_location: str,
     user_price_prefs: List[str],
     async_http_client: httpx.AsyncClient,
     graphhopper_url: str,
-    weights: Dict[str, float] = None
+    weights: Dict[str, float] = None,
+    travel_matrix: TravelMatrix = None,
+    max_concurrency: int = None,
+    request_timeout: float = 10.0,
+    deadline: float = None,
+    estimated_travel_score: float = 0.5,
+    spatial_index=None,
+    max_route_distance_m: float = None,
+    routing_backend: RoutingBackend = None,
+    circuit_breaker: CircuitBreaker = None,
+    departure_time: datetime = None,
+    departure_bucket_minutes: int = 30,
+    departure_reference_dates: Dict[str, str] = None,
+    route_cache: RouteCache = None,
+    route_cache_coord_digits: int = 3,
+    top_k: int = None
 ) -> pd.DataFrame:
     """
     (대폭 수정)
     1. 후보군 DF에 4가지 점수를 계산 (비동기 GraphHopper 호출 포함)
     2. 모든 GraphHopper 호출 실패 시 GraphHopperDownError 발생
     3. weights: 사용자 지정 가중치 (미지정 시 DEFAULT_WEIGHTS 사용)
+    4. travel_matrix: 사전 계산 행렬 (있으면 행렬에 없는 식당만 GraphHopper 호출)
+    5. max_concurrency: GraphHopper 동시 호출 상한 (None이면 제한 없음)
+       request_timeout: 개별 호출 타임아웃(초), deadline: 요청 전체 마감 시간(초)
+       -> 마감 시 끝나지 않은 후보는 estimated_travel_score로 채우고 travel_estimated=True 표시
+    6. spatial_index: 식당 좌표 인덱스 (있으면 distance_m 컬럼 추가)
+       max_route_distance_m: 직선 거리가 이보다 먼 후보는 GraphHopper 호출 없이 0점 처리
+    7. routing_backend: 출발지 1곳 -> 후보 N곳을 한 번에 계산하는 백엔드
+       (미지정 시 async_http_client/graphhopper_url로 GraphHopperBackend 생성)
+    8. circuit_breaker: 라우팅 서버 서킷 브레이커 (OPEN이면 호출 없이 즉시 GraphHopperDownError)
+    9. departure_time: 출발 시각 (미지정 시 현재 시각)
+       -> (평일/주말, departure_bucket_minutes 단위)로 양자화하여 라우팅과 캐시 키에 사용
+       route_cache: (출발지 반올림 좌표, 식당 id, 출발 시각 버킷) 경로 캐시 (hit이면 라우팅 생략)
+    10. top_k: 지정 시 상위 top_k만 정확히 필요한 모드 (Threshold Algorithm 조기 종료)
+       -> 상한(이동 점수 1.0 가정)이 높은 후보부터 라우팅하고, 순위가 확정되면 남은 후보는
+          라우팅 없이 estimated_travel_score로 채움 (travel_estimated=True, top_k 밖 순서는 근사)
     """
 
     # 가중치 기본값 설정
     if weights is None:
         weights = DEFAULT_WEIGHTS
     
-    # --- 1/4. 이동 마찰 점수 (비동기) ---
-    print(f"1/4. 이동 마찰 점수 계산 중 (API 동시 호출)...")
-    
-    tasks = [
-        get_best_travel_score_async(
-            restaurant, 
-            user_start_location, 
-            async_http_client, 
-            graphhopper_url
-        ) 
-        for _, restaurant in candidate_df.iterrows()
-    ]
-    
-    # [ ★★★ 3. asyncio.gather 수정 (예외 처리) ★★★ ]
-    # return_exceptions=True : 개별 작업이 실패해도 중단하지 않고, 결과 리스트에 Exception 객체를 포함
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # --- 1/4. 이동 마찰 점수 (사전 계산 행렬 -> 경로 캐시 -> miss만 비동기 API 호출) ---
+    bucket_key, bucket_departure = quantize_departure(
+        departure_time, departure_bucket_minutes, departure_reference_dates
+    )
+    if travel_matrix is not None and travel_matrix.covers(bucket_key):
+        cached_scores = travel_matrix.lookup(user_start_location, candidate_df.index.tolist())
+    else:
+        cached_scores = np.full(len(candidate_df), np.nan, dtype=np.float32)
+
+    # (직선 거리 사전 필터: 너무 먼 후보는 라우팅 없이 0점)
+    n_hits = int((~np.isnan(cached_scores)).sum())
+    far_skipped = np.zeros(len(candidate_df), dtype=bool)
+    if spatial_index is not None:
+        start_lat, start_lon = (float(v) for v in user_start_location.split(","))
+        distances_m = spatial_index.distances_m(start_lat, start_lon, candidate_df.index.tolist())
+        candidate_df['distance_m'] = distances_m
+        if max_route_distance_m is not None:
+            far_skipped = np.isnan(cached_scores) & (np.nan_to_num(distances_m, nan=0.0) > max_route_distance_m)
+            cached_scores = np.where(far_skipped, 0.0, cached_scores)
+
+    miss_positions = np.flatnonzero(np.isnan(cached_scores))
+
+    # (경로 캐시: 같은 출발지 근처 x 같은 식당 x 같은 시간대 버킷이면 저장된 경로 재사용)
+    cache_keys = {}
+    cached_paths = {}
+    if route_cache is not None:
+        origin_key = round_coords(user_start_location, route_cache_coord_digits)
+        for pos in miss_positions:
+            cache_keys[pos] = (origin_key, str(candidate_df.index[pos]), bucket_key)
+            paths = route_cache.get(cache_keys[pos])
+            if paths is not None:
+                cached_paths[pos] = paths
+        miss_positions = np.array([pos for pos in miss_positions if pos not in cached_paths], dtype=np.int64)
+
+    print(f"1/4. 이동 마찰 점수 계산 중 (출발 버킷: {bucket_key}, 행렬 hit: {n_hits}개, "
+          f"캐시 hit: {len(cached_paths)}개, 거리 제외: {int(far_skipped.sum())}개, 라우팅: {len(miss_positions)}개)...")
     
-    travel_scores = []
+    if routing_backend is None:
+        routing_backend = GraphHopperBackend(
+            async_http_client, graphhopper_url,
+            max_concurrency=max_concurrency, request_timeout=request_timeout
+        )
+
+    if circuit_breaker is not None and len(miss_positions) and not await circuit_breaker.allow_request(async_http_client):
+        print(f"[서킷 브레이커] '{circuit_breaker.name}' OPEN 상태: 라우팅 호출 없이 Fallback합니다.")
+        raise GraphHopperDownError(f"Circuit breaker '{circuit_breaker.name}' is open.")
+
+    travel_scores = cached_scores.astype(np.float64)
+    travel_estimated = far_skipped.copy() # (거리 제외 후보도 추정치로 표시)
+    pending_mask = np.zeros(len(candidate_df), dtype=bool)
     any_failures = False
-    
-    for i, res in enumerate(results):
-        if isinstance(res, float):
-            travel_scores.append(res)
-        else:
-            # (res는 Exception 객체)
-            restaurant_id = candidate_df.index[i] # (ID는 .index에 있음)
-            print(f"Error: GraphHopper API 요청 실패 (ID: {restaurant_id}): {res}")
-            travel_scores.append(0.0)
-            any_failures = True
+    started = time.monotonic()
+
+    if cached_paths:
+        cached_positions = np.array(list(cached_paths.keys()), dtype=np.int64)
+        time_ms, transfers, walk_meters, group_index = paths_to_arrays(list(cached_paths.values()))
+        travel_scores[cached_positions] = score_paths_batch(
+            time_ms, transfers, walk_meters, group_index=group_index, n_groups=len(cached_positions)
+        )
+
+    async def route_positions(positions: np.ndarray):
+        """ 후보 positions를 백엔드 1회 호출로 라우팅하여 travel_scores 등에 반영 """
+        nonlocal any_failures
+        remaining = None if deadline is None else max(deadline - (time.monotonic() - started), 0.0)
+        destinations = [
+            f"{candidate_df['Y좌표'].iloc[pos]},{candidate_df['X좌표'].iloc[pos]}"
+            for pos in positions
+        ]
+        routes = await routing_backend.route_one_to_many(
+            user_start_location, destinations, deadline=remaining, departure_time=bucket_departure
+        )
+        status = routes['status']
+        if circuit_breaker is not None:
+            # (마감 시간 초과도 실패로 집계: 응답 없는 서버는 대부분 시간 초과로 나타남)
+            circuit_breaker.record(int((status == ROUTE_OK).sum()), int((status != ROUTE_OK).sum()))
+
+        # (응답 받은 후보들의 경로를 한 번에 벡터 계산, 실패한 후보는 경로가 없어 0점)
+        travel_scores[positions] = score_paths_batch(
+            routes['time'], routes['transfers'], routes['distance'],
+            group_index=routes['group'], n_groups=len(positions)
+        )
+        if routes.get('estimated'):
+            # (로컬 추정기 등 실제 경로 탐색이 아닌 백엔드의 점수는 추정치로 표시)
+            travel_estimated[positions[status == ROUTE_OK]] = True
+        elif route_cache is not None:
+            # (실제 경로 탐색으로 응답 받은 후보만 저장, 실패/시간 초과/추정치는 저장하지 않음)
+            for g, paths in enumerate(split_paths_by_group(routes, len(positions))):
+                if status[g] == ROUTE_OK:
+                    route_cache.set(cache_keys[positions[g]], paths)
+
+        pending_positions = positions[status == ROUTE_PENDING]
+        travel_scores[pending_positions] = estimated_travel_score
+        travel_estimated[pending_positions] = True
+        pending_mask[pending_positions] = True
+        any_failures = any_failures or bool((status == ROUTE_FAILED).any())
+
+    if top_k is None or len(miss_positions) <= top_k:
+        # (출발지 1곳 -> miss 후보 전체를 백엔드 1회 호출로 계산)
+        await route_positions(miss_positions)
+    else:
+        # (Threshold Algorithm) 이동 점수를 1.0으로 가정한 상한이 높은 후보부터 라우팅하고,
+        # k번째 확정 점수가 남은 후보의 최대 상한 이상이 되면 중단 (top_k는 전체 라우팅과 동일)
+        # (NaN 정적 점수는 0점: 정렬 순서와 상한 배열이 같은 순열을 따르도록 NaN을 먼저 제거)
+        static_scores = _static_scores(candidate_df, user_price_prefs, weights)
+        upper_bounds = static_scores[miss_positions] + weights['travel'] * 1.0
+        order = np.argsort(-upper_bounds, kind='stable')
+        route_order = miss_positions[order]
+        sorted_bounds = upper_bounds[order] # (route_order[i]의 상한 = sorted_bounds[i])
+        batch_size = max(top_k, max_concurrency or 0)
+
+        routed = 0
+        while routed < len(route_order):
+            await route_positions(route_order[routed:routed + batch_size])
+            routed += batch_size
+
+            known = ~np.isnan(travel_scores) & ~pending_mask
+            if routed < len(route_order) and known.sum() >= top_k:
+                known_finals = static_scores[known] + weights['travel'] * travel_scores[known]
+                kth_best = -np.partition(-known_finals, top_k - 1)[top_k - 1]
+                if kth_best >= sorted_bounds[routed]:
+                    break
+
+        # (라우팅하지 않은 후보는 top_k에 들 수 없음 -> 추정 점수로 채움, 상한 이하이므로 순위 불변)
+        skipped_positions = route_order[routed:]
+        travel_scores[skipped_positions] = estimated_travel_score
+        travel_estimated[skipped_positions] = True
+        print(f"  > [조기 종료] 라우팅 {min(routed, len(route_order))}/{len(route_order)}개 후 top_{top_k} 확정 "
+              f"(생략 {len(skipped_positions)}개)")
+
+    pending = int(pending_mask.sum())
+
+    if pending:
+        print(f"[경고] 마감 시간({deadline}초) 초과: {pending}개 후보는 추정 점수({estimated_travel_score})로 대체합니다.")
             
     # [ ★★★ 4. 서버 다운 감지 로직 추가 ★★★ ]
-    # (모든 점수가 0점이고, 그 중 하나라도 실패(Exception)가 있었다면 -> 서버 다운으로 간주)
-    if any_failures and all(s == 0.0 for s in travel_scores) and not candidate_df.empty:
+    # (추정치를 제외한 모든 점수가 0점이고, 실패 또는 시간 초과가 있었다면 -> 서버 다운으로 간주)
+    exact_scores = travel_scores[~travel_estimated]
+    if (any_failures or pending) and np.all(exact_scores == 0.0) and not candidate_df.empty:
         print("[치명적 오류] GraphHopper 서버가 다운되었거나 모든 요청이 실패했습니다. Fallback을 위해 오류를 발생시킵니다.")
         raise GraphHopperDownError("GraphHopper server is unreachable or all requests failed.")
         
+    return _combine_scores(candidate_df, travel_scores, travel_estimated, user_price_prefs, weights)
+
+def _combine_scores(
+    candidate_df: pd.DataFrame,
+    travel_scores: np.ndarray,
+    travel_estimated: np.ndarray,
+    user_price_prefs: List[str],
+    weights: Dict[str, float]
+) -> pd.DataFrame:
+    """ 이동 점수 + 나머지 3가지 점수를 합산해 final_score 내림차순 DataFrame 반환 """
     candidate_df['score_travel'] = travel_scores
+    candidate_df['travel_estimated'] = travel_estimated
     
     # ... (이하 2, 3, 4번 점수 계산 및 final_score 계산 로직은 기존과 동일) ...
     
@@ -185,19 +384,7 @@ async def calculate_final_scores_async(
     
     # --- 4/4. 가격 일치도 ---
     print("4/4. 가격 일치도 계산 중...")
-    if not user_price_prefs:
-        candidate_df['score_price'] = 0.0
-    else:
-        # 'price' 컬럼이 없거나, NaN인 경우를 대비하여 .get(col, default) 사용 안 함
-        def get_price_score(row):
-            if 'price' not in row or pd.isna(row['price']):
-                return 0.0
-            # (참고) 'price' 컬럼은 '$' 또는 '$$' 형태여야 함
-            if row['price'] in user_price_prefs:
-                return 1.0
-            return 0.0
-            
-        candidate_df['score_price'] = candidate_df.apply(get_price_score, axis=1)
+    candidate_df['score_price'] = _price_match_scores(candidate_df, user_price_prefs)
 
     # --- 최종 점수 합산 ---
     print("--- 최종 점수 합산 및 정렬 중 ---")
@@ -212,4 +399,123 @@ async def calculate_final_scores_async(
     
     final_scored_df = candidate_df.sort_values(by='final_score', ascending=False)
     
-    return final_scored_df
\ No newline at end of file
+    return final_scored_df
+
+def estimate_final_scores(
+    candidate_df: pd.DataFrame,
+    user_price_prefs: List[str],
+    weights: Dict[str, float] = None,
+    estimated_travel_score: float = 0.5
+) -> pd.DataFrame:
+    """
+    라우팅 없이 이동 점수를 estimated_travel_score로 채워 합산 (travel_estimated=True)
+    (스트리밍 chunk의 라우팅이 실패했을 때 후보를 빼지 않고 추정 점수로 유지)
+    """
+    n = len(candidate_df)
+    return _combine_scores(
+        candidate_df, np.full(n, estimated_travel_score, dtype=np.float64), np.ones(n, dtype=bool),
+        user_price_prefs, weights or DEFAULT_WEIGHTS
+    )
+
+async def iter_final_scores_async(
+    candidate_df: pd.DataFrame,
+    user_start_location: str,
+    user_price_prefs: List[str],
+    async_http_client: httpx.AsyncClient,
+    graphhopper_url: str,
+    chunk_size: int = 10,
+    failed_ids: List[str] = None,
+    **scorer_kwargs
+):
+    """
+    (스트리밍용) 후보군을 chunk_size개씩 나눠 calculate_final_scores_async로 점수를 매기고,
+    chunk가 끝날 때마다 지금까지 점수가 매겨진 후보 전체를 final_score 순으로 yield 합니다.
+    - 동시에 처리하는 chunk 수를 max_concurrency(와 top_k) 기준으로 제한 -> 전체 동시 호출 수는 일반 호출과 같음
+      (chunk마다 max_concurrency를 나누지 않음)
+    - top_k 지정 시 chunk 단위 Threshold Algorithm: 상한(이동 점수 1.0 가정)이 높은 후보부터 chunk를 만들고,
+      끝난 chunk들의 k번째 확정 점수가 다음 chunk의 최대 상한 이상이면 남은 chunk는 라우팅 없이
+      estimated_travel_score로 채움 (일반 호출과 같은 top_k, chunk 안에서는 조기 종료하지 않음)
+    - 실패한 chunk(GraphHopperDownError 등)는 estimate_final_scores로 추정 점수를 채워 포함
+      (결과 후보 집합은 일반 호출과 같음, failed_ids를 넘기면 해당 식당 id를 추가)
+    - 시작한 chunk가 모두 실패하면 마지막 오류를 다시 발생 (일반 호출의 GraphHopperDownError와 같은 Fallback)
+    """
+    top_k = scorer_kwargs.pop('top_k', None)
+    weights = scorer_kwargs.get('weights') or DEFAULT_WEIGHTS
+    estimated_travel_score = scorer_kwargs.get('estimated_travel_score', 0.5)
+    upper_bounds = None
+    if top_k is not None and len(candidate_df) > top_k:
+        static_scores = _static_scores(candidate_df, user_price_prefs, weights)
+        order = np.argsort(-static_scores, kind='stable')
+        candidate_df = candidate_df.iloc[order]
+        upper_bounds = static_scores[order] + weights['travel'] * 1.0 # (정렬된 후보 i의 상한)
+
+    chunks = [candidate_df.iloc[i:i + chunk_size].copy() for i in range(0, len(candidate_df), chunk_size)]
+    # (동시에 라우팅하는 후보 수 ~ 일반 호출의 batch_size와 같게)
+    max_concurrency = scorer_kwargs.get('max_concurrency') or 0
+    batch_size = max(top_k, max_concurrency) if upper_bounds is not None else max_concurrency
+    max_in_flight = max(1, -(-batch_size // chunk_size)) if batch_size else max(len(chunks), 1)
+
+    async def score_chunk(chunk: pd.DataFrame):
+        """ -> (chunk, 점수 DataFrame 또는 None, 오류 또는 None) """
+        try:
+            scored = await calculate_final_scores_async(
+                chunk, user_start_location, user_price_prefs, async_http_client, graphhopper_url,
+                **scorer_kwargs
+            )
+            return chunk, scored, None
+        except Exception as e:
+            return chunk, None, e
+
+    scored_parts = []
+    in_flight = set()
+    next_chunk = 0
+    n_failed = 0
+    last_error = None
+
+    def top_k_settled() -> bool:
+        """ 끝난 chunk들의 k번째 확정(라우팅) 점수 >= 다음 chunk의 최대 상한 """
+        if upper_bounds is None or next_chunk >= len(chunks) or not scored_parts:
+            return False
+        exact_finals = np.concatenate([
+            part['final_score'].to_numpy(dtype=np.float64)[~part['travel_estimated'].to_numpy(dtype=bool)]
+            for part in scored_parts
+        ])
+        if len(exact_finals) < top_k:
+            return False
+        kth_best = -np.partition(-exact_finals, top_k - 1)[top_k - 1]
+        return kth_best >= upper_bounds[next_chunk * chunk_size]
+
+    try:
+        while True:
+            while next_chunk < len(chunks) and len(in_flight) < max_in_flight and not top_k_settled():
+                in_flight.add(asyncio.ensure_future(score_chunk(chunks[next_chunk])))
+                next_chunk += 1
+            if not in_flight:
+                break
+
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                chunk, scored, error = task.result()
+                if error is not None:
+                    print(f"[경고] 스트리밍 chunk 스코어링 실패, 추정 점수로 대체 ({len(chunk)}개): {error}")
+                    n_failed += 1
+                    last_error = error
+                    if failed_ids is not None:
+                        failed_ids.extend(chunk.index.astype(str).tolist())
+                    scored = estimate_final_scores(chunk, user_price_prefs, weights, estimated_travel_score)
+                scored_parts.append(scored)
+            yield pd.concat(scored_parts).sort_values(by='final_score', ascending=False)
+    finally:
+        # (클라이언트 연결이 끊기면 남은 chunk를 취소)
+        for task in in_flight:
+            task.cancel()
+
+    if next_chunk and n_failed == next_chunk:
+        raise last_error
+
+    # (조기 종료로 라우팅하지 않은 chunk: top_k에 들 수 없음 -> 추정 점수로 채워 후보 집합 유지)
+    if next_chunk < len(chunks):
+        skipped = pd.concat(chunks[next_chunk:])
+        print(f"  > [조기 종료] 스트리밍 chunk {next_chunk}/{len(chunks)}개 후 top_{top_k} 확정 (생략 {len(skipped)}개)")
+        scored_parts.append(estimate_final_scores(skipped, user_price_prefs, weights, estimated_travel_score))
+        yield pd.concat(scored_parts).sort_values(by='final_score', ascending=False)
@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Dict, Tuple
+
+# 출발 시각 버킷 + 경로 결과 캐시 (LRU + TTL)
+# - 출발 시각은 (평일/주말, bucket_minutes 단위 시간대)로 양자화합니다.
+# - 캐시 키: (반올림한 출발지 좌표, 목적지 식당 id, 출발 시각 버킷)
+
+SERVICE_TZ = timezone(timedelta(hours=9)) # (한국 표준시, 서머타임 없음)
+
+
+def quantize_departure(
+    departure_time: datetime = None,
+    bucket_minutes: int = 30,
+    reference_dates: Dict[str, str] = None
+) -> Tuple[str, datetime]:
+    """
+    출발 시각을 버킷으로 양자화합니다. -> (버킷 키, 라우터에 보낼 대표 출발 시각)
+    - departure_time이 없으면 현재 시각, tz 정보가 없으면 한국 시각으로 간주
+    - reference_dates({"weekday": "YYYY-MM-DD", "weekend": ...})가 있으면
+      대표 출발 시각의 날짜를 그 날로 고정 (GTFS 운행 기간 안의 날짜를 쓰기 위함)
+    예: 2025-11-14(금) 12:47 -> ("weekday-12:30", 2024-01-03 12:30+09:00)
+    """
+    if departure_time is None:
+        departure_time = datetime.now(SERVICE_TZ)
+    elif departure_time.tzinfo is None:
+        departure_time = departure_time.replace(tzinfo=SERVICE_TZ)
+    else:
+        departure_time = departure_time.astimezone(SERVICE_TZ)
+
+    day_type = "weekend" if departure_time.weekday() >= 5 else "weekday"
+    slot_minutes = (departure_time.hour * 60 + departure_time.minute) // bucket_minutes * bucket_minutes
+    bucket_key = f"{day_type}-{slot_minutes // 60:02d}:{slot_minutes % 60:02d}"
+
+    if reference_dates and day_type in reference_dates:
+        slot_date = date.fromisoformat(reference_dates[day_type])
+    else:
+        slot_date = departure_time.date()
+
+    representative = datetime(
+        slot_date.year, slot_date.month, slot_date.day,
+        slot_minutes // 60, slot_minutes % 60, tzinfo=SERVICE_TZ
+    )
+    return bucket_key, representative
+
+
+def round_coords(coords: str, ndigits: int = 3) -> str:
+    """ '37.56301,126.98297' -> '37.563,126.983' (소수 3자리 = 약 100m) """
+    lat_str, lon_str = str(coords).split(",")
+    return f"{round(float(lat_str), ndigits)},{round(float(lon_str), ndigits)}"
+
+
+class RouteCache:
+    """ 프로세스 내 LRU + TTL 캐시 (값: 목적지 1곳의 경로 리스트) """
+
+    def __init__(self, maxsize: int = 20000, ttl_seconds: float = 6 * 3600):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict() # (key -> (만료 시각, 값))
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Any:
+        item = self._items.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._items[key]
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key, value):
+        self._items[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -0,0 +1,378 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List, Dict
+
+import httpx
+import numpy as np
+
+from .circuit_breaker import CircuitBreaker
+from .route_cache import SERVICE_TZ
+
+# 2단계 '이동 마찰 점수'용 라우팅 백엔드 (출발지 1곳 -> 목적지 N곳)
+# route_one_to_many()는 목적지별 경로 지표를 한 번에 돌려줍니다.
+#
+# 반환 형식 (numpy 배열 dict)
+# - 'time', 'transfers', 'distance', 'group' : 경로(대안 경로 포함)별 지표 / 소속 목적지 위치
+#   (GraphHopper path의 time(ms) / transfers / distance(m, 도보) 와 같은 단위)
+# - 'status' : 목적지별 상태 (ROUTE_OK / ROUTE_FAILED / ROUTE_PENDING)
+
+ROUTE_OK = 0
+ROUTE_FAILED = 1   # (호출 실패)
+ROUTE_PENDING = 2  # (마감 시간까지 응답 없음)
+
+DEFAULT_DEPARTURE_TIME = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc) # (출발 시각 미지정 시)
+
+
+def paths_to_arrays(paths_per_group: List[List[dict]]):
+    """
+    목적지별 GraphHopper 경로 리스트를 score_paths_batch 입력 배열 4개로 펼칩니다.
+    (time_ms, transfers, walk_meters, group_index)
+    """
+    flat = [(path, g) for g, paths in enumerate(paths_per_group) for path in paths]
+    time_ms = np.array([p.get('time', 0) for p, _ in flat], dtype=np.float64)
+    transfers = np.array([p.get('transfers', 0) for p, _ in flat], dtype=np.float64)
+    walk_meters = np.array([p.get('distance', 0) for p, _ in flat], dtype=np.float64)
+    group_index = np.array([g for _, g in flat], dtype=np.int64)
+    return time_ms, transfers, walk_meters, group_index
+
+
+def split_paths_by_group(routes: Dict[str, np.ndarray], n_groups: int) -> List[List[dict]]:
+    """ route_one_to_many() 결과를 목적지별 경로 리스트로 되돌립니다. (paths_to_arrays의 역변환) """
+    paths_per_group = [[] for _ in range(n_groups)]
+    for t, n, d, g in zip(
+        routes['time'].tolist(), routes['transfers'].tolist(),
+        routes['distance'].tolist(), routes['group'].tolist()
+    ):
+        paths_per_group[g].append({'time': t, 'transfers': n, 'distance': d})
+    return paths_per_group
+
+
+def _parse_coords(coords: str):
+    lat_str, lon_str = str(coords).split(",")
+    return float(lat_str.strip()), float(lon_str.strip())
+
+
+async def request_graphhopper_paths(
+    async_http_client: httpx.AsyncClient,
+    graphhopper_url: str,
+    from_coords: str,
+    to_coords: str,
+    timeout: float = 10.0,
+    departure_time: datetime = None
+) -> List[dict]:
+    """ GraphHopper /route (pt, 대안 경로 3개)를 호출하여 path 리스트를 반환 (try-except 없음) """
+    departure_utc = (departure_time or DEFAULT_DEPARTURE_TIME).astimezone(timezone.utc)
+    params = [
+        ('point', from_coords),
+        ('point', to_coords),
+        ('profile', 'pt'),
+        ('pt.earliest_departure_time', departure_utc.strftime("%Y-%m-%dT%H:%M:%SZ")),
+        ('algorithm', 'alternative_route'),
+        ('alternative_route.max_paths', '3')
+    ]
+
+    # (httpx.RequestError 등이 발생하면 호출한 쪽에서 잡도록 둡니다)
+    response = await async_http_client.get(graphhopper_url, params=params, timeout=timeout)
+    response.raise_for_status() # (4xx, 5xx 오류 시 예외 발생)
+    data = response.json()
+    return data.get('paths', [])
+
+
+class RoutingBackend:
+    """ 라우팅 백엔드 공통 인터페이스 """
+    name = "base"
+    exact = True # (False: 실제 경로 탐색이 아닌 추정치 -> 결과에 'estimated': True)
+
+    async def route_one_to_many(
+        self,
+        origin: str,
+        destinations: List[str],
+        deadline: float = None,
+        departure_time: datetime = None
+    ) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+
+class HttpFanOutBackend(RoutingBackend):
+    """
+    목적지별 HTTP 호출을 동시 호출 상한/마감 시간 안에서 보내는 백엔드 공통 부분.
+    (하위 클래스는 fetch_paths()만 구현: 목적지 1곳의 경로 리스트를 GraphHopper path 형식으로 반환)
+    """
+
+    def __init__(self, async_http_client: httpx.AsyncClient, max_concurrency: int = None, request_timeout: float = 10.0):
+        self.async_http_client = async_http_client
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+
+    async def fetch_paths(self, origin: str, to_coords: str, departure_time: datetime = None) -> List[dict]:
+        raise NotImplementedError
+
+    async def route_one_to_many(self, origin, destinations, deadline=None, departure_time=None):
+        # (동시 호출 상한: 세마포어로 한 번에 max_concurrency개까지만 보냄)
+        semaphore = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+
+        async def bounded_paths(to_coords: str) -> List[dict]:
+            if semaphore is None:
+                return await self.fetch_paths(origin, to_coords, departure_time)
+            async with semaphore:
+                return await self.fetch_paths(origin, to_coords, departure_time)
+
+        tasks = [asyncio.ensure_future(bounded_paths(dest)) for dest in destinations]
+
+        # 개별 작업이 실패해도 중단하지 않고, deadline이 지나면 남은 작업만 취소합니다.
+        pending = set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        status = np.full(len(destinations), ROUTE_OK, dtype=np.int8)
+        paths_per_group = []
+        for i, task in enumerate(tasks):
+            if task in pending:
+                status[i] = ROUTE_PENDING
+                paths_per_group.append([])
+            elif task.exception() is not None:
+                print(f"Error: {self.name} API 요청 실패 (목적지: {destinations[i]}): {task.exception()}")
+                status[i] = ROUTE_FAILED
+                paths_per_group.append([])
+            else:
+                paths_per_group.append(task.result())
+
+        time_ms, transfers, walk_meters, group_index = paths_to_arrays(paths_per_group)
+        return {
+            'time': time_ms, 'transfers': transfers, 'distance': walk_meters,
+            'group': group_index, 'status': status,
+        }
+
+
+class GraphHopperBackend(HttpFanOutBackend):
+    """
+    GraphHopper /route 기반 백엔드.
+    (GraphHopper의 pt 프로필은 1:N 행렬 API가 없으므로, 동시 호출 상한을 둔 N회 호출로 처리)
+    """
+    name = "graphhopper"
+
+    def __init__(
+        self,
+        async_http_client: httpx.AsyncClient,
+        graphhopper_url: str,
+        max_concurrency: int = None,
+        request_timeout: float = 10.0
+    ):
+        super().__init__(async_http_client, max_concurrency, request_timeout)
+        self.graphhopper_url = graphhopper_url
+
+    async def fetch_paths(self, origin, to_coords, departure_time=None):
+        return await request_graphhopper_paths(
+            self.async_http_client, self.graphhopper_url, origin, to_coords,
+            self.request_timeout, departure_time
+        )
+
+
+class OTPBackend(HttpFanOutBackend):
+    """
+    OpenTripPlanner /plan 기반 백엔드 (Back/otp/otp_server.py와 같은 OTP 서버).
+    itinerary의 duration(초) / transfers / walkDistance(m)를 GraphHopper path 형식으로 변환합니다.
+    """
+    name = "otp"
+
+    def __init__(
+        self,
+        async_http_client: httpx.AsyncClient,
+        otp_url: str,
+        max_concurrency: int = None,
+        request_timeout: float = 10.0,
+        num_itineraries: int = 3,
+        local_tz: timezone = SERVICE_TZ
+    ):
+        super().__init__(async_http_client, max_concurrency, request_timeout)
+        self.otp_url = otp_url
+        self.num_itineraries = num_itineraries
+        self.local_tz = local_tz
+
+    async def fetch_paths(self, origin, to_coords, departure_time=None):
+        # (OTP의 date/time은 서버(GTFS) 현지 시각 기준)
+        departure_local = (departure_time or DEFAULT_DEPARTURE_TIME).astimezone(self.local_tz)
+        params = {
+            "fromPlace": origin,
+            "toPlace": to_coords,
+            "mode": "TRANSIT,WALK",
+            "date": departure_local.strftime("%Y-%m-%d"),
+            "time": departure_local.strftime("%H:%M"),
+            "numItineraries": self.num_itineraries,
+        }
+        response = await self.async_http_client.get(self.otp_url, params=params, timeout=self.request_timeout)
+        response.raise_for_status()
+        plan = response.json().get('plan') or {}
+        return [
+            {
+                'time': itinerary.get('duration', 0) * 1000,
+                'transfers': itinerary.get('transfers', 0),
+                'distance': itinerary.get('walkDistance', 0),
+            }
+            for itinerary in plan.get('itineraries', [])
+        ]
+
+
+class LocalTransitEstimator(RoutingBackend):
+    """
+    (로컬 테스트용 / 프로세스 내 구현)
+    직선 거리 + 속도 모델로 모든 목적지의 시간/환승/도보 거리를 한 번의 벡터 연산으로 추정합니다.
+    - 가까운 곳(walk_only_m 이하)은 도보만, 그 외는 대중교통 1회 탑승 + 거리 구간별 환승 가정
+    """
+    name = "local"
+    exact = False
+
+    def __init__(
+        self,
+        walk_speed_m_per_min: float = 75.0,     # (약 4.5km/h)
+        transit_speed_m_per_min: float = 400.0, # (약 24km/h, 정차 포함)
+        detour_factor: float = 1.3,             # (직선 거리 -> 실제 경로 거리 보정)
+        walk_only_m: float = 800.0,
+        access_walk_m: float = 600.0,           # (정류장/역 접근 + 하차 후 도보 합계)
+        wait_min: float = 5.0,
+        transfer_bands_m=(5000.0, 12000.0)      # (이 거리 이하 환승 0회 / 1회, 초과 시 2회)
+    ):
+        self.walk_speed = walk_speed_m_per_min
+        self.transit_speed = transit_speed_m_per_min
+        self.detour_factor = detour_factor
+        self.walk_only_m = walk_only_m
+        self.access_walk_m = access_walk_m
+        self.wait_min = wait_min
+        self.transfer_bands_m = transfer_bands_m
+
+    async def route_one_to_many(self, origin, destinations, deadline=None, departure_time=None):
+        # (출발 시각은 속도 모델에 반영하지 않음)
+        # (순환 임포트 방지: spatial_index는 APIserver 루트 모듈)
+        from spatial_index import haversine_m
+
+        n = len(destinations)
+        lat, lon = _parse_coords(origin)
+        dest_coords = np.array([_parse_coords(d) for d in destinations], dtype=np.float64).reshape(n, 2)
+        route_m = haversine_m(lat, lon, dest_coords[:, 0], dest_coords[:, 1]) * self.detour_factor
+
+        walk_only = route_m <= self.walk_only_m
+        n_transfers = np.searchsorted(np.asarray(self.transfer_bands_m), route_m, side="left").astype(np.float64)
+
+        walk_meters = np.where(walk_only, route_m, self.access_walk_m)
+        ride_min = np.where(walk_only, 0.0, np.maximum(route_m - self.access_walk_m, 0) / self.transit_speed)
+        wait_min = np.where(walk_only, 0.0, self.wait_min * (1 + n_transfers))
+        time_min = walk_meters / self.walk_speed + ride_min + wait_min
+
+        status = np.where(np.isnan(route_m), ROUTE_FAILED, ROUTE_OK).astype(np.int8)
+        ok = status == ROUTE_OK
+        return {
+            'time': (time_min * 60 * 1000)[ok],
+            'transfers': np.where(walk_only, 0.0, n_transfers)[ok],
+            'distance': walk_meters[ok],
+            'group': np.arange(n, dtype=np.int64)[ok],
+            'status': status,
+            'estimated': True,
+        }
+
+
+class RoutingBackendSelector(RoutingBackend):
+    """
+    여러 백엔드(GraphHopper, OTP, 로컬 추정기) 중 요청마다 하나를 고릅니다.
+    - 서킷 브레이커가 막힌 백엔드는 건너뜀 (health)
+    - 실제 경로 탐색 백엔드(exact)를 우선하고, 그 안에서는 측정된 평균 지연(EWMA)이 짧은 순
+    - 선택한 백엔드가 한 목적지도 경로를 못 찾으면(실패 / 마감 시간 초과) 다음 백엔드로 넘어감
+      (로컬 추정기는 backends에 넣은 경우에만 마지막 수단)
+    - 마감 시간 배분: 뒤에 다른 백엔드가 남아 있으면 남은 시간의 budget_fraction만 쓰고 나머지는 대체 백엔드 몫
+      (남은 시간이 min_http_budget보다 짧으면 HTTP 백엔드는 호출 없이 건너뜀 -> 즉시 전부 ROUTE_PENDING 방지)
+    """
+    name = "auto"
+
+    def __init__(
+        self,
+        backends: List[RoutingBackend],
+        breakers: Dict[str, CircuitBreaker],
+        async_http_client: httpx.AsyncClient,
+        latency_alpha: float = 0.3,
+        budget_fraction: float = 0.6,
+        min_http_budget: float = 0.5
+    ):
+        self.backends = backends
+        self.breakers = breakers
+        self.async_http_client = async_http_client
+        self.latency_alpha = latency_alpha
+        self.budget_fraction = budget_fraction
+        self.min_http_budget = min_http_budget
+        self.latency_ms = {backend.name: None for backend in backends} # (목적지 1곳당 평균 지연)
+
+    def ranked_backends(self) -> List[RoutingBackend]:
+        def sort_key(item):
+            order, backend = item
+            latency = self.latency_ms.get(backend.name)
+            return (not backend.exact, float('inf') if latency is None else latency, order)
+        return [backend for _, backend in sorted(enumerate(self.backends), key=sort_key)]
+
+    def _record_latency(self, name: str, per_destination_ms: float):
+        previous = self.latency_ms.get(name)
+        if previous is None:
+            self.latency_ms[name] = per_destination_ms
+        else:
+            self.latency_ms[name] = (1 - self.latency_alpha) * previous + self.latency_alpha * per_destination_ms
+
+    async def route_one_to_many(self, origin, destinations, deadline=None, departure_time=None):
+        started = time.monotonic()
+        last_routes = None
+
+        ranked = self.ranked_backends()
+        for position, backend in enumerate(ranked):
+            remaining = None if deadline is None else max(deadline - (time.monotonic() - started), 0.0)
+            if remaining is not None and remaining < self.min_http_budget and isinstance(backend, HttpFanOutBackend):
+                print(f"[라우팅] 남은 마감 시간({remaining:.2f}초) 부족 -> '{backend.name}' 백엔드 건너뜀")
+                continue
+
+            breaker = self.breakers.get(backend.name)
+            if breaker is not None and not await breaker.allow_request(self.async_http_client):
+                continue
+
+            # (뒤에 대체 백엔드가 남아 있으면 남은 시간을 다 쓰지 않음)
+            budget = remaining
+            if remaining is not None and position < len(ranked) - 1:
+                budget = remaining * self.budget_fraction
+            call_started = time.monotonic()
+            routes = await backend.route_one_to_many(
+                origin, destinations, deadline=budget, departure_time=departure_time
+            )
+            elapsed_ms = (time.monotonic() - call_started) * 1000
+
+            status = routes['status']
+            if breaker is not None:
+                breaker.record(int((status == ROUTE_OK).sum()), int((status != ROUTE_OK).sum()))
+
+            # (마감 시간 초과(ROUTE_PENDING)도 실패로 간주: 응답 없는 백엔드에 매 요청 마감 시간 전체를 쓰지 않음)
+            if len(destinations) and not np.any(status == ROUTE_OK):
+                print(f"[라우팅] '{backend.name}' 백엔드 전체 실패/시간 초과 -> 다음 백엔드로 전환")
+                last_routes = routes
+                continue
+
+            self._record_latency(backend.name, elapsed_ms / max(len(destinations), 1))
+            routes['backend'] = backend.name
+            print(f"[라우팅] '{backend.name}' 백엔드 사용 ({elapsed_ms:.0f}ms, 목적지 {len(destinations)}곳)")
+            return routes
+
+        if last_routes is not None:
+            return last_routes
+        # (모든 백엔드가 막혀 있음 -> 전부 실패로 반환, 스코어러가 Fallback 처리)
+        return {
+            'time': np.array([]), 'transfers': np.array([]), 'distance': np.array([]),
+            'group': np.array([], dtype=np.int64),
+            'status': np.full(len(destinations), ROUTE_FAILED, dtype=np.int8),
+        }
+
+    def snapshot(self) -> dict:
+        """ 상태 조회용 (백엔드별 서킷 상태 / 평균 지연) """
+        return {
+            backend.name: {
+                "exact": backend.exact,
+                "latency_ms_per_destination": self.latency_ms.get(backend.name),
+                "circuit": self.breakers[backend.name].snapshot() if backend.name in self.breakers else None,
+            }
+            for backend in self.backends
+        }
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+
+# 출발지 x 식당 '이동 마찰 점수' 사전 계산 행렬
+# - 값: float32 (0~1), 계산 실패/미계산 칸은 NaN
+# - 행: 출발지 좌표 문자열 (config.LOCATION_COORDS의 값)
+# - 열: 식당 id (all_restaurants_df_scoring의 인덱스)
+# (build_travel_matrix.py가 .npy + .json 메타 파일 2개를 생성합니다)
+# (메타의 matrix_sha1로 두 파일이 같은 빌드인지 확인: 재빌드 도중 새 행렬 + 이전 메타 조합은 로드 거부)
+
+
+def normalize_coords(coords: str) -> str:
+    """ '37.5665, 126.9780' 과 '37.5665,126.9780'을 같은 키로 취급합니다. """
+    return ",".join(part.strip() for part in str(coords).split(","))
+
+
+def file_sha1(path: str) -> str:
+    """ 행렬 파일 내용 해시 (행렬은 출발지 수 x 식당 수 float32라 작음) """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TravelMatrix:
+    """
+    메모리 맵(.npy)으로 연 이동 마찰 점수 행렬.
+    lookup()은 HTTP 호출 없이 후보군 전체의 점수를 한 번에 반환합니다.
+    """
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        origins: List[str],
+        restaurant_ids: List[str],
+        departure_bucket: str = None,
+        build_id: str = None
+    ):
+        self.scores = scores
+        self.origin_pos = {normalize_coords(o): i for i, o in enumerate(origins)}
+        self.id_pos = {str(rid): j for j, rid in enumerate(restaurant_ids)}
+        self.departure_bucket = departure_bucket # (빌드 시 출발 시각 버킷, None이면 모든 버킷에 사용)
+        self.build_id = build_id
+
+    def covers(self, departure_bucket: str) -> bool:
+        """ 요청의 출발 시각 버킷에 이 행렬을 써도 되는지 """
+        return self.departure_bucket is None or self.departure_bucket == departure_bucket
+
+    @classmethod
+    def load(cls, matrix_path: str, meta_path: str) -> Optional["TravelMatrix"]:
+        """
+        행렬 파일이 없으면 None (GraphHopper 실시간 호출만 사용)
+        행렬과 메타가 같은 빌드가 아니면 ValueError (matrix_sha1 / 크기 불일치)
+        """
+        if not os.path.exists(matrix_path) or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("matrix_sha1") and file_sha1(matrix_path) != meta["matrix_sha1"]:
+            raise ValueError(
+                f"행렬 파일이 메타 정보(build_id={meta.get('build_id')})와 다른 빌드입니다 "
+                "(재빌드 진행 중이거나 파일 하나만 교체됨)"
+            )
+        scores = np.load(matrix_path, mmap_mode="r")
+        if scores.shape != (len(meta["origins"]), len(meta["restaurant_ids"])):
+            raise ValueError(
+                f"행렬 크기 {scores.shape}가 메타 정보와 다릅니다 "
+                f"({len(meta['origins'])} x {len(meta['restaurant_ids'])})"
+            )
+        return cls(
+            scores, meta["origins"], meta["restaurant_ids"], meta.get("departure_bucket"), meta.get("build_id")
+        )
+
+    def lookup(self, origin_coords: str, restaurant_ids: List[str]) -> np.ndarray:
+        """
+        (origin, 식당 id) 쌍의 점수 배열을 반환합니다.
+        행렬에 없는 출발지/식당, 또는 빌드 시 실패한 칸은 NaN (= miss) 입니다.
+        """
+        result = np.full(len(restaurant_ids), np.nan, dtype=np.float32)
+        row = self.origin_pos.get(normalize_coords(origin_coords))
+        if row is None:
+            return result
+
+        cols = np.array([self.id_pos.get(str(rid), -1) for rid in restaurant_ids], dtype=np.int64)
+        found = cols >= 0
+        if found.any():
+            result[found] = self.scores[row, cols[found]]
+        return result
@@ -4,14 +4,17 @@ import sys
 import os
 import json
 import asyncio
+import hmac
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 import pandas as pd
 from deep_translator import GoogleTranslator
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 # APIserver 디렉토리를 Python 경로에 추가
@@ -21,9 +24,15 @@ sys.path.insert(0, api_server_path)
 # 모듈 임포트
 import config
 import data_loader
+import data_snapshot
 import llm_utils
 import search_logic
 from API import final_scorer
+from API import routing_backends
+from API.circuit_breaker import CircuitBreaker
+from API.route_cache import RouteCache
+from data_snapshot import DataReloader
+from startup import AssetWarmup
 from models import RecommendationRequest, RecommendationResponse
 
 # --- Pydantic Models ---
@@ -56,6 +65,7 @@ class RecommendationGenerateRequest(BaseModel):
     profile: Dict[str, Any]
     top_k: int = 10
     weights: Optional[Dict[str, float]] = None
+    departure_time: Optional[datetime] = None # (출발 시각, 미지정 시 현재 시각)
 
 class RecommendationGenerateResponse(BaseModel):
     """추천 생성 응답"""
@@ -109,18 +119,11 @@ def budget_mapper(budget_str: str) -> List[str]:
     else:
         return ['$', '$$', '$$$', '$$$$']
 
-LOCATION_COORDS = {
-    "명동역": "37.5630,126.9830",
-    "홍대입구역": "37.5570,126.9244",
-    "강남역": "37.4980,127.0276",
-    "서울역": "37.5547,126.9704",
-    "서울시청": "37.5665,126.9780",
-    "시청역": "37.5658,126.9772",
-}
+LOCATION_COORDS = config.LOCATION_COORDS
 
 def get_start_location_coords(location_name: str) -> str:
     """장소 이름을 좌표 문자열로 변환"""
-    return LOCATION_COORDS.get(location_name, "37.5630,126.9830")
+    return LOCATION_COORDS.get(location_name, config.DEFAULT_START_COORDS)
 
 # --- FastAPI 앱 및 Lifespan ---
 
@@ -136,38 +139,123 @@ async def lifespan(app: FastAPI):
         print("  > OpenAI API 키 로드 완료.")
 
     # 2. GraphHopper 연결용 HTTP 클라이언트 생성
-    app.state.http_client = httpx.AsyncClient()
+    app.state.http_client = final_scorer.create_graphhopper_client(
+        max_connections=config.GRAPH_HOPPER_MAX_CONNECTIONS,
+        max_keepalive_connections=config.GRAPH_HOPPER_MAX_KEEPALIVE,
+        keepalive_expiry=config.GRAPH_HOPPER_KEEPALIVE_EXPIRY
+    )
     print("  > HTTPX AsyncClient 생성 완료.")
 
-    # 3. 모든 CSV 및 VectorDB 로드
-    try:
-        data_loader.load_app_data(
-            config.RESTAURANT_DB_FILE,
-            config.MENU_DB_FILE
+    # (GraphHopper 서킷 브레이커: 모든 요청이 공유)
+    app.state.graphhopper_breaker = CircuitBreaker(
+        "graphhopper",
+        health_check_url=config.GRAPH_HOPPER_HEALTH_CHECK_URL,
+        failure_rate_threshold=config.CIRCUIT_FAILURE_RATE_THRESHOLD,
+        min_calls=config.CIRCUIT_MIN_CALLS,
+        window_size=config.CIRCUIT_WINDOW_SIZE,
+        recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT
+    )
+
+    # (경로 결과 캐시: 출발지 근처 x 식당 x 출발 시각 버킷, 모든 요청이 공유)
+    app.state.route_cache = RouteCache(
+        maxsize=config.ROUTE_CACHE_MAXSIZE,
+        ttl_seconds=config.ROUTE_CACHE_TTL_SECONDS
+    )
+
+    # (라우팅 백엔드: None이면 스코어러가 GraphHopperBackend + graphhopper_breaker를 사용)
+    app.state.routing_backend = None
+    if config.ROUTING_BACKEND == "local":
+        app.state.routing_backend = routing_backends.LocalTransitEstimator()
+        print("  > [로컬 테스트] 라우팅 백엔드: LocalTransitEstimator")
+    elif config.ROUTING_BACKEND == "auto":
+        otp_breaker = CircuitBreaker(
+            "otp",
+            health_check_url=config.OTP_HEALTH_CHECK_URL,
+            failure_rate_threshold=config.CIRCUIT_FAILURE_RATE_THRESHOLD,
+            min_calls=config.CIRCUIT_MIN_CALLS,
+            window_size=config.CIRCUIT_WINDOW_SIZE,
+            recovery_timeout=config.CIRCUIT_RECOVERY_TIMEOUT
         )
-        data_loader.load_user_ratings()
-        data_loader.build_vector_db(
-            config.RESTAURANT_DB_FILE,
-            config.PROFILE_DB_FILE,
-            config.CLEAR_DB_AND_REBUILD
+        # (로컬 추정기는 절대 실패하지 않아 GraphHopperDownError -> RAG-only Fallback이 막히므로 명시적으로 켤 때만 포함)
+        local_fallback = [routing_backends.LocalTransitEstimator()] if config.ROUTING_AUTO_LOCAL_FALLBACK else []
+        app.state.routing_backend = routing_backends.RoutingBackendSelector(
+            backends=[
+                routing_backends.GraphHopperBackend(
+                    app.state.http_client, config.GRAPH_HOPPER_API_URL,
+                    max_concurrency=config.GRAPH_HOPPER_MAX_CONCURRENCY,
+                    request_timeout=config.GRAPH_HOPPER_REQUEST_TIMEOUT
+                ),
+                routing_backends.OTPBackend(
+                    app.state.http_client, config.OTP_API_URL,
+                    max_concurrency=config.GRAPH_HOPPER_MAX_CONCURRENCY,
+                    request_timeout=config.GRAPH_HOPPER_REQUEST_TIMEOUT
+                ),
+                *local_fallback,
+            ],
+            breakers={"graphhopper": app.state.graphhopper_breaker, "otp": otp_breaker},
+            async_http_client=app.state.http_client,
+            budget_fraction=config.ROUTING_BACKEND_BUDGET_FRACTION,
+            min_http_budget=config.ROUTING_MIN_HTTP_BUDGET
         )
+        print(f"  > 라우팅 백엔드: auto (graphhopper -> otp{' -> local' if local_fallback else ''})")
 
+    # 3. 모든 CSV 및 VectorDB 로드 (백그라운드 워밍업: 서버는 바로 요청을 받고, 준비 상태는 /readyz)
+    def load_scoring():
         # 4. /recommendations API용 스코어링 DB 로드
         app.state.all_restaurants_df_scoring = data_loader.load_scoring_data(
             config.RESTAURANT_DB_SCORING_FILE
         )
+        return app.state.all_restaurants_df_scoring
+
+    def load_vector_index():
+        # (신규 구축 / 증분 동기화로 'restaurants'가 바뀌었거나 동기화가 중간에 실패했으면
+        #  저장된 .npz 대신 컬렉션에서 다시 내보냄, 그 외 불일치는 load_vector_index의 지문 비교)
+        restaurant_sync = data_loader.last_db_sync.get(config.RESTAURANT_COLLECTION_NAME, {})
+        return data_loader.load_vector_index(
+            rebuild=bool(
+                restaurant_sync.get("upserted") or restaurant_sync.get("deleted") or restaurant_sync.get("error")
+            )
+        ) is not None
+
+    # (워밍업 시작 전 원본 파일 mtime: 첫 스냅샷 기준, 로드 중 바뀐 파일은 감시 태스크가 리로드)
+    initial_sources = data_snapshot.source_mtimes()
+
+    warmup = AssetWarmup()
+    warmup.add("app_data", lambda: data_loader.load_app_data(config.RESTAURANT_DB_FILE, config.MENU_DB_FILE))
+    warmup.add("user_ratings", data_loader.load_user_ratings, required=False)
+    warmup.add("vector_db", lambda: data_loader.build_vector_db(
+        config.RESTAURANT_DB_FILE,
+        config.PROFILE_DB_FILE,
+        config.CLEAR_DB_AND_REBUILD,
+        sync=config.INCREMENTAL_DB_SYNC
+    ))
+    warmup.add("scoring_data", load_scoring)
+    warmup.add("travel_matrix", data_loader.load_travel_matrix, required=False)
+    warmup.add("metadata_index", lambda: data_loader.build_metadata_index() is not None, required=False)
+    if config.USE_NUMPY_VECTOR_INDEX:
+        warmup.add("vector_index", load_vector_index, required=False)
+    # (로드된 데이터셋 / 인덱스를 첫 스냅샷(v1)으로 발행 -> 요청 경로는 스냅샷만 읽음)
+    warmup.add("snapshot", lambda: data_snapshot.publish(data_snapshot.capture(1, initial_sources)))
+    app.state.warmup = warmup
+    warmup.start()
+
+    # (데이터 핫 리로드: 파일 변경 감시 태스크 + POST /api/admin/reload)
+    app.state.reloader = DataReloader()
+    app.state.reload_watch_task = None
+    if config.DATA_RELOAD_WATCH_INTERVAL_SECONDS:
+        app.state.reload_watch_task = asyncio.create_task(
+            app.state.reloader.watch(config.DATA_RELOAD_WATCH_INTERVAL_SECONDS)
+        )
 
-        print("  > 모든 데이터 로드 완료.")
-
-    except Exception as e:
-        print(f"[치명적 오류] 데이터 로드 실패: {e}")
-
-    print("--- 서버 시작 완료 ---")
+    print("--- 서버 시작 완료 (데이터 로드는 백그라운드 진행: /readyz) ---")
 
     yield
 
     # 서버 종료 시
     print("--- 서버 종료: Lifespan 종료 ---")
+    await app.state.warmup.stop()
+    if app.state.reload_watch_task is not None:
+        app.state.reload_watch_task.cancel()
     await app.state.http_client.aclose()
     print("  > HTTPX AsyncClient 종료.")
 
@@ -187,6 +275,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def require_ready():
+    """
+    데이터 자산이 필요한 엔드포인트용 의존성
+    워밍업 중이면 STARTUP_READY_WAIT_SECONDS까지 대기 후 처리, 그래도 준비 전이면 503 + Retry-After
+    준비되면 현재 데이터 스냅샷을 이 요청에 고정 (처리 중 리로드돼도 요청 끝까지 같은 스냅샷)
+    """
+    warmup = app.state.warmup
+    if await warmup.wait_ready(config.STARTUP_READY_WAIT_SECONDS):
+        data_snapshot.pin()
+        return
+    snapshot = warmup.snapshot()
+    detail = "서버 데이터 로드 실패" if snapshot["status"] == "failed" else "서버 준비 중 (데이터 로드 중)"
+    raise HTTPException(
+        status_code=503,
+        detail=detail,
+        headers={"Retry-After": str(config.STARTUP_RETRY_AFTER_SECONDS)}
+    )
+
 # --- API 엔드포인트 ---
 
 @app.get("/", tags=["Root"])
@@ -199,10 +305,28 @@ async def root():
             "/api/chat/init",
             "/api/chat/message",
             "/api/recommendations/generate",
+            "/api/recommendations/stream",
+            "/api/restaurants/nearby",
             "/api/restaurants/{restaurant_id}",
+            "/api/routing/status",
+            "/api/cache/status",
+            "/api/admin/reload",
+            "/healthz",
+            "/readyz",
         ]
     }
 
+@app.get("/healthz", tags=["Root"])
+async def healthz():
+    """프로세스 생존 확인 (데이터 로드 여부와 무관)"""
+    return {"status": "alive"}
+
+@app.get("/readyz", tags=["Root"])
+async def readyz():
+    """자산별 로드 상태 / 로드 시간. 준비 전이거나 필수 자산 로드 실패면 503"""
+    snapshot = app.state.warmup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["status"] == "ready" else 503)
+
 @app.post("/api/chat/init", response_model=ChatInitResponse, tags=["Chat Survey"])
 async def init_chat(request: ChatInitRequest):
     """
@@ -259,81 +383,119 @@ async def send_chat_message(request: ChatMessageRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"메시지 처리 실패: {str(e)}")
 
-@app.post("/api/recommendations/generate", response_model=RecommendationGenerateResponse, tags=["Recommendations"])
-async def generate_recommendations(request: RecommendationGenerateRequest):
+def _generate_candidates(profile: Dict[str, Any]):
     """
-    프로필 기반 맞춤 추천
-    1단계: RAG 검색으로 후보군 생성
-    2단계: final_scorer로 정밀 스코어링 (사용자 위치 기반)
+    1단계: RAG + 협업 필터링으로 후보군 DataFrame 생성 (이미지 없는 식당 제외)
+    -> (profile_summary, candidate_df), 후보가 없으면 HTTPException(404)
     """
-    try:
-        profile = request.profile
-
-        # 1단계: RAG + 협업 필터링
-        print("--- 1단계: RAG 후보군 생성 시작 ---")
+    print("--- 1단계: RAG 후보군 생성 시작 ---")
+
+    profile_summary = llm_utils.generate_profile_summary_text_only(profile)
+    filter_dict = search_logic.create_filter_metadata(profile)
+    filter_metadata_json = json.dumps(filter_dict, ensure_ascii=False)
+
+    user_profile_row = {
+        "name": profile.get("name", "N/A"),
+        "user_id": "live_user",
+        "rag_query_text": profile_summary,
+        "rag_query": llm_utils.get_profile_rag_query(profile),
+        "filter_metadata_json": filter_metadata_json,
+    }
 
-        profile_summary = llm_utils.generate_profile_summary_text_only(profile)
-        filter_dict = search_logic.create_filter_metadata(profile)
-        filter_metadata_json = json.dumps(filter_dict, ensure_ascii=False)
+    candidate_ids = search_logic.get_rag_candidate_ids(
+        user_profile_row,
+        n_results=config.RAG_REQUEST_N_RESULTS
+    )
 
-        user_profile_row = {
-            "name": profile.get("name", "N/A"),
-            "user_id": "live_user",
-            "rag_query_text": profile_summary,
-            "filter_metadata_json": filter_metadata_json,
-        }
+    if not candidate_ids:
+        raise HTTPException(status_code=404, detail="검색 결과가 없습니다. 필터를 완화해보세요.")
 
-        candidate_ids = search_logic.get_rag_candidate_ids(
-            user_profile_row,
-            n_results=config.RAG_REQUEST_N_RESULTS
-        )
+    print(f"--- 1단계 완료: {len(candidate_ids)}개 후보 ---")
 
-        if not candidate_ids:
-            raise HTTPException(status_code=404, detail="검색 결과가 없습니다. 필터를 완화해보세요.")
+    candidate_df = data_snapshot.current().get_restaurants_by_ids(candidate_ids)
 
-        print(f"--- 1단계 완료: {len(candidate_ids)}개 후보 ---")
+    if candidate_df.empty:
+        raise HTTPException(status_code=404, detail="후보군 DataFrame 조회 실패")
 
-        # 2단계: final_scorer (뚜벅이 점수 계산)
-        print("--- 2단계: final_scorer 실행 ---")
+    # 이미지 필터링을 스코어링 전에 수행 (Top-K 선택 전)
+    image_col = None
+    if 'image_url' in candidate_df.columns:
+        image_col = 'image_url'
+    elif '이미지URL' in candidate_df.columns:
+        image_col = '이미지URL'
 
-        candidate_df = data_loader.get_restaurants_by_ids(candidate_ids)
+    if image_col:
+        print(f"  > 필터링 전 후보군: {len(candidate_df)}개")
+        no_image_filename = "img_restaruant_no_image.png"
+        candidate_df = candidate_df[
+            (candidate_df[image_col].notna()) &
+            (candidate_df[image_col] != '') &
+            (candidate_df[image_col] != 'N/A') &
+            (candidate_df[image_col].str.startswith('http', na=False)) &
+            (~candidate_df[image_col].str.contains(no_image_filename, na=False))
+        ]
+        print(f"  > 이미지 필터링 후: {len(candidate_df)}개 식당 (이미지 있음)")
 
         if candidate_df.empty:
-            raise HTTPException(status_code=404, detail="후보군 DataFrame 조회 실패")
-
-        # 이미지 필터링을 스코어링 전에 수행 (Top-K 선택 전)
-        image_col = None
-        if 'image_url' in candidate_df.columns:
-            image_col = 'image_url'
-        elif '이미지URL' in candidate_df.columns:
-            image_col = '이미지URL'
-
-        if image_col:
-            print(f"  > 필터링 전 후보군: {len(candidate_df)}개")
-            no_image_filename = "img_restaruant_no_image.png"
-            candidate_df = candidate_df[
-                (candidate_df[image_col].notna()) &
-                (candidate_df[image_col] != '') &
-                (candidate_df[image_col] != 'N/A') &
-                (candidate_df[image_col].str.startswith('http', na=False)) &
-                (~candidate_df[image_col].str.contains(no_image_filename, na=False))
-            ]
-            print(f"  > 이미지 필터링 후: {len(candidate_df)}개 식당 (이미지 있음)")
-
-            if candidate_df.empty:
-                raise HTTPException(status_code=404, detail="이미지가 있는 식당이 없습니다.")
-
-        user_start_coords = get_start_location_coords(profile.get('start_location'))
-        user_price_prefs = budget_mapper(profile.get('budget'))
+            raise HTTPException(status_code=404, detail="이미지가 있는 식당이 없습니다.")
+
+    return profile_summary, candidate_df
+
+def _scorer_options(request: RecommendationGenerateRequest) -> Dict[str, Any]:
+    """ 2단계 final_scorer 공통 인자 (위치/예산/가중치 + 서버 설정) """
+    profile = request.profile
+    snapshot = data_snapshot.current()
+    return dict(
+        user_start_location=get_start_location_coords(profile.get('start_location')),
+        user_price_prefs=budget_mapper(profile.get('budget')),
+        async_http_client=app.state.http_client,
+        graphhopper_url=config.GRAPH_HOPPER_API_URL,
+        weights=request.weights,
+        travel_matrix=snapshot.travel_matrix,
+        max_concurrency=config.GRAPH_HOPPER_MAX_CONCURRENCY,
+        request_timeout=config.GRAPH_HOPPER_REQUEST_TIMEOUT,
+        deadline=config.GRAPH_HOPPER_TOTAL_DEADLINE,
+        estimated_travel_score=config.ESTIMATED_TRAVEL_SCORE,
+        spatial_index=snapshot.restaurant_spatial_index,
+        max_route_distance_m=config.MAX_ROUTE_DISTANCE_M,
+        routing_backend=app.state.routing_backend,
+        circuit_breaker=None if app.state.routing_backend else app.state.graphhopper_breaker,
+        departure_time=request.departure_time,
+        departure_bucket_minutes=config.DEPARTURE_BUCKET_MINUTES,
+        departure_reference_dates=config.DEPARTURE_REFERENCE_DATES,
+        route_cache=app.state.route_cache,
+        route_cache_coord_digits=config.ROUTE_CACHE_COORD_DIGITS,
+        top_k=request.top_k if config.SCORER_EARLY_TERMINATION else None
+    )
+
+def _df_to_records(result_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """ 결과 DataFrame -> 응답용 딕셔너리 리스트 (인덱스를 id 컬럼으로 포함) """
+    result_df_reset = result_df.reset_index()
+
+    # NaN, Infinity 등을 None으로 변환 (JSON 직렬화 가능하게)
+    result_df_reset = result_df_reset.replace([float('inf'), float('-inf')], None)
+    result_df_reset = result_df_reset.where(pd.notnull(result_df_reset), None)
+
+    return result_df_reset.to_dict('records')
+
+@app.post("/api/recommendations/generate", response_model=RecommendationGenerateResponse, tags=["Recommendations"], dependencies=[Depends(require_ready)])
+async def generate_recommendations(request: RecommendationGenerateRequest):
+    """
+    프로필 기반 맞춤 추천
+    1단계: RAG 검색으로 후보군 생성
+    2단계: final_scorer로 정밀 스코어링 (사용자 위치 기반)
+    """
+    try:
+        # 1단계: RAG + 협업 필터링
+        profile_summary, candidate_df = _generate_candidates(request.profile)
+
+        # 2단계: final_scorer (뚜벅이 점수 계산)
+        print("--- 2단계: final_scorer 실행 ---")
 
         try:
             final_scored_df = await final_scorer.calculate_final_scores_async(
                 candidate_df=candidate_df,
-                user_start_location=user_start_coords,
-                user_price_prefs=user_price_prefs,
-                async_http_client=app.state.http_client,
-                graphhopper_url=config.GRAPH_HOPPER_API_URL,
-                weights=request.weights
+                **_scorer_options(request)
             )
 
             print(f"--- 2단계 완료: {len(final_scored_df)}개 스코어링 ---")
@@ -346,14 +508,7 @@ async def generate_recommendations(request: RecommendationGenerateRequest):
             result_df = candidate_df.head(request.top_k)
             print(f"--- Fallback: RAG 1단계 결과 {len(result_df)}개 반환 ---")
 
-        # 결과를 딕셔너리로 변환 (인덱스를 id 컬럼으로 포함)
-        result_df_reset = result_df.reset_index()
-
-        # NaN, Infinity 등을 None으로 변환 (JSON 직렬화 가능하게)
-        result_df_reset = result_df_reset.replace([float('inf'), float('-inf')], None)
-        result_df_reset = result_df_reset.where(pd.notnull(result_df_reset), None)
-
-        restaurants = result_df_reset.to_dict('records')
+        restaurants = _df_to_records(result_df)
 
         return RecommendationGenerateResponse(
             restaurants=restaurants,
@@ -366,42 +521,157 @@ async def generate_recommendations(request: RecommendationGenerateRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 실패: {str(e)}")
 
-@app.get("/api/restaurants/{restaurant_id}", tags=["Restaurants"])
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """ Server-Sent Events 메시지 1개 (event: ... / data: JSON) """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@app.post("/api/recommendations/stream", tags=["Recommendations"], dependencies=[Depends(require_ready)])
+async def stream_recommendations(request: RecommendationGenerateRequest):
+    """
+    프로필 기반 맞춤 추천 (Server-Sent Events 스트리밍)
+    - event: rag    -> 1단계 RAG 순서의 top_k (2단계 점수 계산 전에 즉시 전송)
+    - event: update -> 이동 점수가 도착할 때마다 지금까지 점수가 매겨진 후보로 재정렬한 top_k
+    - event: final  -> 최종 top_k (2단계가 모두 실패하면 fallback=True, RAG 1단계 결과)
+    (라우팅이 실패한 chunk의 후보는 추정 이동 점수로 포함, 해당 id는 estimated_ids로 전달)
+    (1단계 오류는 스트림 시작 전에 일반 HTTP 오류로 반환)
+    """
+    try:
+        profile_summary, candidate_df = _generate_candidates(request.profile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"추천 생성 실패: {str(e)}")
+
+    scorer_options = _scorer_options(request)
+    total = len(candidate_df)
+
+    async def event_stream():
+        rag_top = _df_to_records(candidate_df.head(request.top_k))
+        yield _sse_event("rag", {
+            "restaurants": rag_top,
+            "total_count": len(rag_top),
+            "user_profile_summary": profile_summary,
+        })
+
+        scored_df = None
+        estimated_ids = [] # (라우팅 실패로 추정 점수를 쓴 후보)
+        try:
+            async for scored_df in final_scorer.iter_final_scores_async(
+                candidate_df,
+                chunk_size=config.STREAM_CHUNK_SIZE,
+                failed_ids=estimated_ids,
+                **scorer_options
+            ):
+                restaurants = _df_to_records(scored_df.head(request.top_k))
+                yield _sse_event("update", {
+                    "restaurants": restaurants,
+                    "total_count": len(restaurants),
+                    "scored_count": len(scored_df),
+                    "candidate_count": total,
+                    "estimated_ids": estimated_ids,
+                })
+        except Exception as scorer_error:
+            print(f"[경고] final_scorer 실패, RAG 1단계 결과만 반환: {scorer_error}")
+            scored_df = None
+
+        fallback = scored_df is None
+        result_df = candidate_df.head(request.top_k) if fallback else scored_df.head(request.top_k)
+        restaurants = _df_to_records(result_df)
+        yield _sse_event("final", {
+            "restaurants": restaurants,
+            "total_count": len(restaurants),
+            "scored_count": 0 if fallback else len(scored_df),
+            "candidate_count": total,
+            "fallback": fallback,
+            "estimated_ids": [] if fallback else estimated_ids,
+            "user_profile_summary": profile_summary,
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _unique_nearest(ids: List[str], distances) -> Dict[str, float]:
+    """ 가까운 순 (id, 거리) -> id별 첫(가장 가까운) 거리만 남긴 dict (순서 유지) """
+    nearest = {}
+    for restaurant_id, distance in zip(ids, distances):
+        nearest.setdefault(restaurant_id, distance)
+    return nearest
+
+@app.get("/api/restaurants/nearby", tags=["Restaurants"], dependencies=[Depends(require_ready)])
+async def get_nearby_restaurants(
+    location: Optional[str] = None,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[float] = Query(None, gt=0, le=config.NEARBY_MAX_RADIUS_M),
+    k: int = Query(10, ge=1, le=config.NEARBY_MAX_K)
+):
+    """
+    주변 식당 조회 (공간 인덱스)
+    - 기준점: lat/lon 또는 location(장소 이름, 예: '명동역')
+    - radius_m 지정 시 반경 검색(최대 k개), 미지정 시 가장 가까운 k개
+    (같은 id가 여러 행인 식당은 가장 가까운 1개만, 행은 중복 제거된 restaurant_view에서 조회)
+    """
+    snapshot = data_snapshot.current()
+    index = snapshot.restaurant_spatial_index
+    if index is None:
+        raise HTTPException(status_code=503, detail="서버 준비 중 (공간 인덱스 미구축)")
+
+    if lat is None or lon is None:
+        lat, lon = (float(v) for v in get_start_location_coords(location).split(","))
+
+    if radius_m is not None:
+        nearest = _unique_nearest(*index.query_radius(lat, lon, radius_m))
+    else:
+        # (공간 인덱스는 중복 id를 그대로 두므로, 중복 제거 후 k개가 안 되면 더 넓게 다시 조회)
+        n = k
+        while True:
+            nearest = _unique_nearest(*index.query_knn(lat, lon, n))
+            if len(nearest) >= k or n >= len(index):
+                break
+            n *= 2
+
+    view, view_pos = snapshot.restaurant_view, snapshot.restaurant_view_pos
+    restaurants = []
+    for restaurant_id, distance in list(nearest.items())[:k]:
+        pos = view_pos.get(restaurant_id)
+        if pos is None:
+            continue
+        row = view.iloc[pos]
+        restaurants.append({
+            'id': restaurant_id,
+            'name': row.get('가게'),
+            'address': row.get('주소'),
+            'distance_m': round(float(distance), 1),
+        })
+
+    return {"restaurants": restaurants, "total_count": len(restaurants)}
+
+@app.get("/api/restaurants/{restaurant_id}", tags=["Restaurants"], dependencies=[Depends(require_ready)])
 async def get_restaurant_detail(restaurant_id: str):
     """
     특정 식당의 상세 정보 조회
     """
     try:
-        if data_loader.df_restaurants is None:
+        snapshot = data_snapshot.current()
+        if snapshot.df_restaurants is None:
             raise HTTPException(status_code=503, detail="서버 준비 중")
 
         # df_restaurants는 id가 인덱스로 설정되어 있음
-        if restaurant_id not in data_loader.df_restaurants.index:
+        if restaurant_id not in snapshot.df_restaurants.index:
             raise HTTPException(status_code=404, detail="식당을 찾을 수 없습니다")
 
-        # 인덱스로 직접 접근
-        restaurant = data_loader.df_restaurants.loc[restaurant_id]
+        # 인덱스로 직접 접근 (같은 id가 여러 행이면 첫 행: get_restaurants_by_ids와 같은 기준)
+        restaurant = snapshot.df_restaurants.loc[restaurant_id]
+        if isinstance(restaurant, pd.DataFrame):
+            restaurant = restaurant.iloc[0]
 
-        # 메뉴 정보 추가
+        # 메뉴 정보 추가 (load_app_data에서 영문 키로 미리 만든 메뉴 목록)
         menus = []
-        if data_loader.df_menus is not None:
-            restaurant_menus = data_loader.df_menus[
-                data_loader.df_menus['식당ID'] == restaurant_id
-            ]
-            # 메뉴 데이터를 딕셔너리로 변환하고 필드명을 영어로 매핑
-            menus_data = restaurant_menus.to_dict('records')
-            for menu in menus_data:
-                menus.append({
-                    'name': menu.get('메뉴', ''),
-                    'price': menu.get('가격원문', '').replace('원', ''),  # '원' 제거
-                    'is_representative': menu.get('대표여부', ''),
-                    'price_range': menu.get('가격범위', ''),
-                    'theme': menu.get('테마', ''),
-                    'temperature': menu.get('온도', ''),
-                    'category': menu.get('카테고리', ''),
-                    'main_ingredient': menu.get('주재료', ''),
-                    'is_spicy': menu.get('맵기(O/X)', '')
-                })
+        if snapshot.menu_index is not None:
+            menus = snapshot.menu_index.menus(restaurant_id)
 
         # Series를 dict로 변환
         restaurant_data = restaurant.to_dict()
@@ -438,6 +708,68 @@ async def get_restaurant_detail(restaurant_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"식당 정보 조회 실패: {str(e)}")
 
+@app.get("/api/routing/status", tags=["Recommendations"])
+async def get_routing_status():
+    """
+    라우팅 백엔드 상태 조회 (백엔드별 서킷 상태 / 목적지당 평균 지연 / 경로 캐시 적중률)
+    """
+    backend = app.state.routing_backend
+    if isinstance(backend, routing_backends.RoutingBackendSelector):
+        backends = backend.snapshot()
+    elif backend is not None:
+        backends = {backend.name: {"exact": backend.exact}}
+    else:
+        backends = {"graphhopper": {"exact": True, "circuit": app.state.graphhopper_breaker.snapshot()}}
+    return {
+        "mode": config.ROUTING_BACKEND,
+        "backends": backends,
+        "route_cache": app.state.route_cache.stats(),
+    }
+
+@app.get("/api/cache/status", tags=["Recommendations"])
+async def get_cache_status():
+    """
+    캐시 적중률 조회 (RAG 쿼리 재작성 LLM 캐시 / 경로 캐시)
+    """
+    return {
+        "rag_query": llm_utils.rag_query_cache.stats(),
+        "route": app.state.route_cache.stats(),
+    }
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    X-Admin-Token 헤더가 ADMIN_API_TOKEN과 일치해야 함
+    (토큰 미설정 시 관리자 API 전체 비활성화 -> 403, 비교는 hmac.compare_digest로 상수 시간)
+    """
+    if not config.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="관리자 API 비활성화 (ADMIN_API_TOKEN 미설정)")
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode("utf-8"), config.ADMIN_API_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+
+@app.post("/api/admin/reload", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def reload_data():
+    """
+    데이터 핫 리로드 (CSV / Arrow / 이동 마찰 행렬 -> 새 스냅샷으로 교체, 서버 재시작 없음)
+    백그라운드 스레드에서 새 스냅샷을 만드는 동안 기존 요청은 이전 스냅샷으로 처리
+    -> 소요 시간 / 데이터셋 메모리 / RSS 변화. 이미 리로드 중이면 409, 워밍업 전이면 503
+    """
+    if not app.state.warmup.ready:
+        raise HTTPException(status_code=503, detail="서버 준비 중 (워밍업 완료 후 리로드 가능)")
+
+    result = await asyncio.to_thread(app.state.reloader.reload, "admin")
+    if result["status"] == "busy":
+        raise HTTPException(status_code=409, detail="이미 데이터 리로드가 진행 중입니다")
+    return JSONResponse(result, status_code=200 if result["status"] == "reloaded" else 500)
+
+@app.get("/api/admin/reload", tags=["Admin"], dependencies=[Depends(require_admin)])
+async def get_reload_status():
+    """
+    현재 스냅샷 버전 / 리로드 진행 여부 / 마지막 리로드 이후 바뀐 원본 파일 / 최근 리로드 결과
+    """
+    return app.state.reloader.snapshot()
+
 class BatchTranslateRequest(BaseModel):
     """배치 번역 요청"""
     texts: List[str]
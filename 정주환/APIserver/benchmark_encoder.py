@@ -0,0 +1,80 @@
+"""
+(벤치마크) 질의 인코더: fp32 PyTorch vs ONNX 동적 int8 양자화
+
+mock 프로필(PROFILE_DB_FILE)의 rag_query_text를 두 모델로 임베딩해
+- 일치도: 같은 질의의 두 임베딩 간 코사인 유사도 (평균 / p5 / 최소)
+- 검색 일치: 'restaurants' 컬렉션(기존 문서 임베딩)에서 top-k 결과 겹침 비율
+- 지연: 질의 1개 인코딩 시간 p50 / p95 (ms)
+를 비교합니다. (문서 임베딩은 그대로 두고 질의 인코더만 바꿨을 때의 영향)
+
+실행: python benchmark_encoder.py [--queries 200] [--top-k 50] [--quantization avx2]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+import data_loader
+from embedding_backend import load_sentence_embedder
+from vector_index import InMemoryVectorIndex
+
+
+def _encode_timed(model, texts):
+    embeddings, elapsed_ms = [], []
+    model.encode(texts[:1], convert_to_numpy=True) # (워밍업)
+    for text in texts:
+        start = time.perf_counter()
+        embeddings.append(model.encode([text], convert_to_numpy=True)[0])
+        elapsed_ms.append((time.perf_counter() - start) * 1000)
+    return np.vstack(embeddings), np.array(elapsed_ms)
+
+
+def run_benchmark(n_queries: int, top_k: int, quantization_config: str):
+    data_loader.build_vector_db(config.RESTAURANT_DB_FILE, config.PROFILE_DB_FILE, clear_db=False)
+    index = InMemoryVectorIndex.from_collection(data_loader.collection)
+
+    texts = (
+        pd.read_csv(config.PROFILE_DB_FILE)
+        .dropna(subset=["rag_query_text"])["rag_query_text"]
+        .head(n_queries)
+        .tolist()
+    )
+    print(f"질의 {len(texts)}개, top-k={top_k}, 컬렉션 {len(index)}개")
+
+    torch_model = load_sentence_embedder(config.EMBEDDING_MODEL_NAME, "torch")
+    onnx_model = load_sentence_embedder(
+        config.EMBEDDING_MODEL_NAME, "onnx-int8", config.ONNX_MODEL_DIR, quantization_config
+    )
+
+    torch_emb, torch_ms = _encode_timed(torch_model, texts)
+    onnx_emb, onnx_ms = _encode_timed(onnx_model, texts)
+
+    cosine = np.einsum("ij,ij->i", torch_emb, onnx_emb) / (
+        np.linalg.norm(torch_emb, axis=1) * np.linalg.norm(onnx_emb, axis=1)
+    )
+    overlaps = []
+    for torch_q, onnx_q in zip(torch_emb, onnx_emb):
+        torch_ids = index.query([torch_q], n_results=top_k)["ids"][0]
+        onnx_ids = index.query([onnx_q], n_results=top_k)["ids"][0]
+        overlaps.append(len(set(torch_ids) & set(onnx_ids)) / max(len(torch_ids), 1))
+    overlaps = np.array(overlaps)
+
+    print(f"\n코사인 일치도: 평균 {cosine.mean():.4f}, p5 {np.percentile(cosine, 5):.4f}, 최소 {cosine.min():.4f}")
+    print(f"top-{top_k} 겹침: 평균 {overlaps.mean():.1%}, p5 {np.percentile(overlaps, 5):.1%}, "
+          f"완전 일치 {np.mean(overlaps == 1.0):.0%}")
+
+    print(f"\n{'백엔드':<12}{'p50(ms)':>10}{'p95(ms)':>10}{'평균(ms)':>10}")
+    for name, elapsed in (("torch-fp32", torch_ms), ("onnx-int8", onnx_ms)):
+        print(f"{name:<12}{np.percentile(elapsed, 50):>10.2f}{np.percentile(elapsed, 95):>10.2f}{elapsed.mean():>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="fp32 vs ONNX int8 질의 인코더 일치도 / 지연 벤치마크")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=config.RAG_REQUEST_N_RESULTS)
+    parser.add_argument("--quantization", default=config.ONNX_QUANTIZATION_CONFIG)
+    args = parser.parse_args()
+
+    run_benchmark(args.queries, args.top_k, args.quantization)
@@ -0,0 +1,71 @@
+"""
+(벤치마크) 1단계 RAG 검색: Chroma collection.query(where=...) vs 인메모리 NumPy 인덱스
+
+mock 프로필(PROFILE_DB_FILE)의 rag_query_text + 필터를 질의로 사용해
+질의당 지연(ms)과 결과 일치율(같은 ID 집합 / 같은 순서)을 비교합니다.
+(LLM 쿼리 재작성은 생략: 같은 질의 문자열로 두 경로를 비교하는 것이 목적)
+
+실행: python benchmark_vector_index.py [--queries 100] [--n-results 50]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+import data_loader
+from search_logic import build_filters_from_profile
+from vector_index import InMemoryVectorIndex
+
+
+def _timed_queries(index, embeddings, filters, n_results):
+    results, elapsed_ms = [], []
+    for embedding, where in zip(embeddings, filters):
+        kwargs = {"where": where} if where else {}
+        start = time.perf_counter()
+        result = index.query(query_embeddings=[embedding], n_results=n_results, **kwargs)
+        elapsed_ms.append((time.perf_counter() - start) * 1000)
+        results.append(result["ids"][0])
+    return results, np.array(elapsed_ms)
+
+
+def run_benchmark(n_queries: int, n_results: int):
+    data_loader.build_vector_db(config.RESTAURANT_DB_FILE, config.PROFILE_DB_FILE, clear_db=False)
+
+    df_profiles = pd.read_csv(config.PROFILE_DB_FILE).dropna(subset=["rag_query_text"]).head(n_queries)
+    embeddings = [data_loader.embed_query(text) for text in df_profiles["rag_query_text"]]
+    filters = [
+        build_filters_from_profile(json.loads(meta)) if isinstance(meta, str) else {}
+        for meta in df_profiles["filter_metadata_json"]
+    ]
+    print(f"질의 {len(embeddings)}개, n_results={n_results}, 컬렉션 {data_loader.collection.count()}개")
+
+    chroma_ids, chroma_ms = _timed_queries(data_loader.collection, embeddings, filters, n_results)
+
+    rows = [("chroma", chroma_ms, 1.0, 1.0)]
+    for dtype in ("float32", "int8"):
+        build_start = time.perf_counter()
+        index = InMemoryVectorIndex.from_collection(data_loader.collection, dtype=dtype)
+        print(f"  > {dtype} 인덱스 생성 {(time.perf_counter() - build_start) * 1000:.0f}ms, "
+              f"벡터 {index.vectors.nbytes / 1e6:.1f}MB")
+
+        numpy_ids, numpy_ms = _timed_queries(index, embeddings, filters, n_results)
+        same_set = np.mean([set(a) == set(b) for a, b in zip(chroma_ids, numpy_ids)])
+        same_order = np.mean([a == b for a, b in zip(chroma_ids, numpy_ids)])
+        rows.append((f"numpy-{dtype}", numpy_ms, same_set, same_order))
+
+    print(f"\n{'경로':<14}{'p50(ms)':>10}{'p95(ms)':>10}{'평균(ms)':>10}{'같은 ID 집합':>14}{'같은 순서':>10}")
+    for name, elapsed, same_set, same_order in rows:
+        print(f"{name:<14}{np.percentile(elapsed, 50):>10.2f}{np.percentile(elapsed, 95):>10.2f}"
+              f"{elapsed.mean():>10.2f}{same_set:>14.0%}{same_order:>10.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chroma vs NumPy 벡터 인덱스 1단계 검색 벤치마크")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--n-results", type=int, default=config.RAG_REQUEST_N_RESULTS)
+    args = parser.parse_args()
+
+    run_benchmark(args.queries, args.n_results)
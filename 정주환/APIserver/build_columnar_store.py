@@ -0,0 +1,123 @@
+"""
+(오프라인 빌드 작업)
+서버 시작 시 읽는 CSV(가게 / 메뉴 / 스코어링 / 500명 평가)를 타입이 고정된 Arrow IPC 파일로 변환합니다.
+(ID 컬럼 문자열, 카테고리 / 가격범위 등 반복 필드 category, id 인덱스 미리 설정)
+
+실행: python build_columnar_store.py [--benchmark] [--repeat 5]
+--benchmark: 변환 후 데이터셋별 CSV 경로 vs 메모리 맵 경로 로드 시간 / RSS(힙 / 매핑)를 비교합니다.
+(CSV를 수정하면 다시 실행하세요. CSV가 더 최신이면 서버는 CSV로 로드합니다.)
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+import columnar_store
+
+# (CSV 경로 -> columnar_store.DATASET_SPECS 종류)
+DATASETS = {
+    config.RESTAURANT_DB_FILE: "restaurants",
+    config.MENU_DB_FILE: "menus",
+    config.RESTAURANT_DB_SCORING_FILE: "scoring",
+    config.MOCK_USER_RATINGS_FILE: "ratings",
+}
+
+
+def convert_all(store_dir: str):
+    for csv_path, kind in DATASETS.items():
+        start = time.perf_counter()
+        try:
+            path = columnar_store.write_arrow(csv_path, kind, store_dir)
+        except FileNotFoundError:
+            print(f"  > [건너뜀] '{csv_path}' 파일 없음")
+            continue
+        print(f"  > {kind}: '{csv_path}' -> '{path}' ({time.perf_counter() - start:.2f}초)")
+
+
+def _timed_load(csv_path, kind, store_dir, use_store, repeat):
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        columnar_store.read_frame(csv_path, kind, store_dir, use_store=use_store)
+        elapsed.append(time.perf_counter() - start)
+    return np.median(elapsed) * 1000
+
+
+def _rss_breakdown_mb():
+    """ 현재 프로세스 RSS (익명 = Python 힙, 파일 = 메모리 맵 페이지: 워커 간 공유) (Linux /proc 기준, 없으면 None) """
+    try:
+        with open("/proc/self/status") as f:
+            values = dict(line.split(":", 1) for line in f if line.startswith(("RssAnon", "RssFile")))
+        return int(values["RssAnon"].split()[0]) / 1024, int(values["RssFile"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _measure_load_rss(csv_path, kind, store_dir, use_store):
+    """ 1회 로드 후 DataFrame을 쥔 상태의 RSS 증가량 -> (힙 MB, 매핑 MB) """
+    before = _rss_breakdown_mb()
+    df = columnar_store.read_frame(csv_path, kind, store_dir, use_store=use_store)
+    after = _rss_breakdown_mb()
+    del df
+    if before is None or after is None:
+        return None
+    return after[0] - before[0], after[1] - before[1]
+
+
+def _load_rss(csv_path, kind, store_dir, use_store):
+    """ (이전 로드가 남긴 할당자 캐시 영향이 없도록 fork한 새 프로세스에서 측정, fork 불가 환경이면 None) """
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        return None
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure_load_rss, csv_path, kind, store_dir, use_store).result()
+
+
+def _mb(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def run_benchmark(store_dir: str, repeat: int):
+    """
+    데이터셋별 로드 시간(중앙값) + 로드 1회의 RSS 증가량
+    - 힙: 워커마다 따로 드는 메모리 (CSV 경로 대비 줄어든 만큼이 메모리 맵의 실제 절감량)
+    - 매핑: 메모리 맵 파일 페이지 (페이지 캐시를 워커끼리 공유, 문자열 / category 컬럼은 힙으로 복사되므로 숫자 컬럼 위주)
+    """
+    print(f"\n{'데이터셋':<12}{'CSV(ms)':>10}{'Arrow(ms)':>11}{'배속':>7}"
+          f"{'CSV 힙(MB)':>12}{'Arrow 힙(MB)':>14}{'Arrow 매핑(MB)':>16}")
+    totals = np.zeros(2)
+    heap_totals = np.zeros(3)
+    for csv_path, kind in DATASETS.items():
+        try:
+            csv_ms = _timed_load(csv_path, kind, store_dir, False, repeat)
+            arrow_ms = _timed_load(csv_path, kind, store_dir, True, repeat)
+        except FileNotFoundError:
+            continue
+        csv_rss = _load_rss(csv_path, kind, store_dir, False)
+        arrow_rss = _load_rss(csv_path, kind, store_dir, True)
+        csv_heap = csv_rss[0] if csv_rss else None
+        arrow_heap, arrow_mapped = arrow_rss if arrow_rss else (None, None)
+        totals += (csv_ms, arrow_ms)
+        if csv_rss and arrow_rss:
+            heap_totals += (csv_heap, arrow_heap, arrow_mapped)
+        print(f"{kind:<12}{csv_ms:>10.1f}{arrow_ms:>11.1f}{csv_ms / max(arrow_ms, 1e-9):>6.1f}x"
+              f"{_mb(csv_heap):>12}{_mb(arrow_heap):>14}{_mb(arrow_mapped):>16}")
+    print(f"{'합계':<12}{totals[0]:>10.1f}{totals[1]:>11.1f}{totals[0] / max(totals[1], 1e-9):>6.1f}x"
+          f"{heap_totals[0]:>12.1f}{heap_totals[1]:>14.1f}{heap_totals[2]:>16.1f}")
+    print(f"  > 워커 1개당 힙 절감: {heap_totals[0] - heap_totals[1]:.1f}MB (RSS 측정은 Linux에서만)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV -> Arrow 열 저장소 변환 (+ 로드 벤치마크)")
+    parser.add_argument("--store-dir", default=config.COLUMNAR_STORE_DIR)
+    parser.add_argument("--benchmark", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    convert_all(args.store_dir)
+    if args.benchmark:
+        run_benchmark(args.store_dir, args.repeat)
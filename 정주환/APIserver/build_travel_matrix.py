@@ -0,0 +1,134 @@
+"""
+(오프라인 빌드 작업)
+config.LOCATION_COORDS의 모든 출발지 x 스코어링 DB의 모든 식당에 대해
+'이동 마찰 점수'를 GraphHopper로 미리 계산하여 메모리 맵 행렬(.npy)로 저장합니다.
+
+실행: python build_travel_matrix.py [--concurrency 16] [--departure 2024-01-03T12:00]
+(GraphHopper 서버가 떠 있어야 합니다. 실패한 칸은 NaN으로 남아 서버에서 실시간 호출됩니다.)
+--departure를 주면 그 출발 시각 버킷 전용 행렬이 되어, 같은 버킷의 요청에만 사용됩니다.
+(서버 실행 중에 다시 빌드해도 됩니다: 임시 파일에 쓴 뒤 행렬 -> 메타 순서로 os.replace,
+ 서버가 메모리 맵으로 연 기존 행렬 파일은 건드리지 않음)
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+import numpy as np
+import pandas as pd
+
+import config
+from API.final_scorer import get_best_travel_score_async
+from API.travel_matrix import file_sha1, normalize_coords
+from API.route_cache import quantize_departure
+
+
+def _fsync(path: str):
+    """ 임시 파일 내용을 디스크에 기록 (os.replace 전에) """
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+async def build_travel_matrix(
+    scoring_csv_path: str,
+    matrix_path: str,
+    meta_path: str,
+    graphhopper_url: str,
+    concurrency: int = 16,
+    departure: datetime = None
+):
+    df = pd.read_csv(scoring_csv_path)
+    df['id'] = df['id'].astype(str)
+    df = df.drop_duplicates(subset='id').set_index('id')
+
+    # (같은 좌표를 가리키는 장소 이름은 한 행으로 합침)
+    origins = list(dict.fromkeys(normalize_coords(c) for c in config.LOCATION_COORDS.values()))
+    restaurant_ids = df.index.tolist()
+    print(f"행렬 크기: 출발지 {len(origins)}개 x 식당 {len(restaurant_ids)}개")
+
+    departure_bucket, departure_time = None, None
+    if departure is not None:
+        departure_bucket, departure_time = quantize_departure(
+            departure, config.DEPARTURE_BUCKET_MINUTES, config.DEPARTURE_REFERENCE_DATES
+        )
+        print(f"출발 시각 버킷: {departure_bucket} ({departure_time.isoformat()})")
+
+    os.makedirs(os.path.dirname(matrix_path) or ".", exist_ok=True)
+    # (같은 디렉터리의 임시 파일에 빌드: 실행 중인 서버의 메모리 맵 파일을 잘라 쓰지 않도록)
+    tmp_matrix_path = matrix_path + ".tmp"
+    scores = np.lib.format.open_memmap(
+        tmp_matrix_path, mode="w+", dtype=np.float32,
+        shape=(len(origins), len(restaurant_ids))
+    )
+    scores[:] = np.nan
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def score_one(client, row_i, col_j, origin):
+        nonlocal failures
+        async with semaphore:
+            try:
+                scores[row_i, col_j] = await get_best_travel_score_async(
+                    df.iloc[col_j], origin, client, graphhopper_url,
+                    departure_time=departure_time
+                )
+            except Exception as e:
+                failures += 1
+                print(f"  > [실패] ({origin}, {restaurant_ids[col_j]}): {e}")
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient() as client:
+        for row_i, origin in enumerate(origins):
+            await asyncio.gather(*[
+                score_one(client, row_i, col_j, origin)
+                for col_j in range(len(restaurant_ids))
+            ])
+            print(f"  > [{row_i + 1}/{len(origins)}] {origin} 완료 ({time.perf_counter() - start:.1f}초)")
+
+    scores.flush()
+    del scores
+    _fsync(tmp_matrix_path)
+
+    tmp_meta_path = meta_path + ".tmp"
+    with open(tmp_meta_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "build_id": uuid.uuid4().hex,
+            "shape": [len(origins), len(restaurant_ids)],
+            "matrix_sha1": file_sha1(tmp_matrix_path), # (로드 시 행렬-메타 짝 확인)
+            "origins": origins,
+            "restaurant_ids": restaurant_ids,
+            "graphhopper_url": graphhopper_url,
+            "departure_bucket": departure_bucket,
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+        }, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # (행렬 먼저, 메타 마지막: 교체 사이에 읽으면 matrix_sha1 불일치로 TravelMatrix.load가 거부)
+    os.replace(tmp_matrix_path, matrix_path)
+    os.replace(tmp_meta_path, meta_path)
+
+    total = len(origins) * len(restaurant_ids)
+    print(f"--- 빌드 완료: {total - failures}/{total}칸 계산 (실패 {failures}칸은 NaN) ---")
+    print(f"  > {matrix_path}, {meta_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="출발지 x 식당 이동 마찰 점수 행렬 빌드")
+    parser.add_argument("--scoring-csv", default=config.RESTAURANT_DB_SCORING_FILE)
+    parser.add_argument("--out", default=config.TRAVEL_MATRIX_FILE)
+    parser.add_argument("--meta", default=config.TRAVEL_MATRIX_META_FILE)
+    parser.add_argument("--graphhopper-url", default=config.GRAPH_HOPPER_API_URL)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--departure", type=datetime.fromisoformat, default=None,
+                        help="출발 시각 (예: 2024-01-03T12:00, 미지정 시 모든 버킷 공용 행렬)")
+    args = parser.parse_args()
+
+    asyncio.run(build_travel_matrix(
+        args.scoring_csv, args.out, args.meta, args.graphhopper_url, args.concurrency, args.departure
+    ))
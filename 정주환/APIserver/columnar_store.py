@@ -0,0 +1,100 @@
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+# CSV -> Arrow IPC(Feather v2, 비압축) 열 저장소
+# - build_columnar_store.py로 한 번 변환: ID 컬럼 문자열 고정, 반복되는 한글 필드는 category,
+#   id 인덱스까지 설정된 상태로 저장 (pandas 메타데이터에 인덱스 / dtype 보존)
+# - 로더는 pa.memory_map으로 열어 CSV 파싱 / astype(str) / set_index 없이 바로 DataFrame 복원
+#   (결측 없는 숫자 컬럼만 메모리 맵 버퍼를 그대로 가리킴(워커 간 페이지 캐시 공유, 읽기 전용),
+#    문자열 / category 컬럼은 pandas dtype을 CSV 경로와 맞추기 위해 Python 힙으로 복사됨
+#    -> 실제 절감량은 build_columnar_store.py --benchmark 의 힙 / 매핑 RSS 비교로 확인)
+# - Arrow 파일이 없거나 CSV보다 오래됐거나 pyarrow가 없으면 CSV 경로로 대체 (같은 dtype으로 정리)
+# - chatbot/columnar_store.py와 APIserver/columnar_store.py는 같은 모듈의 복사본 (들여쓰기만 다름) -> 수정 시 두 파일을 함께 맞출 것
+
+# (데이터셋 종류별 ID 컬럼 / category 컬럼 / 인덱스)
+DATASET_SPECS = {
+    "restaurants": {"id_columns": ["id"], "categorical": ["카테고리", "high_level_category", "가격범위"], "index": "id"},
+    "menus": {"id_columns": ["식당ID"], "categorical": ["카테고리", "가격범위"], "index": None},
+    "scoring": {"id_columns": ["id"], "categorical": ["카테고리", "라벨"], "index": "id"},
+    "ratings": {"id_columns": ["restaurant_id", "user_id"], "categorical": ["사용자평가"], "index": None},
+    "translations": {"id_columns": ["id"], "categorical": ["카테고리"], "index": "id"},
+}
+
+
+def arrow_path_for(csv_path: str, store_dir: str) -> str:
+    """ data/foo.csv -> {store_dir}/foo.arrow """
+    return os.path.join(store_dir, os.path.splitext(os.path.basename(csv_path))[0] + ".arrow")
+
+
+def prepare_frame(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    """ 로더들이 하던 타입 정리 (ID -> str, 반복 필드 -> category, 인덱스 설정) """
+    spec = DATASET_SPECS[kind]
+    for col in spec["id_columns"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    for col in spec["categorical"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    if spec["index"] and spec["index"] in df.columns:
+        df = df.set_index(spec["index"])
+    return df
+
+
+def write_arrow(csv_path: str, kind: str, store_dir: str) -> str:
+    """ CSV 1개를 타입 정리 후 Arrow IPC 파일로 저장합니다. -> 저장 경로 """
+    import pyarrow as pa
+
+    df = prepare_frame(pd.read_csv(csv_path), kind)
+    table = pa.Table.from_pandas(df, preserve_index=True)
+
+    path = arrow_path_for(csv_path, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer: # (비압축: 메모리 맵으로 바로 읽도록)
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_arrow(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Arrow IPC 파일을 메모리 맵으로 열어 DataFrame으로 복원 (인덱스 / category 포함)
+    (split_blocks: 컬럼별 블록 -> 숫자 컬럼은 복사 없이 매핑 버퍼 사용, self_destruct: 변환하면서 Arrow 쪽 사본 해제)
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        index_columns = [c for c in table.schema.pandas_metadata.get("index_columns", []) if isinstance(c, str)]
+        table = table.select([c for c in table.column_names if c in columns or c in index_columns])
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_frame(
+    csv_path: str,
+    kind: str,
+    store_dir: str,
+    use_store: bool = True,
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    csv_path에 해당하는 데이터셋을 읽습니다.
+    (Arrow 파일이 CSV보다 최신이면 메모리 맵, 아니면 CSV + prepare_frame: 두 경로 모두 같은 dtype / 인덱스)
+    CSV도 없으면 FileNotFoundError (기존 pd.read_csv와 같은 예외)
+    """
+    path = arrow_path_for(csv_path, store_dir)
+    if use_store and os.path.exists(path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(path) >= os.path.getmtime(csv_path)
+    ):
+        try:
+            return read_arrow(path, columns)
+        except ImportError:
+            print("  > [정보] pyarrow가 없어 CSV로 로드합니다.")
+        except Exception as e:
+            print(f"  > [경고] '{path}' 로드 실패, CSV로 대체: {e}")
+
+    return prepare_frame(pd.read_csv(csv_path, usecols=columns), kind)
@@ -12,16 +12,50 @@ MENU_DB_FILE = "data/20251017_TOTAL_MENU.csv"
 PROFILE_DB_FILE = "data/user_profiles_for_hybrid_search.csv"
 MOCK_USER_RATINGS_FILE = "data/recommendation_results_with_ratings.csv"
 RESTAURANT_DB_SCORING_FILE = "data/blueribbon_scores_only_reviewed.csv" # (기존 main.py에서 사용)
+# (Arrow 열 저장소) build_columnar_store.py로 변환한 파일이 CSV보다 최신이면 메모리 맵으로 로드
+USE_COLUMNAR_STORE = True
+COLUMNAR_STORE_DIR = "data/columnar"
 RAG_REQUEST_N_RESULTS = 50 # (1단계 RAG 검색 시 가져올 초기 후보군 개수)
 DB_PERSISTENT_PATH = "./restaurant_db"
 
 RESTAURANT_COLLECTION_NAME = "restaurants"
 PROFILE_COLLECTION_NAME = "mock_profiles"
 CLEAR_DB_AND_REBUILD = False
+STARTUP_READY_WAIT_SECONDS = 15 # (워밍업 중 도착한 요청이 준비를 기다리는 최대 시간, 초과 시 503)
+STARTUP_RETRY_AFTER_SECONDS = 10 # (503 응답의 Retry-After)
+INCREMENTAL_DB_SYNC = False # (True면 기존 컬렉션을 CSV와 content_hash로 비교해 변경분만 upsert / 삭제)
+# (데이터 핫 리로드) 원본 CSV / Arrow / 이동 마찰 행렬 mtime 감시 주기 (0이면 감시 끔, POST /api/admin/reload만 사용)
+DATA_RELOAD_WATCH_INTERVAL_SECONDS = 30
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN") # (/api/admin/* 요청에 X-Admin-Token 헤더 필요, 미설정이면 관리자 API 비활성화)
+QUERY_EMBEDDING_CACHE_SIZE = 512 # (질의 텍스트 임베딩 LRU 캐시 크기)
+# (문장 임베딩 모델) "torch"(fp32) 또는 "onnx-int8"(ONNX 동적 int8 양자화, CPU)
+# (onnx-int8로 바꾸면 benchmark_encoder.py로 코사인 일치도 / top-k 겹침을 먼저 확인)
+EMBEDDING_MODEL_NAME = "distiluse-base-multilingual-cased-v1"
+EMBEDDING_BACKEND = "torch"
+ONNX_MODEL_DIR = "models/distiluse-onnx-int8" # (양자화 모델이 없으면 첫 로드 때 내보내 저장)
+ONNX_QUANTIZATION_CONFIG = "avx2" # ("arm64" / "avx2" / "avx512" / "avx512_vnni")
+# (컬렉션 구축 시 문서 임베딩) 길이순 정렬 배치 + 멀티프로세스 풀 (1이면 단일 프로세스)
+EMBED_BATCH_SIZE = 64
+EMBED_NUM_PROCESSES = max(1, (os.cpu_count() or 1) - 1)
+
+# (1단계 RAG 인메모리 벡터 인덱스) True면 restaurants 컬렉션 대신 NumPy 전수 검색 사용
+USE_NUMPY_VECTOR_INDEX = False
+VECTOR_INDEX_FILE = "data/restaurant_vector_index.npz" # (없으면 restaurant_db에서 내보내 생성)
+VECTOR_INDEX_DTYPE = "float32" # ("float32" 또는 "int8": 메모리 1/4, 거리 근사)
+
+# (메타데이터 비트맵 인덱스) 1차 필터 키 / 결과 0건일 때 먼저 빼는 순서 (덜 중요한 키부터)
+METADATA_FILTER_KEYS = ["budget_range", "spicy_available", "vegetarian_options", "high_level_category"]
+FILTER_RELAXATION_ORDER = ["budget_range", "spicy_available", "vegetarian_options", "high_level_category"]
+METADATA_TOKEN_KEYS = ["suitable_for", "main_ingredients_list"] # (쉼표 목록 -> 토큰 비트마스크, filter_score 계산용)
 
 # --- 2/4: LLM API 설정 ---
 GPT_API_NAME = "gpt-4.1-mini" 
 
+# (RAG 쿼리 재작성 캐시) 메모리 LRU + SQLite, 같은 요약문이면 LLM 호출 생략
+RAG_QUERY_CACHE_DB = "./cache/llm_cache.sqlite3"
+RAG_QUERY_CACHE_MAXSIZE = 1000
+RAG_QUERY_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
 # (수정) load_dotenv()가 키를 로드했으므로, client는 여기서 바로 초기화
 client = None
 try:
@@ -44,6 +78,68 @@ EXPECTED_KEYS = [
 GRAPH_HOPPER_API_URL = "http://localhost:8989/route"
 GRAPH_HOPPER_HEALTH_CHECK_URL = "http://localhost:8989/info"
 
+# (GraphHopper 호출 제어) 동시 호출 상한 / keep-alive 커넥션 풀 / 타임아웃
+GRAPH_HOPPER_MAX_CONCURRENCY = 10     # (요청 1건당 동시에 보내는 /route 호출 수)
+GRAPH_HOPPER_MAX_CONNECTIONS = 20     # (서버 전체 커넥션 풀 크기)
+GRAPH_HOPPER_MAX_KEEPALIVE = 20
+GRAPH_HOPPER_KEEPALIVE_EXPIRY = 30.0  # (초)
+GRAPH_HOPPER_REQUEST_TIMEOUT = 10.0   # (개별 /route 호출 타임아웃, 초)
+GRAPH_HOPPER_TOTAL_DEADLINE = 5.0     # (추천 요청 1건의 2단계 전체 마감 시간, 초)
+ESTIMATED_TRAVEL_SCORE = 0.5          # (마감까지 못 받은 후보의 추정 이동 점수)
+STREAM_CHUNK_SIZE = 10                # (/api/recommendations/stream: 이 개수만큼 점수가 나올 때마다 update 전송)
+SCORER_EARLY_TERMINATION = True       # (요청의 top_k 순위가 확정되면 남은 후보 라우팅 생략, Threshold Algorithm)
+
+# (서킷 브레이커) 최근 호출 실패율이 임계값을 넘으면 GraphHopper 호출 없이 즉시 RAG-only Fallback
+CIRCUIT_FAILURE_RATE_THRESHOLD = 0.5
+CIRCUIT_MIN_CALLS = 10             # (실패율 판단에 필요한 최소 호출 수)
+CIRCUIT_WINDOW_SIZE = 50           # (최근 몇 개의 호출 결과로 실패율을 계산할지)
+CIRCUIT_RECOVERY_TIMEOUT = 15.0    # (OPEN 후 health check로 복구를 시도하기까지 대기, 초)
+
+# (라우팅 백엔드)
+# "auto": GraphHopper / OTP 중 요청마다 상태(서킷)와 측정 지연으로 선택 (둘 다 실패 시 RAG-only Fallback)
+# "graphhopper": GraphHopper만 사용 (실패 시 RAG-only Fallback)
+# "local": 프로세스 내 거리+속도 모델만 사용 (로컬 테스트용)
+ROUTING_BACKEND = "auto"
+# (auto 모드) 마지막 수단으로 로컬 추정기 사용 여부
+# (True면 라우팅이 항상 성공해 RAG-only Fallback 대신 추정 점수(travel_estimated=True)로 응답)
+ROUTING_AUTO_LOCAL_FALLBACK = False
+# (auto 모드) 뒤에 대체 백엔드가 있을 때 한 백엔드가 쓰는 남은 마감 시간 비율 (나머지는 대체 백엔드 몫)
+ROUTING_BACKEND_BUDGET_FRACTION = 0.6
+ROUTING_MIN_HTTP_BUDGET = 0.5 # (남은 마감 시간이 이보다 짧으면 HTTP 백엔드는 호출하지 않음, 초)
+OTP_API_URL = "http://localhost:8080/otp/routers/default/plan"
+OTP_HEALTH_CHECK_URL = "http://localhost:8080/otp"
+
+# (공간 인덱스) 직선 거리 사전 필터
+SPATIAL_GRID_CELL_DEG = 0.01          # (격자 한 칸 크기, 약 1km)
+MAX_ROUTE_DISTANCE_M = 15000          # (직선 거리가 이보다 먼 후보는 GraphHopper 호출 없이 이동 점수 0점)
+NEARBY_MAX_K = 100                    # (/api/restaurants/nearby 의 k 상한)
+NEARBY_MAX_RADIUS_M = 20000           # (/api/restaurants/nearby 의 radius_m 상한)
+
+# (출발 시각 버킷) 요청의 출발 시각을 (평일/주말, N분 단위 시간대)로 묶어 라우팅/캐시 키로 사용
+DEPARTURE_BUCKET_MINUTES = 30
+# 버킷의 대표 출발 시각을 계산할 날짜 (GTFS 운행 기간 안의 평일/주말 하루)
+DEPARTURE_REFERENCE_DATES = {"weekday": "2024-01-03", "weekend": "2024-01-06"}
+
+# (경로 결과 캐시) (출발지 좌표 반올림, 식당 id, 출발 시각 버킷) -> 경로 리스트
+ROUTE_CACHE_MAXSIZE = 20000
+ROUTE_CACHE_TTL_SECONDS = 6 * 3600
+ROUTE_CACHE_COORD_DIGITS = 3          # (소수 3자리 = 약 100m 이내 출발지는 같은 키)
+
+# (출발지 좌표) 프로필의 start_location -> GraphHopper 좌표 문자열
+LOCATION_COORDS = {
+    "명동역": "37.5630,126.9830",
+    "홍대입구역": "37.5570,126.9244",
+    "강남역": "37.4980,127.0276",
+    "서울역": "37.5547,126.9704",
+    "서울시청": "37.5665,126.9780",
+    "시청역": "37.5658,126.9772",
+}
+DEFAULT_START_COORDS = "37.5630,126.9830" # (일치하는 장소가 없으면 '명동역')
+
+# (오프라인 사전 계산) 출발지 x 식당 이동 마찰 점수 행렬 (build_travel_matrix.py로 생성)
+TRAVEL_MATRIX_FILE = "data/travel_friction_matrix.npy"
+TRAVEL_MATRIX_META_FILE = "data/travel_friction_matrix.json"
+
 # --- 4/4: 챗봇 시스템 프롬프트 ---
 SYSTEM_PROMPT = """
 당신은 매우 친절하고 지능적인 한국 여행 도우미 챗봇입니다.
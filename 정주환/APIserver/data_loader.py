@@ -1,8 +1,12 @@
 import pandas as pd
 import ast
+import hashlib
+import json
+import time
 import chromadb
 import chromadb.utils.embedding_functions as embedding_functions
 import sys
+from functools import lru_cache
 from typing import List
 
 # 설정 파일에서 전역 변수 임포트
@@ -10,8 +14,20 @@ from config import (
     RESTAURANT_DB_FILE, MENU_DB_FILE, DB_PERSISTENT_PATH,
     PROFILE_DB_FILE, MOCK_USER_RATINGS_FILE,
     RESTAURANT_COLLECTION_NAME, PROFILE_COLLECTION_NAME,
-    CLEAR_DB_AND_REBUILD
+    CLEAR_DB_AND_REBUILD, TRAVEL_MATRIX_FILE, TRAVEL_MATRIX_META_FILE,
+    SPATIAL_GRID_CELL_DEG, QUERY_EMBEDDING_CACHE_SIZE, EMBED_BATCH_SIZE, EMBED_NUM_PROCESSES,
+    VECTOR_INDEX_FILE, VECTOR_INDEX_DTYPE, METADATA_FILTER_KEYS,
+    METADATA_TOKEN_KEYS, EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND, ONNX_MODEL_DIR,
+    ONNX_QUANTIZATION_CONFIG, USE_COLUMNAR_STORE, COLUMNAR_STORE_DIR
 )
+import columnar_store
+from API.travel_matrix import TravelMatrix
+from spatial_index import RestaurantGridIndex
+from vector_index import InMemoryVectorIndex, collection_fingerprint
+from metadata_index import MetadataBitmapIndex
+from menu_index import MenuIndex
+from ratings_index import RatingsIndex
+from embedding_backend import load_sentence_embedder, SentenceEmbedderFunction
 
 # --- 전역 변수 선언 (app_main.py에서 사용) ---
 df_restaurants = None
@@ -19,11 +35,20 @@ df_menus = None
 collection = None
 profile_collection = None
 menu_groups = None
+menu_index = None # (식당별 메뉴 CSR 인덱스 + 미리 만든 메뉴 응답 / 대표 메뉴 Markdown)
 df_all_user_ratings = None 
 df_restaurant_ratings_summary = None 
+ratings_index = None # (식당 -> (추천, 미추천) 배열 + 사용자 -> '추천' 식당 CSR)
 sentence_embedder = None
 # (기존 main.py의 전역 변수)
 all_restaurants_df_scoring = None
+travel_matrix = None # (출발지 x 식당 이동 마찰 점수 사전 계산 행렬)
+restaurant_spatial_index = None # (all_restaurants_df_scoring 좌표 격자 인덱스)
+restaurant_vector_index = None # ('restaurants' 컬렉션의 인메모리 사본, USE_NUMPY_VECTOR_INDEX일 때)
+restaurant_metadata_index = None # ('restaurants' 메타데이터 필터 키별 비트맵)
+last_db_sync = {} # (마지막 증분 동기화 결과: 컬렉션 이름 -> upserted/deleted/unchanged)
+restaurant_view = None # (get_restaurants_by_ids용 스코어링 + 표시 컬럼 사전 조인 테이블)
+restaurant_view_pos = {} # (id -> restaurant_view 행 위치)
 # -----------------------------------------------
 
 
@@ -33,22 +58,22 @@ def load_app_data(store_path, menu_path):
   앱 실행에 필요한 모든 CSV 파일을 로드하여
   2개의 전역 DataFrame을 생성합니다.
   """
-  global df_restaurants, df_menus, menu_groups
+  global df_restaurants, df_menus, menu_groups, menu_index
   
   try:
     # 1. 가게 DB (소개, 주소 등) 로드
     print(f"'{store_path}'에서 가게 DB 로드 중...")
-    df_restaurants = pd.read_csv(store_path)
-    df_restaurants['id'] = df_restaurants['id'].astype(str)
-    df_restaurants = df_restaurants.set_index('id') # (id로 검색하기 쉽게 인덱스 설정)
+    # (Arrow 열 저장소가 있으면 메모리 맵 로드, id 인덱스 / dtype은 columnar_store.prepare_frame 기준)
+    df_restaurants = columnar_store.read_frame(store_path, "restaurants", COLUMNAR_STORE_DIR, USE_COLUMNAR_STORE)
     print(f"가게 DB {len(df_restaurants)}개 로드 완료.")
     
     # 2. 메뉴 DB (메뉴, 가격) 로드
     print(f"'{menu_path}'에서 메뉴 DB 로드 중...")
-    df_menus = pd.read_csv(menu_path)
-    df_menus['식당ID'] = df_menus['식당ID'].astype(str)
+    df_menus = columnar_store.read_frame(menu_path, "menus", COLUMNAR_STORE_DIR, USE_COLUMNAR_STORE)
     menu_groups = df_menus.groupby('식당ID') # (전역 변수로 그룹화)
-    print(f"메뉴 DB {len(df_menus)}개 로드 완료 (그룹화 완료).")
+    menu_index = MenuIndex(df_menus)
+    print(f"메뉴 DB {len(df_menus)}개 로드 완료 (그룹화 완료, 메뉴 인덱스 {len(menu_index)}개 식당).")
+    build_restaurant_view()
     
     return True
 
@@ -89,23 +114,183 @@ def load_and_prepare_data(csv_path):
   print(f"데이터 준비 완료: {len(df)}개")
   return df
 
-def build_vector_db(store_csv_path, profile_csv_path, clear_db=False):
+CONTENT_HASH_KEY = "content_hash" # (행별 메타데이터에 저장하는 RAG텍스트 + 메타데이터 해시 키)
+SYNC_BATCH_SIZE = 5000
+
+
+def _process_metadata(metadata_dict):
+  """ Chroma 메타데이터 값 변환 (None -> "", 리스트 -> 쉼표 문자열, 나머지 -> str) """
+  processed_meta_item = {}
+  for key, value in metadata_dict.items():
+    if value is None:
+      processed_meta_item[key] = "" 
+    elif isinstance(value, list):
+      processed_meta_item[key] = ",".join(map(str, value))
+    else:
+      # (True -> "True", False -> "False", 123 -> "123")
+      processed_meta_item[key] = str(value)
+  return processed_meta_item
+
+
+def _with_content_hash(document, metadata):
+  """ 문서 + 메타데이터 내용 해시를 메타데이터에 추가 (증분 동기화에서 변경 여부 비교용) """
+  payload = json.dumps([document, metadata], ensure_ascii=False, sort_keys=True)
+  return {**metadata, CONTENT_HASH_KEY: hashlib.sha1(payload.encode("utf-8")).hexdigest()}
+
+
+def _restaurant_records(df_for_embedding):
+  """ load_and_prepare_data() 결과 -> (ids, documents, metadatas(해시 포함)) """
+  documents_list = df_for_embedding['RAG텍스트'].tolist()
+  ids_list = df_for_embedding['id'].astype(str).tolist()
+  metadatas_list = [
+    _with_content_hash(document, _process_metadata(metadata_dict))
+    for document, metadata_dict in zip(documents_list, df_for_embedding['메타데이터'])
+  ]
+  return ids_list, documents_list, metadatas_list
+
+
+def _profile_records(df_profiles):
+  """ 프로필 DataFrame -> (ids, documents, metadatas(해시 포함)) """
+  profile_docs = df_profiles['rag_query_text'].tolist()
+  profile_ids = df_profiles['user_id'].astype(str).tolist()
+  profile_metas = [_with_content_hash(doc, {'user_id': uid}) for doc, uid in zip(profile_docs, profile_ids)]
+  return profile_ids, profile_docs, profile_metas
+
+
+def _load_profiles(profile_csv_path):
+  try:
+    df_profiles = pd.read_csv(profile_csv_path)
+    df_profiles = df_profiles.dropna(subset=['rag_query_text', 'user_id'])
+    print(f"  > '{profile_csv_path}' 파일 로드 완료: {len(df_profiles)}개 프로필")
+    return df_profiles
+  except FileNotFoundError:
+    print(f"[오류] '{profile_csv_path}' 파일을 찾을 수 없습니다.")
+  except Exception as e:
+    print(f"[오류] 프로필 파일 로드 실패: {e}")
+  return None
+
+
+def encode_documents(texts, batch_size=EMBED_BATCH_SIZE, num_processes=EMBED_NUM_PROCESSES):
+  """
+  문서 임베딩을 직접 계산합니다. (컬렉션 embedding_function의 단일 코어 순차 인코딩 대신)
+  - 길이순으로 정렬해 배치를 만들어 패딩 낭비를 줄이고, 원래 순서로 되돌려 반환
+  - num_processes > 1이면 SentenceTransformer 멀티프로세스 풀 사용
+  """
+  if sentence_embedder is None:
+    raise RuntimeError("sentence_embedder가 없습니다. build_vector_db()를 먼저 실행하세요.")
+  if not texts:
+    return []
+
+  start = time.perf_counter()
+  order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+  sorted_texts = [texts[i] for i in order]
+
+  if num_processes > 1 and len(texts) > batch_size:
+    pool = sentence_embedder.start_multi_process_pool(target_devices=["cpu"] * num_processes)
+    try:
+      sorted_embeddings = sentence_embedder.encode_multi_process(sorted_texts, pool, batch_size=batch_size)
+    finally:
+      sentence_embedder.stop_multi_process_pool(pool)
+  else:
+    sorted_embeddings = sentence_embedder.encode(sorted_texts, batch_size=batch_size, convert_to_numpy=True)
+
+  embeddings = [None] * len(texts)
+  for sorted_i, original_i in enumerate(order):
+    embeddings[original_i] = sorted_embeddings[sorted_i].tolist()
+
+  elapsed = time.perf_counter() - start
+  print(f"  > 문서 {len(texts)}개 임베딩 완료: {elapsed:.1f}초 ({len(texts) / max(elapsed, 1e-9):.0f} rows/sec, "
+        f"프로세스 {num_processes}개, 배치 {batch_size})")
+  return embeddings
+
+
+def add_with_embeddings(target_collection, ids, documents, metadatas, upsert=False):
+  """ 임베딩을 미리 계산해 add(embeddings=...) / upsert(embeddings=...)로 배치 적재 """
+  embeddings = encode_documents(documents)
+  write = target_collection.upsert if upsert else target_collection.add
+  for i in range(0, len(ids), SYNC_BATCH_SIZE):
+    end_i = min(i + SYNC_BATCH_SIZE, len(ids))
+    write(
+      ids=ids[i:end_i],
+      documents=documents[i:end_i],
+      metadatas=metadatas[i:end_i],
+      embeddings=embeddings[i:end_i]
+    )
+
+
+def sync_collection(target_collection, ids, documents, metadatas):
+  """
+  (증분 동기화) 행별 content_hash를 비교해 새/변경된 ID만 upsert (재임베딩),
+  CSV에서 사라진 ID는 삭제합니다. -> {'upserted', 'deleted', 'unchanged', 'seconds'}
+  (해시가 없는 기존 행은 변경으로 간주: 첫 동기화 때 한 번만 재임베딩)
+  """
+  start = time.perf_counter()
+  existing = target_collection.get(include=["metadatas"])
+  existing_hashes = {
+    rid: (meta or {}).get(CONTENT_HASH_KEY)
+    for rid, meta in zip(existing["ids"], existing["metadatas"])
+  }
+
+  changed = [
+    i for i, (rid, meta) in enumerate(zip(ids, metadatas))
+    if existing_hashes.get(rid) != meta[CONTENT_HASH_KEY]
+  ]
+  if changed:
+    add_with_embeddings(
+      target_collection,
+      [ids[i] for i in changed],
+      [documents[i] for i in changed],
+      [metadatas[i] for i in changed],
+      upsert=True
+    )
+
+  removed = list(set(existing_hashes) - set(ids))
+  for start_i in range(0, len(removed), SYNC_BATCH_SIZE):
+    target_collection.delete(ids=removed[start_i:start_i + SYNC_BATCH_SIZE])
+
+  stats = {
+    "upserted": len(changed),
+    "deleted": len(removed),
+    "unchanged": len(ids) - len(changed),
+    "seconds": round(time.perf_counter() - start, 2),
+  }
+  print(f"  > '{target_collection.name}' 증분 동기화: 변경/신규 {stats['upserted']}개 upsert, "
+        f"삭제 {stats['deleted']}개, 유지 {stats['unchanged']}개 ({stats['seconds']}초)")
+  return stats
+
+
+def _record_sync_failure(collection_name, error):
+  """ 증분 동기화 실패: 기존 컬렉션을 그대로 사용하고 last_db_sync에 오류만 기록 """
+  print(f"[경고] '{collection_name}' 증분 동기화 실패, 기존 컬렉션을 그대로 사용합니다: {error}")
+  last_db_sync[collection_name] = {"upserted": 0, "deleted": 0, "unchanged": None, "error": str(error)}
+
+
+def build_vector_db(store_csv_path, profile_csv_path, clear_db=False, sync=False):
   """
   (함수 3/9 - 수정됨)
   레스토랑 DataFrame과 프로필 DataFrame을 받아
   ChromaDB를 구축하거나 로드합니다. (2개 컬렉션)
+  (sync=True: 기존 컬렉션을 로드한 뒤 CSV와 content_hash 기준으로 증분 동기화)
   """
-  global collection, profile_collection, sentence_embedder # (전역 변수 3개 할당)
+  global collection, profile_collection, sentence_embedder, last_db_sync # (전역 변수 4개 할당)
   
   print("\n--- 2단계: VectorDB 구축/로드 시작 ---")
+  last_db_sync = {}
   
-  model_name = "distiluse-base-multilingual-cased-v1"
-  sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name=model_name
-  )
-  
-  sentence_embedder = sentence_transformer_ef._model
-  print(f"  > SentenceTransformer 모델 ('{model_name}')을 전역 'sentence_embedder'에 저장했습니다.")
+  model_name = EMBEDDING_MODEL_NAME
+  if EMBEDDING_BACKEND == "torch":
+    sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
+      model_name=model_name
+    )
+    sentence_embedder = sentence_transformer_ef._model
+  else:
+    # (ONNX int8 백엔드: 모델 1개만 로드해 질의 임베딩 / 컬렉션 embedding_function에 같이 사용)
+    sentence_embedder = load_sentence_embedder(
+      model_name, EMBEDDING_BACKEND, ONNX_MODEL_DIR, ONNX_QUANTIZATION_CONFIG
+    )
+    sentence_transformer_ef = SentenceEmbedderFunction(sentence_embedder)
+  print(f"  > SentenceTransformer 모델 ('{model_name}', {EMBEDDING_BACKEND})을 전역 'sentence_embedder'에 저장했습니다.")
+  _embed_query_cached.cache_clear() # (모델이 바뀌었을 수 있으므로 질의 임베딩 캐시 초기화)
   
   print(f"'{DB_PERSISTENT_PATH}' 경로에서 Persistent DB 클라이언트를 초기화합니다...")
   client = chromadb.PersistentClient(path=DB_PERSISTENT_PATH)
@@ -124,6 +309,8 @@ def build_vector_db(store_csv_path, profile_csv_path, clear_db=False):
       print(f"  > '{PROFILE_COLLECTION_NAME}' 삭제 실패 (무시): {e}")
 
   # --- 1. 레스토랑 컬렉션 로드 ---
+  # (컬렉션 조회만 try: 동기화 오류를 '컬렉션 없음'으로 오인해 create_collection 하지 않도록)
+  collection = None
   try:
     print(f"\n[1/2] 기존 '{RESTAURANT_COLLECTION_NAME}' 컬렉션 로드를 시도합니다...")
     collection = client.get_collection(
@@ -133,6 +320,17 @@ def build_vector_db(store_csv_path, profile_csv_path, clear_db=False):
     print(f"  > 'restaurants' 로드 완료: {collection.count()}개")
   except Exception as e:
     print(f"  > 'restaurants' 컬렉션을 찾을 수 없습니다. (이유: {e})")
+
+  if collection is not None:
+    if sync:
+      try:
+        df_for_embedding = load_and_prepare_data(store_csv_path)
+        if df_for_embedding is None:
+          raise FileNotFoundError(f"'{store_csv_path}' 로드 실패")
+        last_db_sync[RESTAURANT_COLLECTION_NAME] = sync_collection(collection, *_restaurant_records(df_for_embedding))
+      except Exception as e:
+        _record_sync_failure(RESTAURANT_COLLECTION_NAME, e)
+  else:
     print("  > 새 'restaurants' 컬렉션을 생성하고 데이터 적재를 시작합니다.")
     
     df_for_embedding = load_and_prepare_data(store_csv_path)
@@ -149,36 +347,17 @@ def build_vector_db(store_csv_path, profile_csv_path, clear_db=False):
       print(f"[오류] 'restaurants' 컬렉션 생성 실패: {e}")
       return False
 
-    documents_list = df_for_embedding['RAG텍스트'].tolist()
-    metadatas_list = df_for_embedding['메타데이터'].tolist() 
-    ids_list = df_for_embedding['id'].astype(str).tolist()
-
     print("  > 'restaurants' 메타데이터 변환 중...")
-    processed_metadatas = []
-    for metadata_dict in metadatas_list:
-      processed_meta_item = {}
-      for key, value in metadata_dict.items():
-        if value is None:
-          processed_meta_item[key] = "" 
-        elif isinstance(value, list):
-          processed_meta_item[key] = ",".join(map(str, value))
-        else:
-          # (True -> "True", False -> "False", 123 -> "123")
-          processed_meta_item[key] = str(value)
-      processed_metadatas.append(processed_meta_item)
+    ids_list, documents_list, processed_metadatas = _restaurant_records(df_for_embedding)
 
     print(f"  > 'restaurants' DB에 {len(ids_list)}개 적재 중 (배치)...")
-    BATCH_SIZE = 5000
-    for i in range(0, len(ids_list), BATCH_SIZE):
-      end_i = min(i + BATCH_SIZE, len(ids_list))
-      collection.add(
-        documents=documents_list[i:end_i],
-        metadatas=processed_metadatas[i:end_i],
-        ids=ids_list[i:end_i]
-      )
+    add_with_embeddings(collection, ids_list, documents_list, processed_metadatas)
     print(f"  > 'restaurants' 신규 구축 완료: {collection.count()}개")
+    # (신규 구축도 변경으로 기록 -> 저장된 벡터 인덱스를 다시 내보냄)
+    last_db_sync[RESTAURANT_COLLECTION_NAME] = {"upserted": len(ids_list), "deleted": 0, "unchanged": 0, "created": True}
 
   # --- 2. 프로필 컬렉션 로드 ---
+  profile_collection = None
   try:
     print(f"\n[2/2] 기존 '{PROFILE_COLLECTION_NAME}' 컬렉션 로드를 시도합니다...")
     profile_collection = client.get_collection(
@@ -188,18 +367,22 @@ def build_vector_db(store_csv_path, profile_csv_path, clear_db=False):
     print(f"  > 'mock_profiles' 로드 완료: {profile_collection.count()}개")
   except Exception as e:
     print(f"  > 'mock_profiles' 컬렉션을 찾을 수 없습니다. (이유: {e})")
+
+  if profile_collection is not None:
+    if sync:
+      try:
+        df_profiles = _load_profiles(profile_csv_path)
+        if df_profiles is None:
+          raise FileNotFoundError(f"'{profile_csv_path}' 로드 실패")
+        last_db_sync[PROFILE_COLLECTION_NAME] = sync_collection(profile_collection, *_profile_records(df_profiles))
+      except Exception as e:
+        _record_sync_failure(PROFILE_COLLECTION_NAME, e)
+  else:
     print("  > 새 'mock_profiles' 컬렉션을 생성하고 데이터 적재를 시작합니다.")
     
-    try:
-      # (프로필 DB 파일 로드)
-      df_profiles = pd.read_csv(profile_csv_path)
-      df_profiles = df_profiles.dropna(subset=['rag_query_text', 'user_id'])
-      print(f"  > '{profile_csv_path}' 파일 로드 완료: {len(df_profiles)}개 프로필")
-    except FileNotFoundError:
-      print(f"[오류] '{profile_csv_path}' 파일을 찾을 수 없습니다.")
-      return False
-    except Exception as e:
-      print(f"[오류] 프로필 파일 로드 실패: {e}")
+    # (프로필 DB 파일 로드)
+    df_profiles = _load_profiles(profile_csv_path)
+    if df_profiles is None:
       return False
 
     try:
@@ -211,37 +394,91 @@ def build_vector_db(store_csv_path, profile_csv_path, clear_db=False):
       print(f"[오류] 'mock_profiles' 컬렉션 생성 실패: {e}")
       return False
 
-    profile_docs = df_profiles['rag_query_text'].tolist()
-    profile_ids = df_profiles['user_id'].astype(str).tolist()
-    profile_metas = [{'user_id': uid} for uid in profile_ids]
+    profile_ids, profile_docs, profile_metas = _profile_records(df_profiles)
 
     print(f"  > 'mock_profiles' DB에 {len(profile_ids)}개 적재 중...")
-    profile_collection.add(
-      documents=profile_docs,
-      metadatas=profile_metas,
-      ids=profile_ids
-    )
+    add_with_embeddings(profile_collection, profile_ids, profile_docs, profile_metas)
     print(f"  > 'mock_profiles' 신규 구축 완료: {profile_collection.count()}개")
 
   print(f"--- 2단계: VectorDB 2개 컬렉션 로드/구축 완료 ---")
   return True
 
+
+def embed_query(text: str) -> List[float]:
+  """
+  질의 텍스트 1개 -> 임베딩 벡터 (collection.query(query_embeddings=...)용)
+  전역 'sentence_embedder'로 계산하며, 같은 문자열은 LRU 캐시에서 반환합니다.
+  (컬렉션의 embedding_function과 같은 모델/설정이므로 query_texts와 같은 결과)
+  """
+  return list(_embed_query_cached(text))
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _embed_query_cached(text: str):
+  if sentence_embedder is None:
+    raise RuntimeError("sentence_embedder가 없습니다. build_vector_db()를 먼저 실행하세요.")
+  vector = sentence_embedder.encode([text], convert_to_numpy=True)[0]
+  return tuple(vector.tolist())
+
+
+def load_vector_index(index_path=VECTOR_INDEX_FILE, dtype=VECTOR_INDEX_DTYPE, rebuild=False):
+  """
+  1단계 RAG용 인메모리 벡터 인덱스를 로드합니다.
+  (파일이 없거나 rebuild=True면 'restaurants' 컬렉션에서 한 번 내보내 index_path에 저장)
+  (저장된 파일의 컬렉션 지문(개수 / id 해시 / 임베딩 모델·백엔드)이 현재와 다르면 다시 내보냄)
+  """
+  global restaurant_vector_index
+
+  if collection is None:
+    print("[오류] 'restaurants' 컬렉션이 없어 벡터 인덱스를 만들 수 없습니다.")
+    return None
+  fingerprint = collection_fingerprint(collection, EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+
+  index = None if rebuild else InMemoryVectorIndex.load(index_path, dtype=dtype)
+  if index is not None and index.source != fingerprint:
+    print(f"  > [정보] '{index_path}'가 현재 컬렉션 / 임베딩 모델과 다릅니다. (저장: {index.source or '지문 없음'})")
+    index = None
+  if index is None:
+    print(f"  > 'restaurants' 컬렉션에서 벡터 인덱스를 내보냅니다 -> '{index_path}'")
+    index = InMemoryVectorIndex.from_collection(collection, dtype=dtype, source=fingerprint)
+    index.save(index_path)
+
+  restaurant_vector_index = index
+  print(f"  > 벡터 인덱스 로드 완료: {len(index)}개 ({dtype}, {index.vectors.nbytes / 1e6:.1f}MB)")
+  return index
+
+
+def build_metadata_index(keys=METADATA_FILTER_KEYS, token_keys=METADATA_TOKEN_KEYS):
+  """
+  'restaurants' 컬렉션 메타데이터로 필터 키별 비트맵 인덱스를 만듭니다.
+  (1단계 RAG가 벡터 검색 전에 필터 결과 개수를 계산하고 완화 조합을 고를 때 사용)
+  (같은 인덱스의 컬럼 배열 / 토큰 비트마스크로 검색 결과 filter_score를 한 번에 계산)
+  """
+  global restaurant_metadata_index
+
+  if collection is None:
+    print("[오류] 'restaurants' 컬렉션이 없어 메타데이터 인덱스를 만들 수 없습니다.")
+    return None
+
+  restaurant_metadata_index = MetadataBitmapIndex.from_collection(collection, keys, token_keys)
+  print(f"  > 메타데이터 비트맵 인덱스 구축 완료: {restaurant_metadata_index.n}개 x 키 {len(keys)}개, "
+        f"토큰 키 {len(token_keys)}개")
+  return restaurant_metadata_index
+
+
 def load_user_ratings():
     """ 500명 평가 데이터를 로드하고 집계합니다. """
-    global df_all_user_ratings, df_restaurant_ratings_summary
+    global df_all_user_ratings, df_restaurant_ratings_summary, ratings_index
     try:
       print(f"'{MOCK_USER_RATINGS_FILE}'에서 500명 평가 데이터 로드 중...")
-      df_all_user_ratings = pd.read_csv(MOCK_USER_RATINGS_FILE)
+      df_all_user_ratings = columnar_store.read_frame(
+        MOCK_USER_RATINGS_FILE, "ratings", COLUMNAR_STORE_DIR, USE_COLUMNAR_STORE
+      ) # (restaurant_id / user_id는 문자열로 정리된 상태)
       
-      if 'restaurant_id' in df_all_user_ratings.columns:
-        df_all_user_ratings['restaurant_id'] = df_all_user_ratings['restaurant_id'].apply(str)
-      else:
+      if 'restaurant_id' not in df_all_user_ratings.columns:
         print("[경고] 'restaurant_id' 컬럼이 500명 평가 파일에 없습니다.")
         raise KeyError("'restaurant_id' 컬럼 누락")
       
-      if 'user_id' in df_all_user_ratings.columns:
-        df_all_user_ratings['user_id'] = df_all_user_ratings['user_id'].apply(str)
-      else:
+      if 'user_id' not in df_all_user_ratings.columns:
         print("[경고] 'user_id' 컬럼이 500명 평가 파일에 없습니다.")
         raise KeyError("'user_id' 컬럼 누락")
 
@@ -262,6 +499,7 @@ def load_user_ratings():
         ratings_crosstab['미추천'] = 0
         
       df_restaurant_ratings_summary = ratings_crosstab[['추천', '미추천']].reset_index()
+      ratings_index = RatingsIndex(df_all_user_ratings, df_restaurant_ratings_summary)
       
       print(f"  > 500명 평가 데이터 집계 완료: {len(df_restaurant_ratings_summary)}개 식당")
       return True
@@ -278,31 +516,114 @@ def load_scoring_data(file_path):
     """ (기존 main.py의 lifespan) 점수제용 식당 데이터를 로드합니다. """
     global all_restaurants_df_scoring
     try:
-        all_restaurants_df_scoring = pd.read_csv(file_path)
-        all_restaurants_df_scoring['id'] = all_restaurants_df_scoring['id'].astype(str)
-        all_restaurants_df_scoring = all_restaurants_df_scoring.set_index('id')
+        all_restaurants_df_scoring = columnar_store.read_frame(
+            file_path, "scoring", COLUMNAR_STORE_DIR, USE_COLUMNAR_STORE
+        ) # (id 인덱스 설정된 상태)
         if 'price' not in all_restaurants_df_scoring.columns:
             print("Info: 'price' 컬럼이 없어 임의로 생성합니다. (테스트용)")
             all_restaurants_df_scoring['price'] = ['$'] * (len(all_restaurants_df_scoring) // 2) + ['$$'] * (len(all_restaurants_df_scoring) - len(all_restaurants_df_scoring) // 2)
         
         print(f"Success: {file_path} 로드 성공. (총 {len(all_restaurants_df_scoring)}개 식당)")
+        build_spatial_index(all_restaurants_df_scoring)
+        build_restaurant_view()
         return True
     except FileNotFoundError:
         print(f"Error: {file_path} 파일을 찾을 수 없습니다.", file=sys.stderr)
         all_restaurants_df_scoring = pd.DataFrame()
         return False
     
-def get_restaurants_by_ids(ids: List[str]) -> pd.DataFrame:
+def build_spatial_index(df, cell_deg=SPATIAL_GRID_CELL_DEG):
+    """ 식당 좌표(Y좌표=위도, X좌표=경도)로 격자 공간 인덱스를 구축합니다. """
+    global restaurant_spatial_index
+    try:
+        restaurant_spatial_index = RestaurantGridIndex(
+            df.index.tolist(),
+            pd.to_numeric(df['Y좌표'], errors='coerce'),
+            pd.to_numeric(df['X좌표'], errors='coerce'),
+            cell_deg=cell_deg
+        )
+        print(f"  > 공간 인덱스 구축 완료: {len(restaurant_spatial_index)}개 식당 ({len(restaurant_spatial_index.grid)}개 격자)")
+    except Exception as e:
+        print(f"[경고] 공간 인덱스 구축 실패 (거리 사전 필터 비활성화): {e}")
+        restaurant_spatial_index = None
+
+def load_travel_matrix(matrix_path=TRAVEL_MATRIX_FILE, meta_path=TRAVEL_MATRIX_META_FILE):
+    """ build_travel_matrix.py가 만든 이동 마찰 점수 행렬을 메모리 맵으로 엽니다. """
+    global travel_matrix
+    try:
+        travel_matrix = TravelMatrix.load(matrix_path, meta_path)
+        if travel_matrix is None:
+            print(f"[정보] '{matrix_path}' 행렬 파일이 없습니다. (GraphHopper 실시간 호출만 사용)")
+            return False
+        print(f"Success: 이동 마찰 점수 행렬 로드 완료 {travel_matrix.scores.shape} (출발지 x 식당)")
+        return True
+    except Exception as e:
+        print(f"[경고] 이동 마찰 점수 행렬 로드 실패 (GraphHopper 실시간 호출만 사용): {e}")
+        travel_matrix = None
+        return False
+
+# (df_restaurants 한글 컬럼 -> 응답용 영문 별칭)
+DISPLAY_COLUMN_MAPPING = {
+    '가게': 'name',
+    '주소': 'address',
+    '카테고리': 'cuisine_type',
+    '이미지URL': 'image_url',
+    'LLM요약': 'summary',
+    '평점': 'rating'
+}
+DISPLAY_COLUMNS = ['image_url', 'summary', 'rating', 'address', 'name', 'cuisine_type']
+
+
+def build_restaurant_view():
     """
-    식당 ID 리스트를 받아 DataFrame을 반환합니다.
-    없는 ID는 건너뛰고 있는 것만 반환합니다.
+    get_restaurants_by_ids용 사전 조인 테이블을 만듭니다. (스코어링 DB + df_restaurants 표시용 영문 별칭 컬럼)
+    + id -> 행 위치 맵 (요청마다 전체 reset_index / merge 없이 take 한 번으로 조회)
+    load_app_data / load_scoring_data가 끝날 때마다 다시 만듭니다. (같은 id가 여러 행이면 첫 행 사용)
     """
-    global all_restaurants_df_scoring, df_restaurants
+    global restaurant_view, restaurant_view_pos
 
     # 1순위: all_restaurants_df_scoring, 2순위: df_restaurants
     source_df = all_restaurants_df_scoring if (all_restaurants_df_scoring is not None and not all_restaurants_df_scoring.empty) else df_restaurants
-
     if source_df is None or source_df.empty:
+        restaurant_view, restaurant_view_pos = None, {}
+        return None
+
+    view = source_df[~source_df.index.duplicated(keep='first')].copy()
+
+    # df_restaurants의 image_url 등 표시 필드 보완 (기존 merge + '_orig' fillna와 같은 결과)
+    if df_restaurants is not None and not df_restaurants.empty and source_df is not df_restaurants:
+        display_df = df_restaurants[~df_restaurants.index.duplicated(keep='first')]
+        aliased = {}
+        for kor_col, eng_col in DISPLAY_COLUMN_MAPPING.items():
+            if kor_col in display_df.columns and eng_col not in display_df.columns:
+                aliased[eng_col] = display_df[kor_col]
+        for col in DISPLAY_COLUMNS:
+            if col in display_df.columns:
+                aliased[col] = display_df[col]
+
+        for col in DISPLAY_COLUMNS:
+            if col not in aliased:
+                continue
+            aligned = aliased[col].reindex(view.index)
+            view[col] = view[col].fillna(aligned) if col in view.columns else aligned
+
+    view.index.name = 'id'
+    restaurant_view = view
+    restaurant_view_pos = {rid: pos for pos, rid in enumerate(view.index)}
+    print(f"  > 식당 조회 테이블 구축 완료: {len(view)}개 (컬럼 {len(view.columns)}개)")
+    return restaurant_view
+
+
+def get_restaurants_by_ids(ids: List[str], view=None, view_pos=None) -> pd.DataFrame:
+    """
+    식당 ID 리스트를 받아 DataFrame을 반환합니다.
+    없는 ID는 건너뛰고 있는 것만 반환합니다.
+    (사전 조인 테이블에서 위치 take -> 후보 수에 비례하는 비용)
+    (view / view_pos: 특정 데이터 스냅샷의 조회 테이블, 생략하면 전역 restaurant_view)
+    """
+    if view is None:
+        view, view_pos = restaurant_view, restaurant_view_pos
+    if view is None:
         print("[오류] 사용 가능한 DB가 없습니다.")
         return pd.DataFrame()
 
@@ -310,64 +631,17 @@ def get_restaurants_by_ids(ids: List[str]) -> pd.DataFrame:
         unique_ids = list(dict.fromkeys(ids))
 
         # 존재하는 ID만 필터링
-        valid_ids = [id for id in unique_ids if id in source_df.index]
+        positions = [view_pos[rid] for rid in unique_ids if rid in view_pos]
 
-        if not valid_ids:
+        if not positions:
             print(f"[경고] 요청된 {len(unique_ids)}개 ID 중 사용 가능한 ID가 없습니다.")
             return pd.DataFrame()
 
-        if len(valid_ids) < len(unique_ids):
-            missing_count = len(unique_ids) - len(valid_ids)
-            print(f"[정보] {missing_count}개 ID를 찾을 수 없어 건너뜁니다. ({len(valid_ids)}개 반환)")
-
-        result_df = source_df.loc[valid_ids].copy()
-
-        # df_restaurants와 merge하여 image_url 등 추가 필드 보완
-        if df_restaurants is not None and not df_restaurants.empty and source_df is not df_restaurants:
-            result_df_reset = result_df.reset_index()
-            df_restaurants_reset = df_restaurants.reset_index()
-
-            # 한글 컬럼명을 영문으로 매핑
-            column_mapping = {
-                '가게': 'name',
-                '주소': 'address',
-                '카테고리': 'cuisine_type',
-                '이미지URL': 'image_url',
-                'LLM요약': 'summary',
-                '평점': 'rating'
-            }
-
-            # df_restaurants에 영문 컬럼명 추가 (기존 한글명 유지하면서)
-            for kor_col, eng_col in column_mapping.items():
-                if kor_col in df_restaurants_reset.columns and eng_col not in df_restaurants_reset.columns:
-                    df_restaurants_reset[eng_col] = df_restaurants_reset[kor_col]
-
-            # 필요한 컬럼만 선택 (존재하는 컬럼만)
-            merge_cols = ['id']
-            for col in ['image_url', 'summary', 'rating', 'address', 'name', 'cuisine_type']:
-                if col in df_restaurants_reset.columns:
-                    merge_cols.append(col)
-
-            merged = result_df_reset.merge(
-                df_restaurants_reset[merge_cols],
-                on='id',
-                how='left',
-                suffixes=('', '_orig')
-            )
-
-            # 중복 컬럼 처리
-            for col in ['name', 'cuisine_type', 'address', 'rating', 'summary', 'image_url']:
-                if f'{col}_orig' in merged.columns:
-                    merged[col] = merged[col].fillna(merged[f'{col}_orig'])
-                    merged = merged.drop(columns=[f'{col}_orig'])
-
-            merged = merged.set_index('id')
-
-            # 원래 순서 유지
-            merged = merged.loc[valid_ids]
-            return merged
-
-        return result_df
+        if len(positions) < len(unique_ids):
+            missing_count = len(unique_ids) - len(positions)
+            print(f"[정보] {missing_count}개 ID를 찾을 수 없어 건너뜁니다. ({len(positions)}개 반환)")
+
+        return view.take(positions)
 
     except Exception as e:
         print(f"[오류] get_restaurants_by_ids: {e}")
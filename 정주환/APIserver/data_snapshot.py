@@ -0,0 +1,253 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+import columnar_store
+import data_loader
+
+# 데이터셋 스냅샷 + 무중단 핫 리로드
+# - DataSnapshot: data_loader가 로드한 데이터셋 / 파생 인덱스 참조를 한 객체로 묶은 불변 스냅샷
+#   (요청 경로(app.py / search_logic.py)는 data_loader 전역 변수 대신 current()의 스냅샷을 읽음)
+# - 요청 시작 시 pin()으로 현재 스냅샷을 요청 컨텍스트에 고정 -> 처리 중 교체돼도 끝까지 이전 스냅샷 사용
+# - DataReloader: 원본 파일 mtime 변경(감시 태스크) 또는 관리자 API로 백그라운드 스레드에서 새 스냅샷을 만들고
+#   참조 1개 대입으로 원자적 교체 (이전 스냅샷은 마지막 요청이 끝나면 GC)
+# - data_loader 전역 변수는 로더들이 쓰는 작업 공간 (리로드 실패 시 활성 스냅샷 값으로 되돌림)
+# - Chroma 컬렉션 / 임베딩 모델 / 벡터·메타데이터 인덱스는 리로드하지 않고 이어받음
+#   (영구 저장소를 공유하므로 스냅샷별 격리가 안 됨 -> 변경은 재시작 시 INCREMENTAL_DB_SYNC로 반영)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """ 한 시점의 데이터셋 / 파생 인덱스 묶음 (공유 객체이므로 DataFrame 등을 수정하지 말 것) """
+    version: int
+    built_at: float
+    # (CSV 기반 데이터셋 + 파생 인덱스: 리로드 대상)
+    df_restaurants: Optional[pd.DataFrame] = None
+    df_menus: Optional[pd.DataFrame] = None
+    menu_groups: Any = None
+    menu_index: Any = None
+    df_all_user_ratings: Optional[pd.DataFrame] = None
+    df_restaurant_ratings_summary: Optional[pd.DataFrame] = None
+    ratings_index: Any = None
+    all_restaurants_df_scoring: Optional[pd.DataFrame] = None
+    restaurant_spatial_index: Any = None
+    restaurant_view: Optional[pd.DataFrame] = None
+    restaurant_view_pos: Dict[str, int] = field(default_factory=dict)
+    travel_matrix: Any = None
+    # (Chroma / 벡터 검색: 리로드 시 이어받음)
+    collection: Any = None
+    profile_collection: Any = None
+    restaurant_vector_index: Any = None
+    restaurant_metadata_index: Any = None
+    # (스냅샷을 만들 때의 원본 파일 mtime: 감시 태스크가 비교)
+    sources: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    def get_restaurants_by_ids(self, ids: List[str]) -> pd.DataFrame:
+        """ 이 스냅샷의 사전 조인 테이블로 data_loader.get_restaurants_by_ids """
+        return data_loader.get_restaurants_by_ids(ids, self.restaurant_view, self.restaurant_view_pos)
+
+    def nbytes(self) -> int:
+        """ 리로드 대상 데이터셋의 대략적인 메모리 (DataFrame deep + NumPy 배열) """
+        return sum(_nbytes(getattr(self, name)) for name in RELOADED_FIELDS)
+
+
+DATASET_FIELDS = [f.name for f in fields(DataSnapshot) if f.name not in ("version", "built_at", "sources")]
+RELOADED_FIELDS = [
+    "df_restaurants", "df_menus", "menu_index", "df_all_user_ratings", "df_restaurant_ratings_summary",
+    "ratings_index", "all_restaurants_df_scoring", "restaurant_spatial_index", "restaurant_view",
+    "travel_matrix",
+]
+
+_active: Optional[DataSnapshot] = None
+_pinned: contextvars.ContextVar = contextvars.ContextVar("data_snapshot", default=None)
+
+
+def source_paths() -> List[str]:
+    """ 감시할 원본 파일 (CSV + Arrow 열 저장소 파일 + 이동 마찰 점수 행렬) """
+    csv_paths = [
+        config.RESTAURANT_DB_FILE, config.MENU_DB_FILE,
+        config.RESTAURANT_DB_SCORING_FILE, config.MOCK_USER_RATINGS_FILE,
+    ]
+    arrow_paths = [columnar_store.arrow_path_for(p, config.COLUMNAR_STORE_DIR) for p in csv_paths]
+    return csv_paths + arrow_paths + [config.TRAVEL_MATRIX_FILE, config.TRAVEL_MATRIX_META_FILE]
+
+
+def source_mtimes() -> Dict[str, Optional[float]]:
+    """ 파일 -> mtime (없으면 None) """
+    return {path: os.path.getmtime(path) if os.path.exists(path) else None for path in source_paths()}
+
+
+def capture(version: int = 0, sources: Optional[Dict[str, Optional[float]]] = None) -> DataSnapshot:
+    """ 현재 data_loader 전역 변수로 스냅샷 생성 (참조만 묶음, 복사 없음) """
+    return DataSnapshot(
+        version=version,
+        built_at=time.time(),
+        sources=sources or {},
+        **{name: getattr(data_loader, name) for name in DATASET_FIELDS}
+    )
+
+
+def publish(snapshot: DataSnapshot) -> DataSnapshot:
+    """ 활성 스냅샷 교체 (참조 1개 대입 -> 새 요청부터 적용, 처리 중인 요청은 pin()한 스냅샷 유지) """
+    global _active
+    _active = snapshot
+    return snapshot
+
+
+def active() -> Optional[DataSnapshot]:
+    return _active
+
+
+def pin() -> Optional[DataSnapshot]:
+    """
+    현재 활성 스냅샷을 이 요청의 컨텍스트에 고정합니다. (require_ready 의존성에서 호출)
+    (요청마다 별도 태스크 컨텍스트라 되돌릴 필요 없음)
+    """
+    snapshot = _active
+    _pinned.set(snapshot)
+    return snapshot
+
+
+def current() -> DataSnapshot:
+    """
+    요청 경로에서 읽을 스냅샷: 고정된 스냅샷 -> 활성 스냅샷 -> data_loader 전역 변수 임시 스냅샷
+    (마지막은 publish 없이 로더만 호출하는 Gradio / 오프라인 스크립트 호환용)
+    """
+    return _pinned.get() or _active or capture()
+
+
+def _nbytes(value) -> int:
+    """ DataFrame은 deep memory_usage, 인덱스 객체는 NumPy 배열 속성 합계 (그 외 0) """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "__dict__"):
+        return sum(v.nbytes for v in vars(value).values() if isinstance(v, np.ndarray))
+    return 0
+
+
+def _rss_mb() -> Optional[float]:
+    """ 현재 프로세스 RSS (Linux /proc 기준, 없으면 None) """
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _travel_matrix_files_exist() -> bool:
+    return os.path.exists(config.TRAVEL_MATRIX_FILE) and os.path.exists(config.TRAVEL_MATRIX_META_FILE)
+
+
+def _restore_workspace(snapshot: DataSnapshot):
+    """ 리로드 실패 시 data_loader 전역 변수를 활성 스냅샷 값으로 되돌림 """
+    for name in DATASET_FIELDS:
+        setattr(data_loader, name, getattr(snapshot, name))
+
+
+class DataReloader:
+
+    def __init__(self, history_size: int = 10):
+        self._lock = threading.Lock() # (리로드는 한 번에 하나만)
+        self.history: List[Dict[str, Any]] = []
+        self.history_size = history_size
+        self._failed_sources: Optional[Dict[str, Optional[float]]] = None # (마지막 실패 시점 mtime: 같은 상태로 재시도 안 함)
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def changed_sources(self) -> List[str]:
+        """ 활성 스냅샷 이후 mtime이 바뀐 원본 파일 목록 """
+        snapshot = _active
+        if snapshot is None:
+            return []
+        return [path for path, mtime in source_mtimes().items() if snapshot.sources.get(path) != mtime]
+
+    def reload(self, reason: str = "manual") -> Dict[str, Any]:
+        """
+        (블로킹, 스레드에서 호출) CSV 기반 데이터셋 / 파생 인덱스로 새 스냅샷을 만들어 교체합니다.
+        -> 결과 dict (status: reloaded / failed / busy, 소요 시간, 데이터셋 / RSS 메모리 변화)
+        """
+        if not self._lock.acquire(blocking=False):
+            return {"status": "busy", "reason": reason}
+        try:
+            return self._reload(reason)
+        finally:
+            self._lock.release()
+
+    def _reload(self, reason: str) -> Dict[str, Any]:
+        old = _active
+        if old is None:
+            return {"status": "failed", "reason": reason, "error": "활성 스냅샷 없음 (워밍업 진행 중)"}
+
+        print(f"--- 데이터 리로드 시작 ({reason}) ---")
+        result = {"status": "failed", "reason": reason, "from_version": old.version, "error": None}
+        sources = source_mtimes() # (로드 전에 기록: 로드 중 바뀐 파일은 다음 감시 주기에 다시 리로드)
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        try:
+            loaded = (
+                data_loader.load_app_data(config.RESTAURANT_DB_FILE, config.MENU_DB_FILE)
+                and data_loader.load_user_ratings()
+                and data_loader.load_scoring_data(config.RESTAURANT_DB_SCORING_FILE)
+            )
+            if not loaded:
+                raise RuntimeError("필수 데이터셋 로드 실패")
+            # (선택: 파일이 없으면 travel_matrix=None, 실시간 라우팅)
+            # (파일이 있는데 로드 실패 = 재빌드 도중 / 행렬-메타 불일치 -> 이전 스냅샷 유지, 다음 변경 때 재시도)
+            if not data_loader.load_travel_matrix() and _travel_matrix_files_exist():
+                raise RuntimeError("이동 마찰 점수 행렬과 메타 정보가 일치하지 않음 (재빌드 진행 중?)")
+            new = publish(capture(version=old.version + 1, sources=sources))
+        except Exception as e:
+            _restore_workspace(old)
+            result["error"] = str(e)
+            self._failed_sources = sources
+            print(f"[오류] 데이터 리로드 실패, 기존 스냅샷(v{old.version}) 유지: {e}")
+        else:
+            old_mb, new_mb = old.nbytes() / 1e6, new.nbytes() / 1e6
+            rss_after = _rss_mb()
+            self._failed_sources = None
+            result.update(
+                status="reloaded",
+                version=new.version,
+                travel_matrix_build_id=getattr(new.travel_matrix, "build_id", None),
+                dataset_mb={"before": round(old_mb, 1), "after": round(new_mb, 1), "delta": round(new_mb - old_mb, 1)},
+                rss_mb={"before": rss_before, "after": rss_after,
+                        "delta": round(rss_after - rss_before, 1) if rss_before and rss_after else None},
+            )
+        result["seconds"] = round(time.perf_counter() - start, 2)
+        result["finished_at"] = time.time()
+        print(f"--- 데이터 리로드 {result['status']} ({result['seconds']}초) ---")
+
+        self.history = (self.history + [result])[-self.history_size:]
+        return result
+
+    async def watch(self, interval: float):
+        """
+        interval초마다 원본 파일 mtime을 확인해 바뀌었으면 백그라운드 스레드에서 리로드
+        (마지막 실패 때와 파일 상태가 같으면 건너뜀 -> 파일이 다시 바뀌면 재시도)
+        """
+        while True:
+            await asyncio.sleep(interval)
+            changed = self.changed_sources()
+            if changed and not self.running and source_mtimes() != self._failed_sources:
+                print(f"  > [리로드 감시] 변경된 파일: {changed}")
+                await asyncio.to_thread(self.reload, "file_change")
+
+    def snapshot(self) -> Dict[str, Any]:
+        current_snapshot = _active
+        return {
+            "version": current_snapshot.version if current_snapshot else None,
+            "built_at": current_snapshot.built_at if current_snapshot else None,
+            "running": self.running,
+            "changed_sources": self.changed_sources(),
+            "history": self.history,
+        }
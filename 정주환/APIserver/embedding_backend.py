@@ -0,0 +1,69 @@
+import os
+from typing import List
+
+from chromadb.utils.embedding_functions import EmbeddingFunction
+
+# 문장 임베딩 모델 백엔드 (config.EMBEDDING_BACKEND)
+# - "torch": 기존 fp32 PyTorch (SentenceTransformerEmbeddingFunction 내부 모델)
+# - "onnx-int8": Transformer 부분을 ONNX로 내보낸 뒤 동적 int8 양자화, onnxruntime(CPU)로 실행
+#   (Pooling / Dense 층은 sentence-transformers가 그대로 처리하므로 출력 차원/형식은 동일)
+# ONNX 백엔드는 sentence-transformers>=3.2 + onnxruntime(optimum[onnxruntime]) 필요
+
+SUPPORTED_BACKENDS = ("torch", "onnx-int8")
+
+
+def quantized_file_name(quantization_config: str) -> str:
+    """ export_dynamic_quantized_onnx_model()이 저장하는 파일 이름 """
+    return f"onnx/model_qint8_{quantization_config}.onnx"
+
+
+def export_onnx_int8(model_name: str, output_dir: str, quantization_config: str = "avx2") -> str:
+    """
+    model_name을 ONNX로 내보내고 동적 int8 양자화 모델을 output_dir에 저장합니다.
+    quantization_config: "arm64" / "avx2" / "avx512" / "avx512_vnni" (배포 CPU에 맞춰 선택)
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    print(f"  > '{model_name}' ONNX 내보내기 + int8 양자화({quantization_config}) -> '{output_dir}'")
+    model = SentenceTransformer(model_name, backend="onnx", device="cpu")
+    model.save_pretrained(output_dir)
+    export_dynamic_quantized_onnx_model(model, quantization_config, output_dir)
+    return os.path.join(output_dir, quantized_file_name(quantization_config))
+
+
+def load_sentence_embedder(
+    model_name: str,
+    backend: str = "torch",
+    onnx_dir: str = None,
+    quantization_config: str = "avx2"
+):
+    """ backend에 맞는 SentenceTransformer를 로드합니다. (onnx-int8: 양자화 파일이 없으면 한 번 내보냄) """
+    from sentence_transformers import SentenceTransformer
+
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"backend는 {SUPPORTED_BACKENDS} 중 하나여야 합니다: {backend}")
+    if backend == "torch":
+        return SentenceTransformer(model_name, device="cpu")
+
+    file_name = quantized_file_name(quantization_config)
+    if not os.path.exists(os.path.join(onnx_dir, file_name)):
+        export_onnx_int8(model_name, onnx_dir, quantization_config)
+    return SentenceTransformer(
+        onnx_dir,
+        backend="onnx",
+        device="cpu",
+        model_kwargs={"file_name": file_name, "provider": "CPUExecutionProvider"},
+    )
+
+
+class SentenceEmbedderFunction(EmbeddingFunction):
+    """
+    이미 로드된 sentence_embedder를 Chroma embedding_function으로 감쌉니다.
+    (ONNX 백엔드에서 SentenceTransformerEmbeddingFunction이 fp32 모델을 한 번 더 로드하지 않도록)
+    """
+
+    def __init__(self, model):
+        self._model = model
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return self._model.encode(list(input), convert_to_numpy=True).tolist()
@@ -88,7 +88,8 @@ async def _run_recommendation_flow(
     profile_data: dict, 
     http_client: httpx.AsyncClient, 
     graphhopper_url: str,
-    top_k: int # (★ topk_value를 top_k로 받음)
+    top_k: int, # (★ topk_value를 top_k로 받음)
+    circuit_breaker=None
 ) -> Tuple[gr.update, Dict]:
     """ 
     (신규 헬퍼 함수)
@@ -113,6 +114,7 @@ async def _run_recommendation_flow(
             "name": profile_data.get("name", "N/A"),
             "user_id": "live_user",
             "rag_query_text": profile_summary,
+            "rag_query": llm_utils.get_profile_rag_query(profile_data),
             "filter_metadata_json": filter_metadata_json,
             "final_candidate_ids": [],
             "final_scored_df": None,
@@ -151,7 +153,17 @@ async def _run_recommendation_flow(
                 user_start_location=user_start_coords,
                 user_price_prefs=user_price_prefs,
                 async_http_client=http_client,
-                graphhopper_url=graphhopper_url
+                graphhopper_url=graphhopper_url,
+                travel_matrix=data_loader.travel_matrix,
+                max_concurrency=config.GRAPH_HOPPER_MAX_CONCURRENCY,
+                request_timeout=config.GRAPH_HOPPER_REQUEST_TIMEOUT,
+                deadline=config.GRAPH_HOPPER_TOTAL_DEADLINE,
+                estimated_travel_score=config.ESTIMATED_TRAVEL_SCORE,
+                spatial_index=data_loader.restaurant_spatial_index,
+                max_route_distance_m=config.MAX_ROUTE_DISTANCE_M,
+                circuit_breaker=circuit_breaker,
+                departure_bucket_minutes=config.DEPARTURE_BUCKET_MINUTES,
+                departure_reference_dates=config.DEPARTURE_REFERENCE_DATES
             )
             
             # (DataFrame은 JSON 직렬화 불가 -> to_dict)
@@ -216,7 +228,8 @@ async def chat_survey(
     user_profile_row_state: Dict, # (★ app_main.py와 일치시킴)
     # (app.state에서 주입되는 자원)
     http_client: httpx.AsyncClient,
-    graphhopper_url: str
+    graphhopper_url: str,
+    circuit_breaker=None
 ) -> Tuple[List[Dict], List[Dict], Dict, bool, gr.update, Dict]:
     
     # 1. 사용자 메시지 추가
@@ -253,7 +266,8 @@ async def chat_survey(
             updated_profile, 
             http_client, 
             graphhopper_url,
-            top_k=topk_value # (★ 슬라이더의 topk_value 전달)
+            top_k=topk_value, # (★ 슬라이더의 topk_value 전달)
+            circuit_breaker=circuit_breaker
         )
         
         final_bot_message = f"{bot_message}\n{chat_message_html}\n\n👇 아래에서 추천 결과를 확인하세요! 👇"
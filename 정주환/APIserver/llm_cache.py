@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+
+# LLM 응답 2단 캐시
+# - 1단: 프로세스 내 LRU (OrderedDict)
+# - 2단: SQLite 파일 (서버 재시작 후에도 유지, 1단 miss일 때만 조회)
+# 키: 입력 텍스트를 정규화(NFKC + 공백 정리)한 sha256 + 프롬프트 버전
+#     (프롬프트를 바꾸면 버전을 올려서 이전 응답을 무효화)
+# - chatbot/llm_cache.py와 APIserver/llm_cache.py는 같은 모듈의 복사본 (들여쓰기만 다름) -> 수정 시 두 파일을 함께 맞출 것
+
+
+def normalize_text(text: str) -> str:
+    """ 유니코드 정규화 + 연속 공백/줄바꿈을 공백 1개로 """
+    return " ".join(unicodedata.normalize("NFKC", str(text)).split())
+
+
+def make_cache_key(text: str, prompt_version: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{prompt_version}:{digest}"
+
+
+class LLMResponseCache:
+
+    def __init__(
+        self,
+        name: str,
+        db_path: str = None,
+        maxsize: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        purge_interval_seconds: float = 3600
+    ):
+        self.name = name
+        self.db_path = db_path
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._last_purge = 0.0 # (마지막으로 만료 행을 지운 시각)
+
+        self._memory = OrderedDict() # (key -> (만료 시각(epoch), 값))
+        self._lock = threading.Lock() # (Gradio 콜백은 스레드에서 실행됨)
+        self._conn = None
+        self.hits = {"memory": 0, "sqlite": 0}
+        self.misses = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """ SQLite 연결 (첫 사용 시 생성, 실패하면 메모리 캐시만 사용) """
+        if self._conn is None and self.db_path:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "name TEXT, key TEXT, value TEXT, expires_at REAL, PRIMARY KEY (name, key))"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires_at ON llm_cache (expires_at)")
+                self._conn.commit()
+                self._purge_expired(self._conn, time.time())
+            except sqlite3.Error as e:
+                print(f"[LLM 캐시] '{self.name}' SQLite 열기 실패, 메모리 캐시만 사용: {e}")
+                self.db_path = None
+                self._conn = None
+        return self._conn
+
+    def _purge_expired(self, conn: sqlite3.Connection, now: float):
+        """ 만료된 SQLite 행 삭제 (열 때 + purge_interval_seconds마다, 새 요약문 / 프롬프트 버전 행이 쌓이지 않도록) """
+        deleted = conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,)).rowcount
+        conn.commit()
+        self._last_purge = now
+        if deleted:
+            print(f"[LLM 캐시] '{self.name}' 만료된 항목 {deleted}개 삭제")
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                if item[0] >= now:
+                    self._memory.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return item[1]
+                del self._memory[key]
+
+            conn = self._db()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE name = ? AND key = ?", (self.name, key)
+                ).fetchone()
+                if row is not None and row[1] >= now:
+                    self._remember(key, row[1], row[0])
+                    self.hits["sqlite"] += 1
+                    return row[0]
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE name = ? AND key = ?", (self.name, key))
+                    conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+            conn = self._db()
+            if conn is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (name, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (self.name, key, value, expires_at)
+                )
+                conn.commit()
+                if now - self._last_purge >= self.purge_interval_seconds:
+                    self._purge_expired(conn, now)
+
+    def stats(self) -> dict:
+        total = self.hits["memory"] + self.hits["sqlite"] + self.misses
+        return {
+            "name": self.name,
+            "memory_size": len(self._memory),
+            "hits_memory": self.hits["memory"],
+            "hits_sqlite": self.hits["sqlite"],
+            "misses": self.misses,
+            "hit_rate": round((total - self.misses) / total, 3) if total else 0.0,
+        }
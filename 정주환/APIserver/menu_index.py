@@ -0,0 +1,84 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# 식당별 메뉴 인덱스 (CSR 형식, load_app_data에서 1회 구축)
+# - 메뉴 행을 식당ID 기준으로 안정 정렬 -> 식당 i의 메뉴 = 행 [offsets[i], offsets[i+1])
+# - 대표 메뉴 플래그(대표여부 == 'Y') 배열
+# - 식당별 응답용 메뉴 목록(영문 키 dict)과 카드용 대표 메뉴 3개 Markdown을 미리 만들어 둠
+#   -> /api/restaurants/{id} 와 format_restaurant_markdown은 요청마다 pandas 작업 없음
+
+# (df_menus 한글 컬럼 -> 상세 API 응답 키)
+MENU_FIELD_MAPPING = {
+    'name': '메뉴',
+    'price': '가격원문',
+    'is_representative': '대표여부',
+    'price_range': '가격범위',
+    'theme': '테마',
+    'temperature': '온도',
+    'category': '카테고리',
+    'main_ingredient': '주재료',
+    'is_spicy': '맵기(O/X)',
+}
+NO_MENU_SNIPPET = "* (메뉴 정보 없음)\n"
+
+
+def _json_value(value):
+    """ NaN -> None (JSON 직렬화 가능하게), 나머지는 그대로 """
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    return value
+
+
+class MenuIndex:
+
+    def __init__(self, df_menus: pd.DataFrame, top_n: int = 3):
+        restaurant_ids = df_menus['식당ID'].astype(str).to_numpy()
+        order = np.argsort(restaurant_ids, kind="stable") # (식당 내 메뉴 순서는 원본 파일 순서 유지)
+        sorted_ids = restaurant_ids[order]
+
+        self.restaurant_ids, starts = np.unique(sorted_ids, return_index=True)
+        self.offsets = np.append(starts, len(sorted_ids)).astype(np.int64)
+        self.id_pos = {rid: i for i, rid in enumerate(self.restaurant_ids)}
+
+        columns = {
+            col: df_menus[col].to_numpy(dtype=object)[order] if col in df_menus.columns
+            else np.full(len(order), '', dtype=object)
+            for col in MENU_FIELD_MAPPING.values()
+        }
+        self.is_representative = columns['대표여부'] == 'Y'
+
+        self.payloads: List[List[Dict]] = []
+        self.snippets: List[str] = []
+        for i in range(len(self.restaurant_ids)):
+            start, end = self.offsets[i], self.offsets[i + 1]
+
+            menus = []
+            for row in range(start, end):
+                menu = {key: _json_value(columns[col][row]) for key, col in MENU_FIELD_MAPPING.items()}
+                if isinstance(menu['price'], str):
+                    menu['price'] = menu['price'].replace('원', '') # ('원' 제거)
+                menus.append(menu)
+            self.payloads.append(menus)
+
+            # (대표 메뉴 최대 top_n개, 없으면 앞에서 top_n개)
+            rows = np.arange(start, end)
+            top_rows = rows[self.is_representative[start:end]][:top_n]
+            if len(top_rows) == 0:
+                top_rows = rows[:top_n]
+            snippet = "".join(f"* {columns['메뉴'][row]} ({columns['가격원문'][row]})\n" for row in top_rows)
+            self.snippets.append(snippet or NO_MENU_SNIPPET)
+
+    def __len__(self):
+        return len(self.restaurant_ids)
+
+    def menus(self, restaurant_id: str) -> List[Dict]:
+        """ 상세 API용 메뉴 목록 (메뉴가 없으면 []) - 공유 객체이므로 수정하지 말 것 """
+        pos = self.id_pos.get(restaurant_id)
+        return self.payloads[pos] if pos is not None else []
+
+    def snippet(self, restaurant_id: str) -> Optional[str]:
+        """ 카드용 대표 메뉴 Markdown (메뉴가 없으면 None) """
+        pos = self.id_pos.get(restaurant_id)
+        return self.snippets[pos] if pos is not None else None
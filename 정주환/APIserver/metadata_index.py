@@ -0,0 +1,157 @@
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 식당 메타데이터 비트맵 인덱스 (1단계 RAG 필터용)
+# - 필터 대상 키의 값마다 식당 집합을 비트셋(np.packbits, uint8)으로 미리 만들어 둡니다.
+# - 조건 AND = 비트셋 AND, 개수 = popcount -> 벡터 검색 전에 필터 결과 크기를 바로 계산
+# - 조건 조합 중 결과가 비어 있지 않은 가장 엄격한 조합(완화)을 고릅니다.
+# - 검색 결과 점수(filter_score) 계산용 컬럼 배열
+#   (값 비교 키: object 배열, 쉼표 목록 키: 토큰 사전 + 식당별 토큰 비트마스크)
+
+# (바이트 값 -> 켜진 비트 수)
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+class MetadataBitmapIndex:
+
+    def __init__(self, ids: List[str], metadatas: List[dict], keys: List[str], token_keys: List[str] = ()):
+        metadatas = [meta or {} for meta in metadatas]
+        self.ids = np.asarray(ids, dtype=object)
+        self.id_pos = {str(rid): i for i, rid in enumerate(self.ids)}
+        self.n = len(self.ids)
+        self.keys = list(keys)
+        self._all = np.packbits(np.ones(self.n, dtype=bool))
+        self._empty = np.zeros_like(self._all)
+
+        # (컬럼 배열: 메타데이터에 없는 키는 None)
+        self.columns = {
+            key: np.array([meta.get(key) for meta in metadatas], dtype=object)
+            for key in self.keys
+        }
+
+        self.bitsets: Dict[str, Dict[str, np.ndarray]] = {}
+        for key in self.keys:
+            values = np.array([str(v) for v in self.columns[key]], dtype=object)
+            self.bitsets[key] = {
+                value: np.packbits(values == value)
+                for value in dict.fromkeys(values.tolist())
+            }
+
+        # (쉼표 목록 키: 토큰 사전 + 식당 x 토큰 비트마스크 (packbits, 행 = 식당))
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        self.token_bits: Dict[str, np.ndarray] = {}
+        for key in token_keys:
+            token_lists = [_split_tokens(meta.get(key)) for meta in metadatas]
+            vocab = {token: j for j, token in enumerate(dict.fromkeys(t for tokens in token_lists for t in tokens))}
+            matrix = np.zeros((self.n, max(len(vocab), 1)), dtype=bool)
+            for i, tokens in enumerate(token_lists):
+                matrix[i, [vocab[t] for t in tokens]] = True
+            self.vocab[key] = vocab
+            self.token_bits[key] = np.packbits(matrix, axis=1)
+
+    @classmethod
+    def from_collection(cls, collection, keys: List[str], token_keys: List[str] = ()) -> "MetadataBitmapIndex":
+        data = collection.get(include=["metadatas"])
+        return cls(data["ids"], data["metadatas"], keys, token_keys)
+
+    def positions(self, ids: List[str]) -> np.ndarray:
+        """ 식당 id -> 행 번호 (인덱스에 없으면 -1) """
+        return np.array([self.id_pos.get(str(rid), -1) for rid in ids], dtype=np.int64)
+
+    def token_match(self, key: str, positions: np.ndarray, required: List[str], mode: str = "any") -> np.ndarray:
+        """
+        positions 식당들의 key 토큰 중 required 문자열을 포함하는 토큰이 있는지 (mode: 'any' / 'all')
+        - required 1개 -> 그 문자열을 포함하는 토큰들의 비트마스크를 만들어 식당 비트마스크와 AND
+        - 빈 문자열 요구는 항상 만족으로 처리
+        """
+        vocab = self.vocab[key]
+        bits = self.token_bits[key][positions]
+        per_required = []
+        for req in required:
+            req = req.strip()
+            if not req:
+                per_required.append(np.ones(len(positions), dtype=bool))
+                continue
+            req_tokens = np.zeros(bits.shape[1] * 8, dtype=bool)
+            req_tokens[[j for token, j in vocab.items() if req in token]] = True
+            req_bits = np.packbits(req_tokens)
+            per_required.append((bits & req_bits).any(axis=1))
+
+        if not per_required:
+            return np.zeros(len(positions), dtype=bool)
+        stacked = np.vstack(per_required)
+        return stacked.all(axis=0) if mode == "all" else stacked.any(axis=0)
+
+    def bitset(self, conditions: List[dict]) -> np.ndarray:
+        """ [{key: value}, ...] (AND) -> 비트셋. 인덱스에 없는 키는 조건에서 무시 """
+        result = self._all
+        for condition in conditions:
+            (key, value), = condition.items()
+            if key not in self.bitsets:
+                continue
+            result = result & self.bitsets[key].get(str(value), self._empty)
+        return result
+
+    def count(self, conditions: List[dict]) -> int:
+        return int(_POPCOUNT_TABLE[self.bitset(conditions)].sum())
+
+    def mask(self, conditions: List[dict]) -> np.ndarray:
+        """ 비트셋 -> 길이 n의 불리언 배열 """
+        return np.unpackbits(self.bitset(conditions), count=self.n).astype(bool)
+
+    def tightest_relaxation(
+        self,
+        conditions: List[dict],
+        drop_order: List[str]
+    ) -> Tuple[List[dict], int]:
+        """
+        결과가 0건이 아닌 가장 엄격한 조건 조합을 반환합니다. -> (남긴 조건, 결과 개수)
+        - 빼는 조건 수가 적은 조합 우선
+        - 같은 수라면 drop_order 앞쪽(덜 중요한) 키를 빼는 조합 우선
+        (모든 조합이 0건이면 ([], 전체 개수) = 필터 없음)
+        """
+        def drop_rank(condition):
+            key = next(iter(condition))
+            return drop_order.index(key) if key in drop_order else len(drop_order)
+
+        ordered = sorted(conditions, key=drop_rank) # (덜 중요한 조건부터)
+        for n_drop in range(len(ordered) + 1):
+            for dropped in combinations(range(len(ordered)), n_drop):
+                kept = [c for i, c in enumerate(ordered) if i not in dropped]
+                n_matches = self.count(kept)
+                if n_matches:
+                    return [c for c in conditions if c in kept], n_matches
+        return [], self.n
+
+
+def _split_tokens(value) -> List[str]:
+    """ 'a,b, c' -> ['a', 'b', 'c'] (Chroma 적재 시 리스트는 쉼표로 합쳐져 있음) """
+    if value is None:
+        return []
+    return [token.strip() for token in str(value).split(",") if token.strip()]
+
+
+def tokens_match(value, required: List[str], mode: str = "any") -> bool:
+    """
+    MetadataBitmapIndex.token_match의 식당 1곳 버전 (인덱스가 없을 때 같은 결과를 내도록)
+    쉼표 목록 value의 토큰 중 required 문자열(앞뒤 공백 제거)을 포함하는 토큰이 있는지, 빈 요구는 항상 만족
+    """
+    tokens = _split_tokens(value)
+    per_required = [
+        not req.strip() or any(req.strip() in token for token in tokens)
+        for req in required
+    ]
+    if not per_required:
+        return False
+    return all(per_required) if mode == "all" else any(per_required)
+
+
+def conditions_to_where(conditions: List[dict]) -> Optional[dict]:
+    """ 조건 리스트 -> Chroma where 절 ($and는 조건이 2개 이상일 때만 사용) """
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
@@ -0,0 +1,54 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 500명 평가 데이터 조회 인덱스 (load_user_ratings에서 1회 구축)
+# - 식당 id -> 행 위치, counts[pos] = (추천, 미추천)  (카드마다 요약표 전체 마스킹 대신)
+# - 사용자 -> '추천'한 식당 CSR: 사용자 i의 식당 = liked_restaurant_ids[user_offsets[i]:user_offsets[i+1]]
+#   (유사 사용자 조회마다 전체 평가표 isin 스캔 대신)
+
+
+class RatingsIndex:
+
+    def __init__(self, df_all_user_ratings: pd.DataFrame, df_ratings_summary: pd.DataFrame):
+        self.restaurant_pos = {
+            str(rid): pos for pos, rid in enumerate(df_ratings_summary['restaurant_id'])
+        }
+        self.counts = df_ratings_summary[['추천', '미추천']].to_numpy(dtype=np.int64)
+
+        liked_rows = np.flatnonzero((df_all_user_ratings['사용자평가'] == '추천').to_numpy())
+        users = df_all_user_ratings['user_id'].astype(str).to_numpy(dtype=object)[liked_rows]
+        order = np.argsort(users, kind="stable") # (사용자 내에서는 원본 행 순서 유지)
+
+        self.user_ids, starts = np.unique(users[order], return_index=True)
+        self.user_offsets = np.append(starts, len(order)).astype(np.int64)
+        self.user_pos = {uid: i for i, uid in enumerate(self.user_ids)}
+        self.liked_rows = liked_rows[order]
+        self.liked_restaurant_ids = (
+            df_all_user_ratings['restaurant_id'].astype(str).to_numpy(dtype=object)[self.liked_rows]
+        )
+
+    def rating_counts(self, restaurant_id: str) -> Optional[Tuple[int, int]]:
+        """ (추천 수, 미추천 수), 평가가 없는 식당이면 None """
+        pos = self.restaurant_pos.get(restaurant_id)
+        if pos is None:
+            return None
+        recommend_count, non_recommend_count = self.counts[pos]
+        return int(recommend_count), int(non_recommend_count)
+
+    def liked_by(self, user_ids: List[str]) -> List[str]:
+        """
+        user_ids가 '추천'한 식당 ID 목록 (평가 파일의 행 순서, 중복 포함)
+        (기존 df[user_id.isin(...) & 사용자평가 == '추천']['restaurant_id']와 같은 순서)
+        """
+        segments = [
+            np.arange(self.user_offsets[pos], self.user_offsets[pos + 1])
+            for pos in (self.user_pos.get(str(uid)) for uid in dict.fromkeys(user_ids))
+            if pos is not None
+        ]
+        if not segments:
+            return []
+        positions = np.concatenate(segments)
+        positions = positions[np.argsort(self.liked_rows[positions], kind="stable")]
+        return self.liked_restaurant_ids[positions].tolist()
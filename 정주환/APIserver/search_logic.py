@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import json
 import os
@@ -6,9 +7,12 @@ from urllib.parse import quote
 from typing import List
 from urllib.parse import urlparse, quote
 
-# (data_loader에서 로드된 전역 변수를 사용)
+# (data_loader: 질의 임베딩, 데이터셋 / 인덱스는 요청에 고정된 data_snapshot.current())
 import data_loader as db
+import data_snapshot
 from llm_utils import generate_rag_query
+from config import FILTER_RELAXATION_ORDER
+from metadata_index import conditions_to_where, tokens_match
 
 # --- (함수 7/9) ---
 def create_filter_metadata(profile_data):
@@ -67,13 +71,14 @@ def format_restaurant_markdown(store_id_str, rank_prefix="추천", rank_index=1)
   Gradio에 표시할 단일 식당의 Markdown 문자열을 반환합니다.
   """
   
-  # (전역 변수 참조)
-  if db.df_restaurants is None or db.menu_groups is None:
+  # (요청에 고정된 데이터 스냅샷 참조)
+  snapshot = data_snapshot.current()
+  if snapshot.df_restaurants is None or snapshot.menu_index is None:
        return f"**[{rank_prefix} {rank_index}] ID: {store_id_str}** (DB 미로드)\n\n---\n\n"
 
   try:
     # 1. (가게 정보 조회)
-    store_info = db.df_restaurants.loc[store_id_str]
+    store_info = snapshot.df_restaurants.loc[store_id_str]
     store_name = store_info['가게']
     store_address = store_info['주소']
     store_intro = store_info['소개']
@@ -90,14 +95,11 @@ def format_restaurant_markdown(store_id_str, rank_prefix="추천", rank_index=1)
 
     # 2. (다른 사용자 평가 카운트 조회)
     social_proof_string = "" 
-    if db.df_restaurant_ratings_summary is not None and not db.df_restaurant_ratings_summary.empty:
+    if snapshot.ratings_index is not None:
       try:
-        rating_info = db.df_restaurant_ratings_summary[
-          db.df_restaurant_ratings_summary['restaurant_id'] == store_id_str
-        ]
-        if not rating_info.empty:
-          recommend_count = rating_info['추천'].iloc[0]
-          non_recommend_count = rating_info['미추천'].iloc[0]
+        rating_counts = snapshot.ratings_index.rating_counts(store_id_str)
+        if rating_counts is not None:
+          recommend_count, non_recommend_count = rating_counts
           social_proof_string = (
             f"**다른 사용자 평가:** 👍 {recommend_count}명 / 👎 {non_recommend_count}명\n\n"
           )
@@ -132,19 +134,8 @@ def format_restaurant_markdown(store_id_str, rank_prefix="추천", rank_index=1)
     elif map_link_md:
       links_md = f"{map_link_md}\n\n"
 
-    # 5. (메뉴 정보 조회)
-    menu_str = ""
-    try:
-      menus_df = db.menu_groups.get_group(store_id_str)
-      rep_menus = menus_df[menus_df['대표여부'] == 'Y'].head(3)
-      if rep_menus.empty:
-        rep_menus = menus_df.head(3)
-      for _, menu_row in rep_menus.iterrows():
-        menu_str += f"* {menu_row['메뉴']} ({menu_row['가격원문']})\n"
-      if not menu_str:
-        menu_str = "* (메뉴 정보 없음)\n"
-    except KeyError:
-      menu_str = "* (메뉴 정보 없음)\n"
+    # 5. (메뉴 정보 조회: 메뉴 인덱스에 미리 만든 대표 메뉴 3개)
+    menu_str = snapshot.menu_index.snippet(store_id_str) or "* (메뉴 정보 없음)\n"
 
     # 6. (최종 Markdown 조합)
     output_md = (
@@ -180,18 +171,19 @@ def get_similar_user_recommendations(
   Markdown 문자열을 반환합니다.
   """
   
-  if db.profile_collection is None:
+  snapshot = data_snapshot.current()
+  if snapshot.profile_collection is None:
     print("[유사 추천] 'profile_collection'이 로드되지 않았습니다.")
     return ""
     
-  if db.df_all_user_ratings is None:
-    print("[유사 추천] 'df_all_user_ratings'가 로드되지 않았습니다.")
+  if snapshot.ratings_index is None:
+    print("[유사 추천] 'ratings_index'(500명 평가)가 로드되지 않았습니다.")
     return ""
 
   try:
     # 1. 'mock_profiles' DB에서 유사 사용자 쿼리
-    results = db.profile_collection.query(
-      query_texts=[live_rag_query_text],
+    results = snapshot.profile_collection.query(
+      query_embeddings=[db.embed_query(live_rag_query_text)],
       n_results=max_similar_users
     )
     
@@ -204,18 +196,15 @@ def get_similar_user_recommendations(
     print(f"[유사 추천] 찾은 유사 사용자: {similar_user_ids}")
 
     # 3. 유사 사용자가 '추천'한 식당 ID 목록 조회
-    similar_user_likes = db.df_all_user_ratings[
-      (db.df_all_user_ratings['user_id'].isin(similar_user_ids)) &
-      (db.df_all_user_ratings['사용자평가'] == '추천')
-    ]
+    similar_user_likes = snapshot.ratings_index.liked_by(similar_user_ids) # (평가 파일 행 순서)
     
-    if similar_user_likes.empty:
+    if not similar_user_likes:
       print("[유사 추천] 유사 사용자가 '추천'한 식당이 없습니다.")
       return ""
 
     # 4. 기본 추천과 겹치지 않는 식당 ID 필터링
     new_recommendations = []
-    for store_id in similar_user_likes['restaurant_id'].astype(str):
+    for store_id in similar_user_likes:
       if store_id not in primary_reco_ids and store_id not in new_recommendations:
         new_recommendations.append(store_id)
         
@@ -245,6 +234,70 @@ def get_similar_user_recommendations(
     print(f"[오류] 유사 사용자 추천 생성 중 오류: {e}")
     return "" # (오류 시 빈 문자열 반환)
 
+# 1단계 점수제 가중치 (메타데이터 키 -> 일치 시 점수)
+FILTER_SCORE_WEIGHTS = {
+    'high_level_category': ('food_category', 3),
+    'budget_range': ('budget_range', 2),
+    'spicy_available': ('spicy_available', 2),
+    'vegetarian_options': ('vegetarian_options', 2),
+}
+
+
+def filter_score(metadata: dict, user_filter_dict: dict, python_post_filter: dict) -> int:
+    """
+    후보 1곳의 점수제 점수 (메타데이터 인덱스가 없을 때의 경로)
+    (vectorized_filter_scores와 같은 규칙: 쉼표 목록 키는 토큰 단위 비교 -> metadata_index.tokens_match)
+    """
+    score = 0
+    for meta_key, (user_key, weight) in FILTER_SCORE_WEIGHTS.items():
+        if user_filter_dict.get(user_key) == metadata.get(meta_key):
+            score += weight
+
+    if 'suitable_for' in python_post_filter:
+        score += tokens_match(metadata.get('suitable_for'), python_post_filter['suitable_for'], mode="all")
+    if 'main_ingredients_list' in python_post_filter:
+        score += tokens_match(metadata.get('main_ingredients_list'), python_post_filter['main_ingredients_list'], mode="any")
+    return score
+
+
+def vectorized_filter_scores(index, positions: np.ndarray, user_filter_dict: dict, python_post_filter: dict) -> np.ndarray:
+    """
+    filter_score를 메타데이터 인덱스 컬럼 배열로 한 번에 계산합니다.
+    - 값 비교 키: object 컬럼 == 사용자 값
+    - suitable_for(모두 포함) / main_ingredients_list(하나라도 포함): 토큰 비트마스크 AND
+    """
+    scores = np.zeros(len(positions), dtype=np.int64)
+    for meta_key, (user_key, weight) in FILTER_SCORE_WEIGHTS.items():
+        if meta_key in index.columns:
+            scores += weight * (index.columns[meta_key][positions] == user_filter_dict.get(user_key))
+        elif user_filter_dict.get(user_key) is None: # (메타데이터에 없는 키: None == None)
+            scores += weight
+
+    if 'suitable_for' in python_post_filter:
+        scores += index.token_match('suitable_for', positions, python_post_filter['suitable_for'], mode="all")
+    if 'main_ingredients_list' in python_post_filter:
+        scores += index.token_match('main_ingredients_list', positions, python_post_filter['main_ingredients_list'], mode="any")
+    return scores
+
+
+def rank_candidates_vectorized(index, ids: List[str], distances: List[float],
+                               user_filter_dict: dict, python_post_filter: dict):
+    """
+    get_rag_candidate_ids의 점수제 루프를 메타데이터 인덱스로 한 번에 계산합니다.
+    - 랭킹: lexsort((rag_distance, -filter_score)) (동점은 검색 순서 유지)
+    인덱스에 없는 ID가 있으면 None (호출부에서 filter_score 루프로 처리, 같은 점수)
+    """
+    if any(key in python_post_filter and key not in index.vocab for key in ('suitable_for', 'main_ingredients_list')):
+        return None
+    positions = index.positions(ids)
+    if (positions < 0).any():
+        return None
+
+    scores = vectorized_filter_scores(index, positions, user_filter_dict, python_post_filter)
+    order = np.lexsort((np.asarray(distances, dtype=np.float64), -scores))
+    return [ids[i] for i in order]
+
+
 # --- (함수 8/9 - 16번 셀) ---
 # 1단계 후보군 ID만 반환하는 아래 함수로 대체합니다.
 
@@ -266,28 +319,43 @@ def get_rag_candidate_ids(
         print(f"[오류] 사용자 프로필 파싱 실패: {e}")
         return []
 
-    # 2. 쿼리 및 필터 생성
-    user_rag_query = generate_rag_query(user_original_summary)
+    # 2. 쿼리 및 필터 생성 (이미 재작성된 쿼리가 있으면 재사용)
+    user_rag_query = user_profile_row.get('rag_query') or generate_rag_query(user_original_summary)
     db_pre_filter = build_filters_from_profile(user_filter_dict)
     python_post_filter = {key: val.split(',') for key, val in user_filter_dict.items() 
                           if key in ['main_ingredients_list', 'suitable_for'] and val != 'N/A' and val}
     
+    # (메타데이터 비트맵 인덱스가 있으면, 벡터 검색 전에 결과가 0건이 아닌 가장 엄격한 조건 조합으로 완화)
+    snapshot = data_snapshot.current() # (필터 완화 / 검색 / 랭킹 모두 같은 스냅샷)
+    filter_conditions = db_pre_filter.get("$and", [])
+    if filter_conditions and snapshot.restaurant_metadata_index is not None:
+        kept_conditions, n_matches = snapshot.restaurant_metadata_index.tightest_relaxation(
+            filter_conditions, FILTER_RELAXATION_ORDER
+        )
+        if len(kept_conditions) < len(filter_conditions):
+            print(f"  > [필터 완화] 1차 필터 결과 0건 -> {kept_conditions} ({n_matches}개)로 완화")
+        filter_conditions = kept_conditions
+    db_pre_filter = conditions_to_where(filter_conditions) or {} # (조건 1개면 $and 없이)
+
     print(f"  > RAG 쿼리: '{user_rag_query}'")
     print(f"  > DB 1차 필터: {db_pre_filter}")
 
-    # 3. ChromaDB에 RAG 검색 실행
+    # 3. ChromaDB(또는 인메모리 벡터 인덱스)에 RAG 검색 실행
+    # (load_vector_index()로 인덱스가 로드되어 있으면 같은 query() 형식으로 대체)
+    rag_index = snapshot.restaurant_vector_index if snapshot.restaurant_vector_index is not None else snapshot.collection
     try:
+        user_rag_embedding = db.embed_query(user_rag_query) # (필터 완화 재시도에도 같은 임베딩 재사용)
         print(f"  > RAG + 1차 필터 검색 (Top {n_results}개)...")
         
         if db_pre_filter: 
-            results = db.collection.query(
-                query_texts=[user_rag_query],
+            results = rag_index.query(
+                query_embeddings=[user_rag_embedding],
                 n_results=n_results,
                 where=db_pre_filter
             )
         else: 
-            results = db.collection.query(
-                query_texts=[user_rag_query],
+            results = rag_index.query(
+                query_embeddings=[user_rag_embedding],
                 n_results=n_results
             )
         
@@ -295,8 +363,8 @@ def get_rag_candidate_ids(
         
         if not results.get('ids', [[]])[0]:
             print("  > [필터 완화] 1차 필터 결과 0건. RAG-Only(필터 없음)로 재시도...")
-            results = db.collection.query(
-                query_texts=[user_rag_query],
+            results = rag_index.query(
+                query_embeddings=[user_rag_embedding],
                 n_results=n_results
             )
             print(f"  > RAG-Only 검색 완료: {len(results['ids'][0])}개 후보 반환")
@@ -304,36 +372,25 @@ def get_rag_candidate_ids(
                 print("  > RAG-Only 검색 결과도 없습니다.")
                 return []
         
-        # 4. Python으로 *점수(Scoring)* 계산 (기존 로직)
+        # 4. 점수(Scoring) 계산 + 최종 랭킹
+        # (메타데이터 인덱스가 있으면 컬럼 배열로 한 번에 계산 후 lexsort)
+        if snapshot.restaurant_metadata_index is not None:
+            final_candidate_ids = rank_candidates_vectorized(
+                snapshot.restaurant_metadata_index, results['ids'][0], results['distances'][0],
+                user_filter_dict, python_post_filter
+            )
+            if final_candidate_ids is not None:
+                print(f"--- 1단계: RAG + 점수제 완료. 후보 ID {len(final_candidate_ids)}개 반환 ---")
+                return final_candidate_ids
+
+        # (인덱스가 없거나 인덱스에 없는 ID가 섞인 경우: Python 루프, 점수 규칙은 인덱스 경로와 동일)
         final_results_with_score = []
         
         for i in range(len(results['ids'][0])):
-            store_id = results['ids'][0][i]
-            rag_distance = results['distances'][0][i] 
-            metadata = results['metadatas'][0][i]
-            
-            filter_score = 0
-            
-            if user_filter_dict.get('food_category') == metadata.get('high_level_category'):
-                filter_score += 3
-            if user_filter_dict.get('budget_range') == metadata.get('budget_range'):
-                filter_score += 2
-            if user_filter_dict.get('spicy_available') == metadata.get('spicy_available'):
-                filter_score += 2
-            if user_filter_dict.get('vegetarian_options') == metadata.get('vegetarian_options'):
-                filter_score += 2
-
-            if 'suitable_for' in python_post_filter:
-                if all(req in metadata.get('suitable_for', '') for req in python_post_filter['suitable_for']): 
-                    filter_score += 1
-            if 'main_ingredients_list' in python_post_filter:
-                if any(req in metadata.get('main_ingredients_list', '') for req in python_post_filter['main_ingredients_list']): 
-                    filter_score += 1
-
             final_results_with_score.append({
-                "id": store_id,
-                "rag_distance": rag_distance, 
-                "filter_score": filter_score,
+                "id": results['ids'][0][i],
+                "rag_distance": results['distances'][0][i],
+                "filter_score": filter_score(results['metadatas'][0][i] or {}, user_filter_dict, python_post_filter),
             })
         
         # 5. 최종 랭킹
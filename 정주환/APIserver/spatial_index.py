@@ -0,0 +1,107 @@
+import numpy as np
+from typing import List, Tuple
+
+# 식당 좌표(Y좌표=위도, X좌표=경도) 공간 인덱스
+# - 위경도 격자(grid) 버킷 + 벡터화된 haversine 거리 계산
+# - 반경 검색 / k-최근접 검색 / 후보군 거리 일괄 계산 (2단계 스코어러의 사전 필터용)
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat, lon, lats, lons) -> np.ndarray:
+    """ (lat, lon) 한 점에서 lats/lons 배열까지의 대원 거리(m)를 한 번에 계산합니다. """
+    lat1 = np.radians(lat)
+    lon1 = np.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def parse_coords(coords: str) -> Tuple[float, float]:
+    """ '37.5630,126.9830' -> (37.563, 126.983) """
+    lat_str, lon_str = str(coords).split(",")
+    return float(lat_str.strip()), float(lon_str.strip())
+
+
+class RestaurantGridIndex:
+    """
+    위경도를 cell_deg 크기 격자로 나눠 식당 위치(행 번호)를 버킷에 담아 둡니다.
+    반경 검색은 반경을 덮는 격자 칸만 꺼내 haversine으로 정확히 거릅니다.
+    """
+
+    def __init__(self, ids: List[str], lats, lons, cell_deg: float = 0.01):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = ~(np.isnan(lats) | np.isnan(lons)) # (좌표 없는 식당은 인덱스에서 제외)
+
+        self.ids = np.asarray(ids, dtype=object)[valid]
+        self.lats = lats[valid]
+        self.lons = lons[valid]
+        self.cell_deg = cell_deg
+        self.id_pos = {rid: i for i, rid in enumerate(self.ids)}
+
+        cells_y = np.floor(self.lats / cell_deg).astype(np.int64)
+        cells_x = np.floor(self.lons / cell_deg).astype(np.int64)
+        self.grid = {}
+        for pos, key in enumerate(zip(cells_y.tolist(), cells_x.tolist())):
+            self.grid.setdefault(key, []).append(pos)
+        self.grid = {key: np.array(positions, dtype=np.int64) for key, positions in self.grid.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances_m(self, lat: float, lon: float, restaurant_ids: List[str]) -> np.ndarray:
+        """ 후보 식당들까지의 직선 거리(m). 인덱스에 없는(좌표 없는) 식당은 NaN """
+        positions = np.array([self.id_pos.get(str(rid), -1) for rid in restaurant_ids], dtype=np.int64)
+        result = np.full(len(positions), np.nan)
+        found = positions >= 0
+        if found.any():
+            result[found] = haversine_m(lat, lon, self.lats[positions[found]], self.lons[positions[found]])
+        return result
+
+    def query_radius(self, lat: float, lon: float, radius_m: float) -> Tuple[List[str], np.ndarray]:
+        """ 반경 radius_m 이내 식당 (가까운 순) -> (ids, distances_m) """
+        lat_span = np.degrees(radius_m / EARTH_RADIUS_M)
+        lon_span = lat_span / max(np.cos(np.radians(lat)), 1e-6)
+
+        y_min, y_max = int(np.floor((lat - lat_span) / self.cell_deg)), int(np.floor((lat + lat_span) / self.cell_deg))
+        x_min, x_max = int(np.floor((lon - lon_span) / self.cell_deg)), int(np.floor((lon + lon_span) / self.cell_deg))
+
+        if (y_max - y_min + 1) * (x_max - x_min + 1) > len(self.grid):
+            # (반경이 데이터 전체보다 넓으면 격자 순회 대신 전체 검사)
+            positions = np.arange(len(self))
+        else:
+            buckets = [
+                self.grid[(cy, cx)]
+                for cy in range(y_min, y_max + 1)
+                for cx in range(x_min, x_max + 1)
+                if (cy, cx) in self.grid
+            ]
+            if not buckets:
+                return [], np.array([])
+            positions = np.concatenate(buckets)
+
+        dists = haversine_m(lat, lon, self.lats[positions], self.lons[positions])
+        inside = dists <= radius_m
+        positions, dists = positions[inside], dists[inside]
+
+        order = np.argsort(dists, kind="stable")
+        return self.ids[positions[order]].tolist(), dists[order]
+
+    def query_knn(self, lat: float, lon: float, k: int) -> Tuple[List[str], np.ndarray]:
+        """ 가장 가까운 k개 식당 -> (ids, distances_m). 반경을 2배씩 넓히며 격자 검색 """
+        k = min(k, len(self))
+        if k <= 0:
+            return [], np.array([])
+
+        radius_m = self.cell_deg * 111_000
+        while True:
+            ids, dists = self.query_radius(lat, lon, radius_m)
+            if len(ids) >= k:
+                return ids[:k], dists[:k]
+            radius_m *= 2
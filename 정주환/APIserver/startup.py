@@ -0,0 +1,94 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 단계적 서버 시작 (무거운 자산 백그라운드 로드)
+# - lifespan은 AssetWarmup.start()만 호출하고 바로 yield -> HTTP 서버가 즉시 바인딩
+# - 등록된 단계를 순서대로 스레드에서 실행 (CSV / 임베딩 모델 / Chroma 로드가 이벤트 루프를 막지 않도록)
+# - /healthz: 프로세스 생존, /readyz: 자산별 상태 + 로드 시간
+#   (선택 자산(required=False)이 없으면 "unavailable", 준비 판정에는 영향 없음)
+# - 준비 전 요청: wait_ready(timeout)으로 잠시 대기(큐잉), 시간 초과/실패면 503
+
+
+class AssetWarmup:
+
+    def __init__(self):
+        self._steps: List[Dict[str, Any]] = []
+        self.status: Dict[str, Dict[str, Any]] = {}
+        self._done = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def add(self, name: str, func: Callable[[], Any], required: bool = True):
+        """
+        로드 단계 등록 (등록 순서대로 실행)
+        required=True 단계가 실패(예외 또는 False 반환)하면 서버는 준비 상태가 되지 않습니다.
+        """
+        self._steps.append({"name": name, "func": func, "required": required})
+        self.status[name] = {"state": "pending", "required": required, "seconds": None, "error": None}
+
+    def start(self) -> asyncio.Task:
+        self.started_at = time.time()
+        self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self):
+        try:
+            for step in self._steps:
+                status = self.status[step["name"]]
+                status["state"] = "loading"
+                step_start = time.perf_counter()
+                try:
+                    result = await asyncio.to_thread(step["func"])
+                    if result is False:
+                        status["state"] = "failed" if step["required"] else "unavailable"
+                    else:
+                        status["state"] = "ready"
+                except Exception as e:
+                    status["state"] = "failed"
+                    status["error"] = str(e)
+                    print(f"[오류] 자산 로드 실패 ({step['name']}): {e}")
+                status["seconds"] = round(time.perf_counter() - step_start, 2)
+                print(f"  > [워밍업] {step['name']}: {status['state']} ({status['seconds']}초)")
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and all(
+            s["state"] == "ready" for s in self.status.values() if s["required"]
+        )
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """ 로드가 끝날 때까지 최대 timeout초 대기 -> 준비 여부 """
+        if not self._done.is_set():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._done.wait()), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return self.ready
+
+    async def stop(self):
+        """ 서버 종료 시 진행 중인 워밍업 취소 (실행 중인 스레드 단계는 끝날 때까지 계속됨) """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        if self.ready:
+            state = "ready"
+        elif self._done.is_set():
+            state = "failed"
+        else:
+            state = "loading"
+        elapsed_until = self.finished_at or time.time()
+        return {
+            "status": state,
+            "elapsed_seconds": round(elapsed_until - self.started_at, 2) if self.started_at else None,
+            "assets": self.status,
+        }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# (APIserver 모듈들은 최상위 임포트 기준: APIserver 디렉토리를 경로에 추가)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,83 @@
+import random
+
+import numpy as np
+
+from metadata_index import MetadataBitmapIndex, tokens_match
+from search_logic import (
+    FILTER_SCORE_WEIGHTS, filter_score, rank_candidates_vectorized, vectorized_filter_scores
+)
+
+# 1단계 점수제: 메타데이터 인덱스 경로(rank_candidates_vectorized)와 Python 루프(filter_score)가
+# 같은 후보에 같은 점수 / 같은 순위를 내는지 확인 (워밍업 중 / 리로드 직후에도 결과가 같아야 함)
+
+TOKENS = ["가족", "친구", "연인", "혼자", "닭고기", "소고기", "돼지고기", "해산물", "야채"]
+KEYS = ["budget_range", "spicy_available", "vegetarian_options", "high_level_category"]
+TOKEN_KEYS = ["suitable_for", "main_ingredients_list"]
+
+
+def _random_metadata(rng: random.Random) -> dict:
+    meta = {
+        "budget_range": rng.choice(["저", "중", "고"]),
+        "spicy_available": rng.choice(["O", "X"]),
+        "vegetarian_options": rng.choice(["O", "X"]),
+        "high_level_category": rng.choice(["한식", "일식", "디저트"]),
+    }
+    for key in TOKEN_KEYS:
+        if rng.random() < 0.9: # (키가 없는 식당도 포함)
+            meta[key] = (", " if rng.random() < 0.5 else ",").join(rng.sample(TOKENS, rng.randint(0, 3)))
+    return meta
+
+
+def _random_filters(rng: random.Random):
+    user_filter_dict = {
+        "budget_range": rng.choice(["저", "중", "고"]),
+        "spicy_available": rng.choice(["O", "X"]),
+        "vegetarian_options": rng.choice(["O", "X"]),
+        "food_category": rng.choice(["한식", "일식", "상관없음"]),
+        # (프로필 값은 '가족, 친구'처럼 공백이 섞일 수 있고, '고기'처럼 토큰 일부만 줄 수도 있음)
+        "suitable_for": rng.choice(["가족", "가족, 친구", "친구,연인", "N/A"]),
+        "main_ingredients_list": rng.choice(["고기", "해산물, 야채", " 닭고기", "N/A"]),
+    }
+    python_post_filter = {
+        key: val.split(',') for key, val in user_filter_dict.items()
+        if key in TOKEN_KEYS and val != 'N/A' and val
+    }
+    return user_filter_dict, python_post_filter
+
+
+def test_filter_score_paths_agree():
+    rng = random.Random(0)
+    ids = [f"r{i}" for i in range(200)]
+    metadatas = [_random_metadata(rng) for _ in ids]
+    index = MetadataBitmapIndex(ids, metadatas, KEYS, TOKEN_KEYS)
+    assert set(FILTER_SCORE_WEIGHTS) <= set(KEYS)
+
+    for _ in range(50):
+        user_filter_dict, python_post_filter = _random_filters(rng)
+        candidates = rng.sample(range(len(ids)), 30)
+        cand_ids = [ids[i] for i in candidates]
+        distances = [rng.random() for _ in candidates]
+
+        vectorized = vectorized_filter_scores(index, index.positions(cand_ids), user_filter_dict, python_post_filter)
+        looped = [filter_score(metadatas[i], user_filter_dict, python_post_filter) for i in candidates]
+        assert vectorized.tolist() == looped
+
+        ranked = rank_candidates_vectorized(index, cand_ids, distances, user_filter_dict, python_post_filter)
+        expected = [
+            cand_ids[j] for j in sorted(range(len(candidates)), key=lambda j: (-looped[j], distances[j]))
+        ]
+        assert ranked == expected
+
+
+def test_tokens_match_is_per_token():
+    # (쉼표 경계를 넘는 부분 문자열은 일치로 보지 않음, 요구 값의 앞뒤 공백은 무시)
+    assert not tokens_match("가족,친구", ["족,친"], mode="any")
+    assert tokens_match("가족, 친구", ["가족", " 친구"], mode="all")
+    assert tokens_match("닭고기,소고기", ["고기"], mode="any")
+    assert not tokens_match(None, ["가족"], mode="any")
+    assert not tokens_match("가족", [], mode="all")
+
+    index = MetadataBitmapIndex(["a"], [{"suitable_for": "가족,친구"}], [], ["suitable_for"])
+    positions = np.array([0])
+    assert not index.token_match("suitable_for", positions, ["족,친"], mode="any")[0]
+    assert index.token_match("suitable_for", positions, ["가족", " 친구"], mode="all")[0]
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import numpy as np
+
+from API.routing_backends import HttpFanOutBackend, ROUTE_OK, ROUTE_PENDING, RoutingBackendSelector
+
+# auto 모드 라우팅: 응답 없는 백엔드가 마감 시간을 다 써도 대체 백엔드가 자기 몫의 시간 안에 응답해야 함
+
+DESTINATIONS = ["37.56,126.98", "37.57,126.99", "37.55,127.00"]
+
+
+class HangingBackend(HttpFanOutBackend):
+    """ 응답하지 않는 백엔드 (GraphHopper 멈춤 상황) """
+    name = "graphhopper"
+
+    async def fetch_paths(self, origin, to_coords, departure_time=None):
+        await asyncio.sleep(3600)
+
+
+class SlowBackend(HttpFanOutBackend):
+    """ 목적지마다 delay초 뒤 경로 1개를 돌려주는 백엔드 """
+    name = "otp"
+
+    def __init__(self, delay: float):
+        super().__init__(async_http_client=None)
+        self.delay = delay
+
+    async def fetch_paths(self, origin, to_coords, departure_time=None):
+        await asyncio.sleep(self.delay)
+        return [{'time': 600000, 'transfers': 0, 'distance': 300}]
+
+
+def _route(selector, deadline):
+    return asyncio.run(selector.route_one_to_many("37.56,126.97", DESTINATIONS, deadline=deadline))
+
+
+def test_fallback_backend_answers_after_primary_hangs():
+    selector = RoutingBackendSelector(
+        [HangingBackend(async_http_client=None), SlowBackend(delay=0.05)], breakers={}, async_http_client=None,
+        budget_fraction=0.5, min_http_budget=0.1
+    )
+    started = time.monotonic()
+    routes = _route(selector, deadline=0.6)
+    elapsed = time.monotonic() - started
+
+    assert routes['backend'] == "otp"
+    assert np.all(routes['status'] == ROUTE_OK)
+    assert elapsed < 0.6 + 0.2 # (전체 마감 시간 안에서 대체 백엔드까지 응답)
+
+
+def test_http_backend_skipped_when_budget_too_small():
+    # (첫 백엔드가 남은 시간을 거의 다 쓰면, 두 번째 HTTP 백엔드는 호출하지 않고 마지막 결과(ROUTE_PENDING) 반환)
+    selector = RoutingBackendSelector(
+        [HangingBackend(async_http_client=None), SlowBackend(delay=0.0)], breakers={}, async_http_client=None,
+        budget_fraction=0.95, min_http_budget=0.1
+    )
+    routes = _route(selector, deadline=0.4)
+
+    assert 'backend' not in routes
+    assert np.all(routes['status'] == ROUTE_PENDING)
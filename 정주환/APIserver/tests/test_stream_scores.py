@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from API.final_scorer import calculate_final_scores_async, iter_final_scores_async
+from API.routing_backends import ROUTE_OK, RoutingBackend
+
+# 스트리밍 경로(iter_final_scores_async)의 chunk 단위 조기 종료:
+# 일반 호출(전체 라우팅)과 같은 top_k를 내면서 라우팅하는 후보 수는 줄어야 함
+
+N_CANDIDATES = 60
+TOP_K = 5
+
+
+class CountingBackend(RoutingBackend):
+    """ 목적지 좌표로 정해지는 이동 시간(20~60분)을 돌려주고, 라우팅한 목적지 수를 셈 """
+    name = "stub"
+
+    def __init__(self):
+        self.routed = 0
+
+    async def route_one_to_many(self, origin, destinations, deadline=None, departure_time=None):
+        self.routed += len(destinations)
+        minutes = np.array([20 + (float(d.split(",")[1]) * 1000) % 40 for d in destinations])
+        n = len(destinations)
+        return {
+            'time': minutes * 60 * 1000, 'transfers': np.zeros(n), 'distance': np.full(n, 300.0),
+            'group': np.arange(n, dtype=np.int64), 'status': np.full(n, ROUTE_OK, dtype=np.int8),
+        }
+
+
+def _candidates() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'avg_friendliness': rng.random(N_CANDIDATES),
+        'avg_quality': rng.random(N_CANDIDATES),
+        'Y좌표': np.full(N_CANDIDATES, 37.5),
+        'X좌표': 127.0 + np.arange(N_CANDIDATES) * 0.0137,
+    }, index=[f"r{i}" for i in range(N_CANDIDATES)])
+
+
+def _score(stream: bool, top_k=None):
+    backend = CountingBackend()
+    kwargs = dict(routing_backend=backend, max_concurrency=10, top_k=top_k)
+
+    async def run():
+        if not stream:
+            return await calculate_final_scores_async(_candidates(), "37.5,127.0", [], None, None, **kwargs)
+        last = None
+        async for last in iter_final_scores_async(_candidates(), "37.5,127.0", [], None, None, chunk_size=10, **kwargs):
+            pass
+        return last
+
+    return asyncio.run(run()), backend.routed
+
+
+def test_stream_early_termination_keeps_top_k():
+    full, full_routed = _score(stream=False)
+    streamed, streamed_routed = _score(stream=True, top_k=TOP_K)
+
+    assert full_routed == N_CANDIDATES
+    assert streamed_routed < N_CANDIDATES
+    assert streamed.index[:TOP_K].tolist() == full.index[:TOP_K].tolist()
+    assert sorted(streamed.index) == sorted(full.index) # (생략된 후보도 추정 점수로 포함)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 1단계 RAG용 인메모리 벡터 인덱스 (ChromaDB 'restaurants' 컬렉션 대체 경로)
+# - 영속 restaurant_db에서 임베딩/메타데이터를 한 번 내보내 .npz로 저장
+# - 질의: 행렬-벡터 곱 1회 + argpartition (전수 검색이므로 HNSW 근사 오차 없음)
+# - where 필터: 메타데이터 컬럼 배열의 불리언 마스크 ($and / $or / $eq / $ne / $in / $nin)
+# - 거리: Chroma 기본 공간('l2')과 같은 제곱 L2 거리
+# - source: 내보낼 때의 컬렉션 지문 (개수 / id 해시 / 임베딩 모델·백엔드) -> 다르면 로더가 다시 내보냄
+
+SUPPORTED_DTYPES = ("float32", "int8")
+
+
+def collection_fingerprint(collection, model_name: str, backend: str) -> Dict:
+    """ 컬렉션 지문: 저장된 .npz가 현재 컬렉션 / 임베딩 모델에서 내보낸 것인지 비교용 """
+    ids = sorted(collection.get(include=[])["ids"])
+    return {
+        "count": len(ids),
+        "ids_sha1": hashlib.sha1("\n".join(ids).encode("utf-8")).hexdigest(),
+        "model": model_name,
+        "backend": backend,
+    }
+
+
+class InMemoryVectorIndex:
+
+    def __init__(
+        self, ids: List[str], embeddings, metadatas: List[dict], dtype: str = "float32", source: Dict = None
+    ):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"dtype은 {SUPPORTED_DTYPES} 중 하나여야 합니다: {dtype}")
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.ids = np.asarray(ids, dtype=object)
+        self.metadatas = list(metadatas)
+        self.dtype = dtype
+        self.source = source or {} # (collection_fingerprint, 예전 파일은 {})
+
+        if dtype == "int8":
+            # (행별 대칭 양자화: x ~= q * scale, q in [-127, 127])
+            max_abs = np.abs(embeddings).max(axis=1)
+            self.scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+            self.vectors = np.round(embeddings / self.scales[:, None]).astype(np.int8)
+            dequantized = self.vectors.astype(np.float32) * self.scales[:, None]
+            self.sq_norms = np.einsum("ij,ij->i", dequantized, dequantized)
+        else:
+            self.scales = None
+            self.vectors = np.ascontiguousarray(embeddings)
+            self.sq_norms = np.einsum("ij,ij->i", embeddings, embeddings)
+
+        # (메타데이터 키별 값 배열, 없는 키는 None)
+        keys = sorted({key for meta in self.metadatas for key in (meta or {})})
+        self.columns = {
+            key: np.array([(meta or {}).get(key) for meta in self.metadatas], dtype=object)
+            for key in keys
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- 생성 / 저장 ---
+
+    @classmethod
+    def from_collection(cls, collection, dtype: str = "float32", source: Dict = None) -> "InMemoryVectorIndex":
+        """ Chroma 컬렉션 전체(임베딩 + 메타데이터)를 내보내 인덱스를 만듭니다. """
+        data = collection.get(include=["embeddings", "metadatas"])
+        return cls(data["ids"], data["embeddings"], data["metadatas"], dtype=dtype, source=source)
+
+    def save(self, path: str):
+        """ 원본 float32 임베딩 복원이 필요 없도록 현재 dtype 그대로 저장 """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path,
+            ids=self.ids.astype(str),
+            vectors=self.vectors,
+            scales=self.scales if self.scales is not None else np.array([], dtype=np.float32),
+            metadatas=np.array(json.dumps(self.metadatas, ensure_ascii=False)),
+            source=np.array(json.dumps(self.source, ensure_ascii=False)),
+        )
+
+    @classmethod
+    def load(cls, path: str, dtype: str = "float32") -> Optional["InMemoryVectorIndex"]:
+        """ 파일이 없으면 None. 저장된 dtype과 다르면 역양자화 후 다시 만듭니다. """
+        if not os.path.exists(path):
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            vectors = data["vectors"].astype(np.float32)
+            if data["scales"].size:
+                vectors *= data["scales"][:, None]
+            source = json.loads(str(data["source"])) if "source" in data.files else {}
+            return cls(data["ids"].tolist(), vectors, json.loads(str(data["metadatas"])), dtype=dtype, source=source)
+
+    # --- 필터 / 검색 ---
+
+    def where_mask(self, where: Optional[Dict]) -> np.ndarray:
+        """ Chroma where 절 -> 불리언 마스크 """
+        if not where:
+            return np.ones(len(self), dtype=bool)
+
+        masks = []
+        for key, condition in where.items():
+            if key == "$and":
+                masks.append(np.logical_and.reduce([self.where_mask(c) for c in condition]))
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self.where_mask(c) for c in condition]))
+            else:
+                masks.append(self._field_mask(key, condition))
+        return np.logical_and.reduce(masks)
+
+    def _field_mask(self, key: str, condition) -> np.ndarray:
+        column = self.columns.get(key)
+        if column is None:
+            column = np.full(len(self), None, dtype=object)
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        (op, value), = condition.items()
+
+        if op == "$eq":
+            return column == value
+        if op == "$ne":
+            return column != value
+        if op in ("$in", "$nin"):
+            # (None과 문자열이 섞인 object 배열은 np.isin의 정렬 비교가 실패하므로 집합으로 확인)
+            values = set(value)
+            mask = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+            return mask if op == "$in" else ~mask
+        raise ValueError(f"지원하지 않는 where 연산자: {op}")
+
+    def l2_distances(self, query_embedding, positions: np.ndarray = None) -> np.ndarray:
+        """ 제곱 L2 거리 = |q|^2 - 2 q.x + |x|^2 """
+        q = np.asarray(query_embedding, dtype=np.float32)
+        vectors = self.vectors if positions is None else self.vectors[positions]
+        sq_norms = self.sq_norms if positions is None else self.sq_norms[positions]
+
+        dots = vectors @ q if self.scales is None else (vectors @ q) * (
+            self.scales if positions is None else self.scales[positions]
+        )
+        return np.maximum(np.dot(q, q) - 2 * dots + sq_norms, 0.0)
+
+    def query(self, query_embeddings: List, n_results: int = 10, where: Dict = None) -> Dict[str, list]:
+        """ collection.query()와 같은 형식의 결과 (ids / distances / metadatas, 질의별 리스트) """
+        positions = np.flatnonzero(self.where_mask(where))
+        subset = None if len(positions) == len(self) else positions # (필터 없으면 행렬 복사 생략)
+        results = {"ids": [], "distances": [], "metadatas": []}
+
+        for query_embedding in query_embeddings:
+            distances = self.l2_distances(query_embedding, subset)
+            k = min(n_results, len(positions))
+            if k < len(positions):
+                top = np.argpartition(distances, k - 1)[:k]
+            else:
+                top = np.arange(len(positions))
+            top = top[np.argsort(distances[top], kind="stable")]
+
+            hit_positions = positions[top]
+            results["ids"].append(self.ids[hit_positions].tolist())
+            results["distances"].append(distances[top].tolist())
+            results["metadatas"].append([self.metadatas[p] for p in hit_positions])
+        return results
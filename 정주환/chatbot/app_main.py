@@ -5,7 +5,8 @@ import httpx
 from contextlib import asynccontextmanager
 from typing import List, Dict, Any
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 import gradio as gr
 
 # 프로젝트 모듈
@@ -16,6 +17,7 @@ import gradio_callbacks
 import search_logic
 from API import final_scorer
 from models import RecommendationRequest, RecommendationResponse
+from startup import warmup
 
 # ⬇️ 프로필 뷰 모듈
 from profile_view import normalize_profile, render_profile_card, PROFILE_VIEW_CSS
@@ -65,28 +67,32 @@ async def lifespan(app: FastAPI):
   app.state.http_client = httpx.AsyncClient()
   print("  > HTTPX AsyncClient 생성 완료.")
 
-  try:
-    data_loader.load_app_data(
-      config.RESTAURANT_DB_FILE_ALL, 
-      config.MENU_DB_FILE,
-    )
-    data_loader.load_user_ratings()
-    
-    data_loader.build_vector_db(
-      config.PROFILE_DB_FILE,         
-      config.CLEAR_DB_AND_REBUILD,    
-    )
-    
+  # (CSV / 임베딩 모델 / Chroma는 백그라운드 워밍업으로 로드, 준비 상태는 /readyz)
+  app.state.all_restaurants_df_scoring = None
+
+  def load_scoring():
     app.state.all_restaurants_df_scoring = data_loader.load_scoring_data(
       config.RESTAURANT_DB_SCORING_FILE
     )
-    print("  > 모든 데이터 로드 완료.")
-  except Exception as e:
-    print(f"[치명적 오류] 데이터 로드 실패: {e}")
-
-  print("--- 서버 시작 완료 ---")
+    return app.state.all_restaurants_df_scoring
+
+  warmup.add("app_data", lambda: data_loader.load_app_data(
+    config.RESTAURANT_DB_FILE_ALL, 
+    config.MENU_DB_FILE,
+  ))
+  warmup.add("user_ratings", data_loader.load_user_ratings, required=False)
+  warmup.add("vector_db", lambda: data_loader.build_vector_db(
+    config.PROFILE_DB_FILE,         
+    config.CLEAR_DB_AND_REBUILD,    
+  ))
+  warmup.add("scoring_data", load_scoring)
+  app.state.warmup = warmup
+  warmup.start()
+
+  print("--- 서버 시작 완료 (데이터 로드는 백그라운드 진행: /readyz) ---")
   yield
   print("--- 서버 종료: Lifespan 종료 ---")
+  await warmup.stop()
   await app.state.http_client.aclose()
   print("  > HTTPX AsyncClient 종료.")
 
@@ -99,11 +105,35 @@ app = FastAPI(
 )
 
 
+# ========= 2-1) 헬스 체크 / 준비 상태 =========
+async def require_ready():
+  """ 워밍업 중이면 STARTUP_READY_WAIT_SECONDS까지 대기, 그래도 준비 전이면 503 + Retry-After """
+  if await warmup.wait_ready(config.STARTUP_READY_WAIT_SECONDS):
+    return
+  raise HTTPException(
+    status_code=503,
+    detail="서버 준비 중 (데이터 로드 중 또는 실패: /readyz 확인)",
+    headers={"Retry-After": str(config.STARTUP_RETRY_AFTER_SECONDS)},
+  )
+
+
+@app.get("/healthz", tags=["Health"])
+async def healthz():
+  return {"status": "alive"}
+
+
+@app.get("/readyz", tags=["Health"])
+async def readyz():
+  snapshot = warmup.snapshot()
+  return JSONResponse(snapshot, status_code=200 if snapshot["status"] == "ready" else 503)
+
+
 # ========= 3) /recommendations =========
 @app.post(
   "/recommendations",
   response_model=RecommendationResponse,
   tags=["2-Stage Scorer (final_scorer)"],
+  dependencies=[Depends(require_ready)],
 )
 async def get_recommendations(request: RecommendationRequest):
   if app.state.all_restaurants_df_scoring is None:
@@ -17,16 +17,27 @@ MENU_DB_FILE = "data/20251017_TOTAL_MENU.csv"
 PROFILE_DB_FILE = "data/user_profiles_for_hybrid_search.csv"
 MOCK_USER_RATINGS_FILE = "data/recommendation_results_with_ratings.csv"
 RESTAURANT_DB_SCORING_FILE = "data/blueribbon_scores_only_reviewed.csv" # (기존 main.py에서 사용)
+# (Arrow 열 저장소) build_columnar_store.py로 변환한 파일이 CSV보다 최신이면 메모리 맵으로 로드
+USE_COLUMNAR_STORE = True
+COLUMNAR_STORE_DIR = "data/columnar"
 RAG_REQUEST_N_RESULTS = 50 # (1단계 RAG 검색 시 가져올 초기 후보군 개수)
 DB_PERSISTENT_PATH = "./restaurant_db"
 
 RESTAURANT_COLLECTION_NAME = "restaurants"
 PROFILE_COLLECTION_NAME = "mock_profiles"
 CLEAR_DB_AND_REBUILD = False
+STARTUP_READY_WAIT_SECONDS = 15 # (워밍업 중 도착한 요청이 준비를 기다리는 최대 시간, 초과 시 503)
+STARTUP_RETRY_AFTER_SECONDS = 10 # (503 응답의 Retry-After)
+QUERY_EMBEDDING_CACHE_SIZE = 512 # (질의 텍스트 임베딩 LRU 캐시 크기)
 
 # --- 2/4: LLM API 설정 ---
 GPT_API_NAME = "gpt-4.1-mini" 
 
+# (RAG 쿼리 재작성 캐시) 메모리 LRU + SQLite, 같은 요약문이면 LLM 호출 생략
+RAG_QUERY_CACHE_DB = "./cache/llm_cache.sqlite3"
+RAG_QUERY_CACHE_MAXSIZE = 1000
+RAG_QUERY_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
 # (수정) load_dotenv()가 키를 로드했으므로, client는 여기서 바로 초기화
 client = None
 try:
@@ -5,8 +5,12 @@ import ast
 import chromadb
 import chromadb.utils.embedding_functions as embedding_functions
 import sys
+from functools import lru_cache
 from typing import List
 import config # ⬅️ config 임포트
+import columnar_store
+from menu_index import MenuIndex
+from ratings_index import RatingsIndex
 
 # ⬇️ config 임포트
 from config import (
@@ -14,7 +18,8 @@ from config import (
     PROFILE_DB_FILE, MOCK_USER_RATINGS_FILE,
     RESTAURANT_COLLECTION_NAME, PROFILE_COLLECTION_NAME,
     CLEAR_DB_AND_REBUILD,
-    RESTAURANT_DB_FILE_EN, RESTAURANT_DB_FILE_JP, RESTAURANT_DB_FILE_CN
+    RESTAURANT_DB_FILE_EN, RESTAURANT_DB_FILE_JP, RESTAURANT_DB_FILE_CN,
+    QUERY_EMBEDDING_CACHE_SIZE
 )
 
 # --- 전역 변수 선언 (app_main.py에서 사용) ---
@@ -23,8 +28,10 @@ df_menus = None
 collection = None
 profile_collection = None
 menu_groups = None
+menu_index = None # (식당별 메뉴 CSR 인덱스 + 미리 만든 대표 메뉴 HTML)
 df_all_user_ratings = None 
 df_restaurant_ratings_summary = None 
+ratings_index = None # (식당 -> (추천, 미추천) 배열 + 사용자 -> '추천' 식당 CSR)
 sentence_embedder = None
 all_restaurants_df_scoring = None
 # -----------------------------------------------
@@ -47,10 +54,9 @@ def _load_and_merge_translations(base_df):
   for lang_suffix, file_path, cols_to_use in lang_files_to_load:
     try:
       print(f"  > 번역 파일 로드 중: {file_path}")
-      df_lang = pd.read_csv(file_path, usecols=cols_to_use)
-      
-      df_lang['id'] = df_lang['id'].astype(str)
-      df_lang = df_lang.set_index('id')
+      df_lang = columnar_store.read_frame(
+        file_path, "translations", config.COLUMNAR_STORE_DIR, config.USE_COLUMNAR_STORE, columns=cols_to_use
+      ) # (id 인덱스 설정된 상태)
       
       # ⬇️ [수정] '카테고리' 컬럼을 rename_map에 추가
       rename_map = {
@@ -78,23 +84,24 @@ def load_app_data(store_path, menu_path):
   앱 실행에 필요한 모든 CSV 파일을 로드하여
   2개의 전역 DataFrame을 생성합니다. (번역 포함)
   """
-  global df_restaurants, df_menus, menu_groups
+  global df_restaurants, df_menus, menu_groups, menu_index
   
   try:
     print(f"'{store_path}'에서 가게 DB 로드 중...")
-    df_restaurants = pd.read_csv(store_path)
-    df_restaurants['id'] = df_restaurants['id'].astype(str)
-    df_restaurants = df_restaurants.set_index('id') 
+    # (Arrow 열 저장소가 있으면 메모리 맵 로드, id 인덱스 / dtype은 columnar_store.prepare_frame 기준)
+    df_restaurants = columnar_store.read_frame(
+      store_path, "restaurants", config.COLUMNAR_STORE_DIR, config.USE_COLUMNAR_STORE
+    )
     print(f"가게 DB {len(df_restaurants)}개 로드 완료.")
     
     # ⬇️ [수정됨] 이 함수가 '카테고리' 번역본을 병합합니다.
     df_restaurants = _load_and_merge_translations(df_restaurants)
     
     print(f"'{menu_path}'에서 메뉴 DB 로드 중...")
-    df_menus = pd.read_csv(menu_path)
-    df_menus['식당ID'] = df_menus['식당ID'].astype(str)
+    df_menus = columnar_store.read_frame(menu_path, "menus", config.COLUMNAR_STORE_DIR, config.USE_COLUMNAR_STORE)
     menu_groups = df_menus.groupby('식당ID') 
-    print(f"메뉴 DB {len(df_menus)}개 로드 완료 (그룹화 완료).")
+    menu_index = MenuIndex(df_menus)
+    print(f"메뉴 DB {len(df_menus)}개 로드 완료 (그룹화 완료, 메뉴 인덱스 {len(menu_index)}개 식당).")
     
     return True
 
@@ -153,6 +160,7 @@ def build_vector_db(profile_csv_path: str, clear_db=False):
   
   sentence_embedder = sentence_transformer_ef._model
   print(f"  > SentenceTransformer 모델 ('{model_name}')을 전역 'sentence_embedder'에 저장했습니다.")
+  _embed_query_cached.cache_clear() # (모델이 바뀌었을 수 있으므로 질의 임베딩 캐시 초기화)
   
   print(f"'{DB_PERSISTENT_PATH}' 경로에서 Persistent DB 클라이언트를 초기화합니다...")
   client = chromadb.PersistentClient(path=DB_PERSISTENT_PATH)
@@ -282,22 +290,37 @@ def build_vector_db(profile_csv_path: str, clear_db=False):
   print(f"--- 2단계: VectorDB 2개 컬렉션 로드/구축 완료 ---")
   return True
 
+
+def embed_query(text: str) -> List[float]:
+  """
+  질의 텍스트 1개 -> 임베딩 벡터 (collection.query(query_embeddings=...)용)
+  전역 'sentence_embedder'로 계산하며, 같은 문자열은 LRU 캐시에서 반환합니다.
+  (컬렉션의 embedding_function과 같은 모델/설정이므로 query_texts와 같은 결과)
+  """
+  return list(_embed_query_cached(text))
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def _embed_query_cached(text: str):
+  if sentence_embedder is None:
+    raise RuntimeError("sentence_embedder가 없습니다. build_vector_db()를 먼저 실행하세요.")
+  vector = sentence_embedder.encode([text], convert_to_numpy=True)[0]
+  return tuple(vector.tolist())
+
+
 def load_user_ratings():
     """ 500명 평가 데이터를 로드하고 집계합니다. """
-    global df_all_user_ratings, df_restaurant_ratings_summary
+    global df_all_user_ratings, df_restaurant_ratings_summary, ratings_index
     try:
       print(f"'{MOCK_USER_RATINGS_FILE}'에서 500명 평가 데이터 로드 중...")
-      df_all_user_ratings = pd.read_csv(MOCK_USER_RATINGS_FILE)
+      df_all_user_ratings = columnar_store.read_frame(
+        MOCK_USER_RATINGS_FILE, "ratings", config.COLUMNAR_STORE_DIR, config.USE_COLUMNAR_STORE
+      ) # (restaurant_id / user_id는 문자열로 정리된 상태)
       
-      if 'restaurant_id' in df_all_user_ratings.columns:
-        df_all_user_ratings['restaurant_id'] = df_all_user_ratings['restaurant_id'].apply(str)
-      else:
+      if 'restaurant_id' not in df_all_user_ratings.columns:
         print("[경고] 'restaurant_id' 컬럼이 500명 평가 파일에 없습니다.")
         raise KeyError("'restaurant_id' 컬럼 누락")
       
-      if 'user_id' in df_all_user_ratings.columns:
-        df_all_user_ratings['user_id'] = df_all_user_ratings['user_id'].apply(str)
-      else:
+      if 'user_id' not in df_all_user_ratings.columns:
         print("[경고] 'user_id' 컬럼이 500명 평가 파일에 없습니다.")
         raise KeyError("'user_id' 컬럼 누락")
 
@@ -318,6 +341,7 @@ def load_user_ratings():
         ratings_crosstab['미추천'] = 0
         
       df_restaurant_ratings_summary = ratings_crosstab[['추천', '미추천']].reset_index()
+      ratings_index = RatingsIndex(df_all_user_ratings, df_restaurant_ratings_summary)
       
       print(f"  > 500명 평가 데이터 집계 완료: {len(df_restaurant_ratings_summary)}개 식당")
       return True
@@ -333,9 +357,9 @@ def load_scoring_data(file_path):
     """ (기존 main.py의 lifespan) 점수제용 식당 데이터를 로드합니다. """
     global all_restaurants_df_scoring
     try:
-        all_restaurants_df_scoring = pd.read_csv(file_path)
-        all_restaurants_df_scoring['id'] = all_restaurants_df_scoring['id'].astype(str)
-        all_restaurants_df_scoring = all_restaurants_df_scoring.set_index('id')
+        all_restaurants_df_scoring = columnar_store.read_frame(
+            file_path, "scoring", config.COLUMNAR_STORE_DIR, config.USE_COLUMNAR_STORE
+        ) # (id 인덱스 설정된 상태)
         if 'price' not in all_restaurants_df_scoring.columns:
             print("Info: 'price' 컬럼이 없어 임의로 생성합니다. (테스트용)")
             all_restaurants_df_scoring['price'] = ['$'] * (len(all_restaurants_df_scoring) // 2) + ['$$'] * (len(all_restaurants_df_scoring) - len(all_restaurants_df_scoring) // 2)
@@ -18,6 +18,7 @@ import search_logic
 import data_loader
 from API import final_scorer
 from API.final_scorer import GraphHopperDownError
+from startup import warmup
 
 # =========================
 # 공통 헬퍼
@@ -249,6 +250,15 @@ async def _run_recommendation_flow(
   """
   final_user_profile_row: Dict[str, Any] = {}
 
+  # (서버 워밍업 중이면 잠시 대기, 그래도 준비 전이면 안내 후 종료)
+  if not await warmup.wait_ready(config.STARTUP_READY_WAIT_SECONDS):
+    warn_msg = get_text("warn_server_warming_up", lang_code)
+    gr.Warning(warn_msg)
+    return (
+      gr.update(value=warn_msg, visible=True),
+      final_user_profile_row,
+    )
+
   try:
     # --- 1단계: RAG + 필터 메타데이터 생성 ---
     print("--- 1단계: RAG + 점수제 후보군 생성 시작 ---")
@@ -261,6 +271,7 @@ async def _run_recommendation_flow(
       "name": profile_data.get("name", "N/A"),
       "user_id": "live_user",
       "rag_query_text": profile_summary,
+      "rag_query": llm_utils.get_profile_rag_query(profile_data),
       "filter_metadata_json": filter_metadata_json,
       "final_candidate_ids": [],
       "final_scored_df": None,
@@ -111,6 +111,12 @@ I18N_TEXTS = {
     "JP": "第1段階のRAG検索結果が0件です。フィルターを緩和してみてください。",
     "CN": "第1阶段RAG搜索结果为0。请尝试放宽筛选条件。"
   },
+  "warn_server_warming_up": {
+    "KR": "⏳ 서버가 추천 데이터를 불러오는 중입니다. 잠시 후 다시 시도해주세요.",
+    "US": "⏳ The server is still loading recommendation data. Please try again shortly.",
+    "JP": "⏳ サーバーがおすすめデータを読み込み中です。しばらくしてから再度お試しください。",
+    "CN": "⏳ 服务器正在加载推荐数据，请稍后再试。"
+  },
   "warn_graphhopper_down": {
     "KR": "⚠️ 뚜벅이 점수 서버가 응답하지 않습니다. 1단계 RAG 검색 결과로 대체합니다.",
     "US": "⚠️ Walking score server is not responding. Falling back to Stage 1 RAG results.",
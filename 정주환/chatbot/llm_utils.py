@@ -1,5 +1,12 @@
+import hashlib
 import json
-from config import client, GPT_API_NAME, SYSTEM_PROMPT, PROFILE_TEMPLATE
+import threading
+from collections import OrderedDict
+from config import (
+  client, GPT_API_NAME, SYSTEM_PROMPT, PROFILE_TEMPLATE,
+  RAG_QUERY_CACHE_DB, RAG_QUERY_CACHE_MAXSIZE, RAG_QUERY_CACHE_TTL_SECONDS
+)
+from llm_cache import LLMResponseCache, make_cache_key
 
 # --- (함수 4/9) ---
 def call_gpt4o(chat_messages, current_profile, lang_code: str = "KR"):
@@ -53,16 +60,48 @@ def call_gpt4o(chat_messages, current_profile, lang_code: str = "KR"):
     error_message = f"죄송합니다. 챗봇 응답 생성 중 오류가 발생했습니다: {e}"
     return error_message, current_profile
 
+# (프로필 요약 메모) 같은 프로필이면 요약(HTML/텍스트)과 RAG 쿼리를 다시 생성하지 않음
+PROFILE_SUMMARY_MEMO_SIZE = 256
+_profile_summary_memo = OrderedDict() # (fingerprint -> {"html", "text", "rag_query"})
+_profile_summary_lock = threading.Lock()
+
+def profile_fingerprint(profile_data: dict) -> str:
+  """ 프로필 내용(키 순서 무관)의 sha256 """
+  profile_str = json.dumps(profile_data, sort_keys=True, ensure_ascii=False, default=str)
+  return hashlib.sha256(profile_str.encode("utf-8")).hexdigest()
+
+def _get_profile_memo(profile_data: dict):
+  fingerprint = profile_fingerprint(profile_data)
+  with _profile_summary_lock:
+    entry = _profile_summary_memo.get(fingerprint)
+    if entry is not None:
+      _profile_summary_memo.move_to_end(fingerprint)
+    return entry
+
+def _set_profile_memo(profile_data: dict, **values):
+  fingerprint = profile_fingerprint(profile_data)
+  with _profile_summary_lock:
+    entry = _profile_summary_memo.setdefault(fingerprint, {})
+    entry.update(values)
+    _profile_summary_memo.move_to_end(fingerprint)
+    while len(_profile_summary_memo) > PROFILE_SUMMARY_MEMO_SIZE:
+      _profile_summary_memo.popitem(last=False)
+
 # --- (함수 6/9) ---
 def generate_profile_summary(profile_data):
   """
   완성된 프로필(JSON)을 받아, gpt-4.1-mini를 호출하여
   (1) Gradio 채팅용 메시지, (2) CSV 저장용 원본 요약문 텍스트 
   2가지를 반환합니다.
+  (한 번의 호출로 두 형식을 만들고, 같은 프로필이면 메모된 결과를 반환. 실패한 결과는 메모하지 않음)
   """
   if client is None:
       return "(오류: API 키 미설정)", "(오류: API 키 미설정)"
 
+  memo = _get_profile_memo(profile_data)
+  if memo is not None and "text" in memo:
+      return memo["html"], memo["text"]
+
   profile_str = json.dumps(profile_data, indent=2, ensure_ascii=False)
   
   summary_system_prompt = """
@@ -94,6 +133,7 @@ def generate_profile_summary(profile_data):
     raw_summary_text = response.choices[0].message.content
     name = profile_data.get('name', '사용자')
     chat_message_html = f"\n\n---\n\n### 🤖 AI가 파악한 {name}님의 프로필\n\n{raw_summary_text}"
+    _set_profile_memo(profile_data, html=chat_message_html, text=raw_summary_text)
     
     return chat_message_html, raw_summary_text
   
@@ -103,14 +143,30 @@ def generate_profile_summary(profile_data):
     error_text = "(프로필 요약 생성에 실패했습니다.)"
     return error_html, error_text
 
+# (쿼리 재작성 프롬프트를 바꾸면 버전을 올려서 캐시된 이전 결과를 무효화)
+RAG_QUERY_PROMPT_VERSION = "rag-query-v1"
+rag_query_cache = LLMResponseCache(
+  "rag_query",
+  db_path=RAG_QUERY_CACHE_DB,
+  maxsize=RAG_QUERY_CACHE_MAXSIZE,
+  ttl_seconds=RAG_QUERY_CACHE_TTL_SECONDS
+)
+
 # --- (함수 8/9 중 하나) ---
 def generate_rag_query(user_profile_summary):
   """
   LLM을 호출하여 긴 자기소개(요약문)를
   가게 RAG 텍스트와 매칭하기 좋은 '짧은 핵심 쿼리'로 변환합니다.
+  (같은 요약문 + 프롬프트 버전이면 캐시된 결과를 반환, 실패한 결과는 캐시하지 않음)
   """
   if client is None:
       return user_profile_summary[:150] # API 키 없으면 원본 반환
+
+  cache_key = make_cache_key(user_profile_summary, RAG_QUERY_PROMPT_VERSION)
+  cached_query = rag_query_cache.get(cache_key)
+  if cached_query is not None:
+      print("  > [RAG] 캐시된 '분위기/성향' 쿼리를 사용합니다.")
+      return cached_query
       
   print("  > [RAG] LLM을 호출하여 '분위기/성향' 쿼리를 재작성합니다...")
   
@@ -142,6 +198,8 @@ def generate_rag_query(user_profile_summary):
       temperature=0.2
     )
     rewritten_query = response.choices[0].message.content.strip().replace('"', '')
+    if rewritten_query:
+        rag_query_cache.set(cache_key, rewritten_query)
     return rewritten_query
   except Exception as e:
     print(f"  > [오류] 쿼리 재작성 실패: {e}")
@@ -164,6 +222,23 @@ def generate_profile_summary_text_only(profile_data: dict) -> str:
     _, raw_summary_text = generate_profile_summary(profile_data)
     return raw_summary_text
 
+def get_profile_rag_query(profile_data: dict) -> str:
+    """
+    (신규 헬퍼 3)
+    프로필의 텍스트 요약본 -> RAG 쿼리 재작성 결과를 반환합니다.
+    (요약과 쿼리 모두 프로필별로 메모되어, 같은 프로필의 이후 단계에서는 LLM을 다시 호출하지 않음)
+    """
+    memo = _get_profile_memo(profile_data)
+    if memo is not None and "rag_query" in memo:
+        return memo["rag_query"]
+
+    profile_summary = generate_profile_summary_text_only(profile_data)
+    rag_query = generate_rag_query(profile_summary)
+    # (요약이 성공해서 메모된 프로필이고, 재작성이 실패(원본 앞부분 반환)하지 않은 경우만)
+    if _get_profile_memo(profile_data) is not None and rag_query != profile_summary[:150]:
+        _set_profile_memo(profile_data, rag_query=rag_query)
+    return rag_query
+
 
 def extract_profile_from_summary(summary_text: str) -> dict:
   """
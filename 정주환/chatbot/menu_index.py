@@ -0,0 +1,44 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# 식당별 메뉴 인덱스 (CSR 형식, load_app_data에서 1회 구축)
+# - 메뉴 행을 식당ID 기준으로 안정 정렬 -> 식당 i의 메뉴 = 행 [offsets[i], offsets[i+1])
+# - 대표 메뉴 플래그(대표여부 == 'Y') 배열
+# - 카드용 대표 메뉴 3개 <li> HTML을 미리 만들어 둠 (format_restaurant_markdown에서 pandas 작업 없음)
+# (2-space indentation)
+
+
+class MenuIndex:
+
+  def __init__(self, df_menus: pd.DataFrame, top_n: int = 3):
+    restaurant_ids = df_menus['식당ID'].astype(str).to_numpy()
+    order = np.argsort(restaurant_ids, kind="stable") # (식당 내 메뉴 순서는 원본 파일 순서 유지)
+    sorted_ids = restaurant_ids[order]
+
+    self.restaurant_ids, starts = np.unique(sorted_ids, return_index=True)
+    self.offsets = np.append(starts, len(sorted_ids)).astype(np.int64)
+    self.id_pos = {rid: i for i, rid in enumerate(self.restaurant_ids)}
+
+    names = df_menus['메뉴'].to_numpy(dtype=object)[order]
+    prices = df_menus['가격원문'].to_numpy(dtype=object)[order]
+    self.is_representative = df_menus['대표여부'].to_numpy(dtype=object)[order] == 'Y'
+
+    self.snippets = []
+    for i in range(len(self.restaurant_ids)):
+      start, end = self.offsets[i], self.offsets[i + 1]
+      # (대표 메뉴 최대 top_n개, 없으면 앞에서 top_n개)
+      rows = np.arange(start, end)
+      top_rows = rows[self.is_representative[start:end]][:top_n]
+      if len(top_rows) == 0:
+        top_rows = rows[:top_n]
+      self.snippets.append("".join(f"<li>{names[row]} ({prices[row]})</li>" for row in top_rows))
+
+  def __len__(self):
+    return len(self.restaurant_ids)
+
+  def snippet(self, restaurant_id: str) -> Optional[str]:
+    """ 카드용 대표 메뉴 <li> HTML (메뉴가 없는 식당이면 None) """
+    pos = self.id_pos.get(restaurant_id)
+    return self.snippets[pos] if pos is not None else None
@@ -69,7 +69,7 @@ def format_restaurant_markdown(store_id_str, rank_prefix="추천", rank_index=1,
   Gradio에 표시할 단일 식당의 *HTML* 문자열을 반환합니다. (CSS 클래스 사용)
   """
   
-  if db.df_restaurants is None or db.menu_groups is None:
+  if db.df_restaurants is None or db.menu_index is None:
        db_not_loaded_text = get_text("store_not_loaded", lang_code, store_id_str=store_id_str)
        return f"""
        <div class="border-item">
@@ -125,14 +125,11 @@ def format_restaurant_markdown(store_id_str, rank_prefix="추천", rank_index=1,
 
     # 2. (다른 사용자 평가 카운트 조회)
     social_proof_html = "" 
-    if db.df_restaurant_ratings_summary is not None and not db.df_restaurant_ratings_summary.empty:
+    if db.ratings_index is not None:
       try:
-        rating_info = db.df_restaurant_ratings_summary[
-          db.df_restaurant_ratings_summary['restaurant_id'] == store_id_str
-        ]
-        if not rating_info.empty:
-          recommend_count = rating_info['추천'].iloc[0]
-          non_recommend_count = rating_info['미추천'].iloc[0]
+        rating_counts = db.ratings_index.rating_counts(store_id_str)
+        if rating_counts is not None:
+          recommend_count, non_recommend_count = rating_counts
           social_proof_html = f" | 👍 {recommend_count} / 👎 {non_recommend_count}"
       except Exception as e:
         print(f"[서식 오류] ID {store_id_str} 평가 카운트 조회: {e}")
@@ -171,12 +168,10 @@ def format_restaurant_markdown(store_id_str, rank_prefix="추천", rank_index=1,
     menu_html = ""
     menu_items_html = "" 
     try:
-      menus_df = db.menu_groups.get_group(store_id_str)
-      rep_menus = menus_df[menus_df['대표여부'] == 'Y'].head(3)
-      if rep_menus.empty:
-        rep_menus = menus_df.head(3)
-      for _, menu_row in rep_menus.iterrows():
-        menu_items_html += f"<li>{menu_row['메뉴']} ({menu_row['가격원문']})</li>"
+      # (메뉴 인덱스에 미리 만든 대표 메뉴 3개, 메뉴가 없는 식당은 KeyError -> 메뉴 섹션 생략)
+      menu_items_html = db.menu_index.snippet(store_id_str)
+      if menu_items_html is None:
+        raise KeyError(store_id_str)
       
       if not menu_items_html:
         menu_items_html = f"<li>{get_text('menu_not_found', lang_code)}</li>"
@@ -264,13 +259,13 @@ def get_similar_user_recommendations(
     print("[유사 추천] 'profile_collection'이 로드되지 않았습니다.")
     return ""
     
-  if db.df_all_user_ratings is None:
-    print("[유사 추천] 'df_all_user_ratings'가 로드되지 않았습니다.")
+  if db.ratings_index is None:
+    print("[유사 추천] 'ratings_index'(500명 평가)가 로드되지 않았습니다.")
     return ""
 
   try:
     results = db.profile_collection.query(
-      query_texts=[live_rag_query_text],
+      query_embeddings=[db.embed_query(live_rag_query_text)],
       n_results=max_similar_users
     )
     
@@ -281,17 +276,14 @@ def get_similar_user_recommendations(
     similar_user_ids = [meta['user_id'] for meta in results['metadatas'][0]]
     print(f"[유사 추천] 찾은 유사 사용자: {similar_user_ids}")
 
-    similar_user_likes = db.df_all_user_ratings[
-      (db.df_all_user_ratings['user_id'].isin(similar_user_ids)) &
-      (db.df_all_user_ratings['사용자평가'] == '추천')
-    ]
+    similar_user_likes = db.ratings_index.liked_by(similar_user_ids) # (평가 파일 행 순서)
     
-    if similar_user_likes.empty:
+    if not similar_user_likes:
       print("[유사 추천] 유사 사용자가 '추천'한 식당이 없습니다.")
       return ""
 
     new_recommendations = []
-    for store_id in similar_user_likes['restaurant_id'].astype(str):
+    for store_id in similar_user_likes:
       if store_id not in primary_reco_ids and store_id not in new_recommendations:
         new_recommendations.append(store_id)
         
@@ -342,7 +334,8 @@ def get_rag_candidate_ids(
         print(f"[오류] 사용자 프로필 파싱 실패: {e}")
         return []
 
-    user_rag_query = generate_rag_query(user_original_summary)
+    # (이미 재작성된 쿼리가 있으면 재사용)
+    user_rag_query = user_profile_row.get('rag_query') or generate_rag_query(user_original_summary)
     db_pre_filter = build_filters_from_profile(user_filter_dict)
     python_post_filter = {}
     post_filter_keys = ['main_ingredients_list', 'suitable_for']
@@ -363,17 +356,18 @@ def get_rag_candidate_ids(
     print(f"  > DB 1차 필터: {db_pre_filter}")
 
     try:
+        user_rag_embedding = db.embed_query(user_rag_query) # (필터 완화 재시도에도 같은 임베딩 재사용)
         print(f"  > RAG + 1차 필터 검색 (Top {n_results}개)...")
         
         if db_pre_filter: 
             results = db.collection.query(
-                query_texts=[user_rag_query],
+                query_embeddings=[user_rag_embedding],
                 n_results=n_results,
                 where=db_pre_filter
             )
         else: 
             results = db.collection.query(
-                query_texts=[user_rag_query],
+                query_embeddings=[user_rag_embedding],
                 n_results=n_results
             )
         
@@ -382,7 +376,7 @@ def get_rag_candidate_ids(
         if not results.get('ids', [[]])[0]:
             print("  > [필터 완화] 1차 필터 결과 0건. RAG-Only(필터 없음)로 재시도...")
             results = db.collection.query(
-                query_texts=[user_rag_query],
+                query_embeddings=[user_rag_embedding],
                 n_results=n_results
             )
             print(f"  > RAG-Only 검색 완료: {len(results['ids'][0])}개 후보 반환")
@@ -455,13 +449,13 @@ def get_ground_truth_for_user(
   (변경 없음)
   """
   
-  if db.profile_collection is None or db.df_all_user_ratings is None:
+  if db.profile_collection is None or db.ratings_index is None:
     print("[Ground Truth] DB가 로드되지 않았습니다.")
     return set()
 
   try:
     results = db.profile_collection.query(
-      query_texts=[live_rag_query_text],
+      query_embeddings=[db.embed_query(live_rag_query_text)],
       n_results=max_similar_users
     )
     
@@ -471,16 +465,13 @@ def get_ground_truth_for_user(
       
     similar_user_ids = [meta['user_id'] for meta in results['metadatas'][0]]
 
-    ground_truth_df = db.df_all_user_ratings[
-      (db.df_all_user_ratings['user_id'].isin(similar_user_ids)) &
-      (db.df_all_user_ratings['사용자평가'] == '추천')
-    ]
+    ground_truth_ids = db.ratings_index.liked_by(similar_user_ids)
     
-    if ground_truth_df.empty:
+    if not ground_truth_ids:
       print("[Ground Truth] 유사 사용자가 '추천'한 식당이 없습니다.")
       return set()
 
-    ground_truth_set = set(ground_truth_df['restaurant_id'].astype(str))
+    ground_truth_set = set(ground_truth_ids)
     print(f"[Ground Truth] 유사 사용자 {len(similar_user_ids)}명으로부터 정답 {len(ground_truth_set)}개 발견")
     return ground_truth_set
 
@@ -7,7 +7,7 @@ import SurveyChat from './components/SurveyChat';
 import RestaurantList from './components/RestaurantList';
 import RestaurantModal from './components/RestaurantModal';
 import WeightsControl from './components/WeightsControl';
-import { generateRecommendations } from './services/api';
+import { streamRecommendations } from './services/api';
 import './App.css';
 
 function App() {
@@ -40,9 +40,12 @@ function App() {
     setError(null);
 
     try {
-      const response = await generateRecommendations(profile, k, currentWeights);
-      setRestaurants(response.restaurants);
-      setCurrentStep('recommendations');
+      // (1단계 RAG 결과를 먼저 보여주고, 이동 점수가 도착할 때마다 목록을 갱신)
+      await streamRecommendations(profile, k, currentWeights, (eventName, data) => {
+        setRestaurants(data.restaurants);
+        setCurrentStep('recommendations');
+        setLoading(false);
+      });
     } catch (err) {
       setError('추천 생성 중 오류가 발생했습니다. 다시 시도해주세요.');
       console.error('Recommendation error:', err);
@@ -73,6 +73,71 @@ export const generateRecommendations = async (profile, topK = 10, weights = null
   }
 };
 
+/**
+ * 프로필 기반 맞춤 추천 생성 (SSE 스트리밍)
+ * - rag: 1단계 RAG 순서 (즉시), update: 이동 점수 반영 재정렬, final: 최종 결과
+ * @param {Object} profile - 사용자 프로필 (13개 항목)
+ * @param {number} topK - 반환할 결과 수
+ * @param {Object} weights - 가중치 설정 (선택적)
+ * @param {Function} onEvent - (eventName, data) 콜백, 이벤트마다 호출
+ * @returns {Object} final 이벤트의 data
+ */
+export const streamRecommendations = async (profile, topK = 10, weights = null, onEvent = () => {}) => {
+  const requestData = {
+    profile,
+    top_k: topK,
+  };
+
+  // 가중치가 제공되면 추가
+  if (weights) {
+    requestData.weights = weights;
+  }
+
+  // (EventSource는 POST를 지원하지 않으므로 fetch 스트림을 직접 파싱)
+  const response = await fetch(`${API_BASE_URL}/api/recommendations/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(requestData),
+  });
+  if (!response.ok) {
+    const error = new Error(`추천 스트리밍 실패: ${response.status}`);
+    console.error('추천 생성 실패:', error);
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder('utf-8');
+  let buffer = '';
+  let finalData = null;
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // (SSE 메시지는 빈 줄로 구분)
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let eventName = 'message';
+      const dataLines = [];
+      message.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) eventName = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      });
+      if (!dataLines.length) continue;
+
+      const data = JSON.parse(dataLines.join('\n'));
+      onEvent(eventName, data);
+      if (eventName === 'final') finalData = data;
+    }
+  }
+
+  return finalData;
+};
+
 /**
  * 식당 상세 정보 조회
  * @param {string} restaurantId - 식당 ID